@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Measure the memory taken by symbols and devices in large networks.
+
+Used in the Logic Simulator project to check that large definition files
+and networks fit in memory. A definition file of the given number of tokens
+is scanned, and the memory held by its symbols is measured with slotted
+scanner.Symbol objects and with equivalent objects using instance
+dictionaries. The same is done for the given number of two-input gates,
+held as devices.Device objects, as equivalent objects using instance
+dictionaries, and in a devicearrays.ArrayDevices store.
+
+Usage
+-----
+Default of one million tokens and devices: benchmark.py
+Other counts: benchmark.py <number of tokens> <number of devices>
+
+Functions
+---------
+make_unslotted - returns an equivalent class using instance dictionaries.
+measure - returns the bytes allocated while making objects, and the objects.
+write_definition_file - writes a definition file of at least count tokens.
+scan_tokens - returns the symbols scanned from a definition file.
+copy_symbols - returns copies of symbols made with the given class.
+make_gates - returns two-input gate devices made with the given class.
+get_array_size - returns the bytes held by the arrays of an ArrayDevices.
+run_benchmark - returns the bytes per symbol and per device of each kind.
+main - prints the benchmark results.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from names import Names
+from devices import Device, Devices
+from devicearrays import ArrayDevices
+from scanner import Scanner, Symbol
+
+
+def make_unslotted(slotted_class):
+    """Return a class like slotted_class, but using instance dictionaries."""
+    return type(slotted_class.__name__, (),
+                {"__init__": slotted_class.__init__})
+
+
+def measure(make_objects):
+    """Return [bytes allocated, objects] for the objects make_objects makes.
+
+    The objects are returned so that they are still alive when measured.
+    """
+    tracemalloc.start()
+    objects = make_objects()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return [allocated, objects]
+
+
+def write_definition_file(path, count):
+    """Write a definition file of at least count tokens to path."""
+    with open(path, "w") as definition_file:
+        definition_file.write("DEVICES {\n")
+        # Nine tokens per device
+        for number in range(count // 9 + 1):
+            definition_file.write("g%d = AND (number_of_inputs:2);\n"
+                                  % number)
+        definition_file.write("}\n")
+
+
+def scan_tokens(path, names):
+    """Return the list of symbols scanned from the file at path."""
+    scanner = Scanner(path, names)
+    symbols = []
+    symbol = scanner.get_symbol()
+    while symbol.type != scanner.EOF:
+        symbols.append(symbol)
+        symbol = scanner.get_symbol()
+    scanner.file_object.close()
+    return symbols
+
+
+def copy_symbols(symbols, symbol_class):
+    """Return copies of the symbols made with symbol_class."""
+    copies = []
+    for symbol in symbols:
+        symbol_copy = symbol_class()
+        symbol_copy.type = symbol.type
+        symbol_copy.id = symbol.id
+        symbol_copy.line_number = symbol.line_number
+        symbol_copy.line_position = symbol.line_position
+        copies.append(symbol_copy)
+    return copies
+
+
+def make_gates(device_ids, device_kind, input_ids, device_class):
+    """Return two-input gates made with device_class, as make_gate does."""
+    gates = []
+    for device_id in device_ids:
+        gate = device_class(device_id)
+        gate.device_kind = device_kind
+        gate.inputs = dict.fromkeys(input_ids)
+        gate.outputs = {None: 0}
+        gates.append(gate)
+    return gates
+
+
+def get_array_size(devices):
+    """Return the bytes held by the arrays and lists of an ArrayDevices."""
+    arrays = [devices.device_ids, devices.device_kinds,
+              devices.device_indices, devices.input_starts,
+              devices.input_counts, devices.input_ports,
+              devices.input_sources, devices.input_source_ports,
+              devices.output_starts, devices.output_counts,
+              devices.output_ports, devices.output_signals]
+    arrays += list(devices.properties.values())
+    return sum(sys.getsizeof(array) for array in arrays)
+
+
+def run_benchmark(token_count, device_count):
+    """Return the bytes per symbol and per device of each kind.
+
+    Return {name: bytes}, and the seconds taken to scan the tokens.
+    """
+    results = {}
+    names = Names()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tokens.txt")
+        write_definition_file(path, token_count)
+        start = time.perf_counter()
+        symbols = scan_tokens(path, names)[:token_count]
+        scan_time = time.perf_counter() - start
+    for name, symbol_class in [("Symbol", Symbol),
+                               ("unslotted Symbol", make_unslotted(Symbol))]:
+        [allocated, copies] = measure(
+            lambda: copy_symbols(symbols, symbol_class))
+        results[name] = allocated / len(copies)
+    del symbols, copies
+
+    devices = Devices(names)
+    device_ids = range(len(names.names_list),
+                       len(names.names_list) + device_count)
+    device_ids = list(device_ids)  # the IDs are shared by every store
+    input_ids = devices.get_indexed_port_ids("I", 3)[1:]
+    for name, device_class in [("Device", Device),
+                               ("unslotted Device", make_unslotted(Device))]:
+        [allocated, gates] = measure(
+            lambda: make_gates(device_ids, devices.AND, input_ids,
+                               device_class))
+        results[name] = allocated / len(gates)
+    del gates
+
+    array_devices = ArrayDevices(names)
+    for device_id in device_ids:
+        array_devices.make_gate(device_id, devices.AND, 2)
+    results["ArrayDevices"] = get_array_size(array_devices) / device_count
+    return [results, scan_time]
+
+
+def main(arg_list):
+    """Print the bytes per symbol and per device for the given counts."""
+    counts = [1000000, 1000000]
+    if arg_list:
+        if len(arg_list) != 2 or not all(arg.isdigit() and int(arg) > 0
+                                         for arg in arg_list):
+            print("Usage: benchmark.py <number of tokens> "
+                  "<number of devices>")
+            sys.exit()
+        counts = [int(arg) for arg in arg_list]
+    [token_count, device_count] = counts
+    [results, scan_time] = run_benchmark(token_count, device_count)
+    print("Scanned %d tokens in %.1f seconds" % (token_count, scan_time))
+    for name, allocated in results.items():
+        count = token_count if "Symbol" in name else device_count
+        print("%-18s %6.1f bytes each, %7.1f MB for %d"
+              % (name, allocated, allocated * count / 1e6, count))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,358 @@
+"""Generate and run specialised Python code for a logic network.
+
+Used in the Logic Simulator project as a faster alternative to
+Network.execute_network. The network is translated into a straight-line
+Python generator that keeps every signal in a local variable from one cycle
+to the next, so that no device lookups or dictionary accesses are needed
+while the signals settle.
+
+Classes
+-------
+CodeGenerator - generates, compiles and runs code for a logic network.
+"""
+import hashlib
+
+
+class CodeGenerator:
+    """Generate, compile and run specialised code for a logic network.
+
+    The generated generator simulates one cycle each time it is resumed,
+    exactly like Network.execute_network: devices are executed in the same
+    order, and each signal moves towards its target in the same way as
+    update_signal. State is loaded from the Device objects when the
+    simulation starts, and only the outputs and D-type memories that change
+    are stored back, along with the clock and siggen counters, which
+    run_cycles reads and skips. The Device objects are therefore always up
+    to date for monitors and callers, and execute_network is a drop-in
+    replacement for Network.execute_network.
+
+    The netlist_changes and state_changes counters of devices are compared
+    on every cycle: the code is compiled again when the netlist changed, and
+    the simulation restarted from the Device objects when anything else
+    changed their state, such as set_switch, cold_startup, skip_cycles or
+    Network.execute_network. Anything else writing outputs or device states
+    directly must increment devices.state_changes, or call start. Compiled
+    code is cached by a hash of the netlist, and networks containing device
+    kinds the generator does not know about are executed by the network
+    itself.
+
+    Only the simulation server uses the generator, as the engine of each
+    server.Session; the user interfaces use Network.execute_network.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+
+    Public methods
+    --------------
+    get_signature(self): Returns a tuple describing the structure of the
+                         network.
+
+    generate_source(self): Returns the source code of the generator
+                           simulating the network, or None if it cannot be
+                           generated.
+
+    compile_network(self): Compiles the generator for the current network,
+                           reusing cached code where possible.
+
+    start(self): Starts the simulation from the state of the devices.
+
+    execute_network(self): Executes all the devices in the network for one
+                           simulation cycle.
+    """
+
+    # code_cache stores {netlist_hash: code_object}, shared by all instances
+    code_cache = {}
+
+    def __init__(self, names, devices, network):
+        """Initialise the generated function and change counters."""
+        self.names = names
+        self.devices = devices
+        self.network = network
+
+        self.signature = None  # signature of the compiled network
+        self.function = None  # generated function, None if not available
+        self.simulation = None  # running generator made by function
+        # Counters of devices when the code was compiled and started
+        self.netlist_changes = None
+        self.state_changes = None
+        self.iteration_limit = 20  # as in Network.execute_network
+
+    def get_signature(self):
+        """Return a tuple describing the structure of the network.
+
+        Two networks with the same signature can share generated code. This
+        takes time proportional to the size of the network, so it is only
+        used when the network is compiled.
+        """
+        device_signature = tuple(
+            (device.device_id, device.device_kind,
+             tuple(device.inputs.items()), tuple(device.outputs))
+            for device in self.devices.devices_list)
+        cluster_signature = tuple(
+            (cluster.root_id, tuple(cluster.input_signals),
+             tuple(device.device_id for device in cluster.gates))
+            for cluster in self.network.clusters)
+        return (device_signature, cluster_signature)
+
+    def generate_source(self):
+        """Return the source code of the generator simulating the network.
+
+        Return None if the network contains a device kind which is not
+        supported by the generator.
+        """
+        devices = self.devices
+        LOW, HIGH = devices.LOW, devices.HIGH
+        RISING, FALLING = devices.RISING, devices.FALLING
+        devices_list = devices.devices_list
+        supported_kinds = (devices.gate_types +
+                           [devices.SWITCH, devices.CLOCK, devices.SIGGEN,
+                            devices.D_TYPE])
+        for device in devices_list:
+            if device.device_kind not in supported_kinds:
+                return None
+
+        # net_names stores {(device_id, output_id): local_variable_name}
+        net_names = {}
+        for index, device in enumerate(devices_list):
+            for port_number, output_id in enumerate(device.outputs):
+                net_names[(device.device_id, output_id)] = "".join(
+                    ["n", str(index), "_", str(port_number)])
+
+        def get_kind(kind):
+            """Return [(index, device)] for devices of the given kind."""
+            return [(index, device) for index, device in
+                    enumerate(devices_list) if device.device_kind == kind
+                    and device.device_id not in self.network.cluster_devices]
+
+        def get_inputs(device):
+            """Return the net names of the device inputs, or None."""
+            inputs = [net_names.get(signal)
+                      for signal in device.inputs.values()]
+            if None in inputs:  # unconnected input
+                return None
+            return inputs
+
+        # net_stores stores {local_variable_name: output_in_device_object}
+        net_stores = {}
+        for index, device in enumerate(devices_list):
+            for port_number, output_id in enumerate(device.outputs):
+                net_stores[net_names[(device.device_id, output_id)]] = (
+                    "d%d.outputs[%r]" % (index, output_id))
+
+        def update(net, target):
+            """Return the lines moving net towards target."""
+            return ["v = NEXT[%s][%s]" % (net, target),
+                    "if v != %s:" % net,
+                    "    %s = v" % net,
+                    "    %s = v" % net_stores[net],
+                    "    steady = False"]
+
+        def toggle(net):
+            """Return the lines starting a clock or siggen edge on net."""
+            return ["if %s == %d:" % (net, HIGH),
+                    "    %s = %d" % (net, FALLING),
+                    "elif %s == %d:" % (net, LOW),
+                    "    %s = %d" % (net, RISING),
+                    "%s = %s" % (net_stores[net], net)]
+
+        tables = []
+        for number, cluster in enumerate(self.network.clusters):
+            tables.append("T%d" % number)
+
+        head = ["def execute_network(devices_list, NEXT=NEXT, LEVEL=LEVEL%s):"
+                % "".join([", %s=%s" % (table, table) for table in tables])]
+        # Loaded once when the simulation starts
+        load = []
+        for index, device in enumerate(devices_list):
+            load.append("d%d = devices_list[%d]" % (index, index))
+            for port_number, output_id in enumerate(device.outputs):
+                net = net_names[(device.device_id, output_id)]
+                load.append("%s = d%d.outputs[%r]" % (net, index, output_id))
+
+        # Per-cycle clock and siggen updates, as update_clocks/update_siggen.
+        # The counters are loaded and stored on every cycle, as run_cycles
+        # reads them and skip_cycles advances them.
+        counters = []
+        store = []
+        cycle = []
+        for index, device in get_kind(devices.CLOCK):
+            net = net_names[(device.device_id, None)]
+            counters.append("k%d = d%d.clock_counter" % (index, index))
+            store.append("d%d.clock_counter = k%d" % (index, index))
+            cycle += ["if k%d == d%d.clock_half_period:" % (index, index),
+                      "    k%d = 0" % index]
+            cycle += ["    " + line for line in toggle(net)]
+            cycle += ["k%d += 1" % index]
+        for index, device in get_kind(devices.SIGGEN):
+            net = net_names[(device.device_id, None)]
+            counters.append("c%d = d%d.siggen_counter" % (index, index))
+            counters.append("p%d = d%d.siggen_cursor" % (index, index))
+            store.append("d%d.siggen_counter = c%d" % (index, index))
+            store.append("d%d.siggen_cursor = p%d" % (index, index))
+            cycle += ["if c%d == d%d.siggen_period:" % (index, index),
+                      "    c%d = 0" % index,
+                      "    p%d = 0" % index,
+                      "    %s = d%d.initial_state" % (net, index),
+                      "    %s = %s" % (net_stores[net], net),
+                      "elif c%d == d%d.siggen_waveform[p%d]:" % (index, index,
+                                                               index),
+                      "    p%d += 1" % index]
+            cycle += ["    " + line for line in toggle(net)]
+            cycle += ["c%d += 1" % index]
+
+        # Device executions, in the order used by execute_network
+        body = []
+        for index, device in get_kind(devices.SWITCH):
+            net = net_names[(device.device_id, None)]
+            load.append("s%d = d%d.switch_state != %d" % (index, index, LOW))
+            body += update(net, "s%d" % index)
+        for index, device in get_kind(devices.D_TYPE):
+            inputs = get_inputs(device)
+            if inputs is None:
+                body += ["failed = True", "break"]
+                continue
+            signals = dict(zip(device.inputs, inputs))
+            clock = signals[devices.CLK_ID]
+            data = signals[devices.DATA_ID]
+            memory = "m%d" % index
+            load.append("%s = d%d.dtype_memory" % (memory, index))
+            body += ["if %s == %d:" % (clock, RISING),
+                     "    if %s == %d or %s == %d:" % (data, HIGH, data,
+                                                       FALLING),
+                     "        %s = %d" % (memory, HIGH),
+                     "    elif %s == %d or %s == %d:" % (data, LOW, data,
+                                                         RISING),
+                     "        %s = %d" % (memory, LOW),
+                     "    d%d.dtype_memory = %s" % (index, memory),
+                     "if %s == %d:" % (signals[devices.SET_ID], HIGH),
+                     "    %s = d%d.dtype_memory = %d" % (memory, index, HIGH),
+                     "if %s == %d:" % (signals[devices.CLEAR_ID], HIGH),
+                     "    %s = d%d.dtype_memory = %d" % (memory, index, LOW)]
+            body += update(net_names[(device.device_id, devices.Q_ID)],
+                           memory)
+            body += update(net_names[(device.device_id, devices.QBAR_ID)],
+                           "%d - %s" % (HIGH + LOW, memory))
+        for kind in [devices.CLOCK, devices.SIGGEN]:
+            for index, device in get_kind(kind):
+                net = net_names[(device.device_id, None)]
+                body += ["if %s == %d:" % (net, RISING),
+                         "    %s = %s = %d" % (net, net_stores[net], HIGH),
+                         "    steady = False",
+                         "elif %s == %d:" % (net, FALLING),
+                         "    %s = %s = %d" % (net, net_stores[net], LOW),
+                         "    steady = False"]
+        for kind in [devices.AND, devices.OR, devices.NAND, devices.NOR,
+                     devices.XOR, devices.XNOR]:
+            for index, device in get_kind(kind):
+                inputs = get_inputs(device)
+                if inputs is None:
+                    body += ["failed = True", "break"]
+                    continue
+                if kind in devices.parity_gate_types:
+                    # Compare each input with the result so far, as in
+                    # Network.get_parity
+                    if len(inputs) == 1:
+                        inputs = [str(LOW)] + inputs
+                    body += ["t = " + inputs[0]]
+                    for net in inputs[1:]:
+                        body += ["t = %d if %s != t else %d" % (HIGH, net,
+                                                                LOW)]
+                    if kind == devices.XNOR:
+                        body += ["t = %d - t" % (HIGH + LOW)]
+                else:
+                    (x, y) = self.network.gate_rules[kind]
+                    condition = " and ".join(["%s == %d" % (net, x)
+                                              for net in inputs])
+                    body += ["t = %d if %s else %d" % (
+                        y, condition, self.network.invert_signal(y))]
+                body += update(net_names[(device.device_id, None)], "t")
+        for number, cluster in enumerate(self.network.clusters):
+            terms = []
+            for bit, signal in enumerate(cluster.input_signals):
+                terms.append("LEVEL[%s] << %d" % (net_names[signal], bit))
+            body += ["t = T%d[%s]" % (number, " | ".join(terms))]
+            body += update(net_names[(cluster.root_id, None)], "t")
+
+        lines = head
+        lines += ["    " + line for line in load]
+        lines += ["    while True:"]
+        lines += ["        " + line for line in counters + cycle]
+        lines += ["        steady = True",
+                  "        failed = False",
+                  "        for _ in range(%d):" % self.iteration_limit,
+                  "            steady = True"]
+        lines += ["            " + line for line in body]
+        lines += ["            if steady:",
+                  "                break"]
+        lines += ["        " + line for line in store]
+        lines += ["        yield steady and not failed"]
+
+        # Constants bound as default arguments, so they are local variables
+        steady_state = self.network.steady_state
+        NEXT = []
+        for signal in [LOW, HIGH, RISING, FALLING]:
+            NEXT.append((self.network.update_signal(signal, LOW),
+                         self.network.update_signal(signal, HIGH)))
+        self.network.steady_state = steady_state
+        constants = ["NEXT = %r" % (tuple(NEXT),),
+                     "LEVEL = %r" % (tuple(self.network.target_levels[:4]),)]
+        for number, cluster in enumerate(self.network.clusters):
+            constants.append("T%d = bytes.fromhex(%r)" % (
+                number, cluster.table.hex()))
+        return "\n".join(constants + lines) + "\n"
+
+    def compile_network(self):
+        """Compile the generator simulating the current network.
+
+        Code is reused from the cache when a network with the same structure
+        has already been compiled. The simulation is started again.
+        """
+        self.netlist_changes = self.devices.netlist_changes
+        self.signature = self.get_signature()
+        netlist_hash = hashlib.sha1(
+            repr(self.signature).encode("utf-8")).hexdigest()
+        if netlist_hash not in self.code_cache:
+            source = self.generate_source()
+            if source is None:
+                self.code_cache[netlist_hash] = None
+            else:
+                self.code_cache[netlist_hash] = compile(
+                    source, "<network %s>" % netlist_hash[:8], "exec")
+        code = self.code_cache[netlist_hash]
+        if code is None:
+            self.function = None
+        else:
+            namespace = {}
+            exec(code, namespace)
+            self.function = namespace["execute_network"]
+        self.start()
+
+    def start(self):
+        """Start the simulation from the state of the devices.
+
+        This is done by execute_network when devices.state_changes moves,
+        and is needed if the outputs or D-type memories of the Device
+        objects are written without incrementing it.
+        """
+        self.state_changes = self.devices.state_changes
+        if self.function is None:
+            self.simulation = None
+        else:
+            self.simulation = self.function(self.devices.devices_list)
+
+    def execute_network(self):
+        """Execute all the devices in the network for one simulation cycle.
+
+        Return True if successful and the network does not oscillate.
+        """
+        if self.devices.netlist_changes != self.netlist_changes:
+            self.compile_network()
+        elif self.devices.state_changes != self.state_changes:
+            self.start()
+        if self.simulation is None:  # unsupported devices in the network
+            return self.network.execute_network()
+        self.network.steady_state = next(self.simulation)
+        return self.network.steady_state
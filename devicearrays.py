@@ -0,0 +1,464 @@
+"""Store devices in parallel arrays, for very large networks.
+
+Used in the Logic Simulator project in place of devices.Devices when a
+network has too many devices to keep a Device object, with its own inputs
+and outputs dictionaries, for each of them. Device kinds, ports, connections
+and output signals are held in flat arrays indexed by a dense device index,
+and the other device properties in lists which are only created once some
+device sets them. Device objects are replaced by views made on demand, which
+read and write the arrays, so the parser, network and monitors work
+unchanged.
+
+Classes
+-------
+PortMap - presents the inputs or outputs of one device as a dictionary.
+DeviceView - presents one device in the arrays as a devices.Device.
+DeviceList - presents all the devices in the arrays as a list of views.
+ArrayDevices - makes and stores devices in parallel arrays.
+"""
+import collections.abc
+import copy
+from array import array
+
+from devices import Device, Devices
+
+# Stored in place of None in the arrays of device kinds and port IDs
+NO_ID = -1
+
+# Device properties kept in lists, in addition to the ID, kind and ports
+PROPERTIES = [name for name in Device.__slots__
+              if name not in ["device_id", "device_kind", "inputs",
+                              "outputs"]]
+
+
+class PortMap(collections.abc.Mapping):
+    """Present the inputs or outputs of one device as a dictionary.
+
+    Input values are (connected_output_device_id, connected_output_port_id),
+    or None if the input is unconnected, and output values are signals, as
+    in devices.Device. Setting a new port adds it to the device. values()
+    and items() return lists, so ports may be set while iterating over them.
+
+    Parameters
+    ----------
+    devices: instance of the ArrayDevices() class.
+    index: index of the device in the arrays.
+    inputs: True for the inputs of the device, False for its outputs.
+
+    Public methods
+    --------------
+    values(self): Returns the list of port values.
+
+    items(self): Returns the list of (port_id, value) pairs.
+
+    setdefault(self, port_id, value=None): Returns the value of the port,
+                                           adding it with value if missing.
+    """
+
+    __slots__ = ["devices", "index", "inputs"]
+
+    def __init__(self, devices, index, inputs):
+        """Initialise the device and the ports presented."""
+        self.devices = devices
+        self.index = index
+        self.inputs = inputs
+
+    def get_span(self):
+        """Return [start, stop, port_ids] of the ports in the flat arrays."""
+        devices = self.devices
+        if self.inputs:
+            start = devices.input_starts[self.index]
+            return [start, start + devices.input_counts[self.index],
+                    devices.input_ports]
+        start = devices.output_starts[self.index]
+        return [start, start + devices.output_counts[self.index],
+                devices.output_ports]
+
+    def find(self, port_id):
+        """Return the position of the port in the flat arrays, or None."""
+        [start, stop, port_ids] = self.get_span()
+        try:
+            return start + port_ids[start:stop].index(
+                NO_ID if port_id is None else port_id)
+        except ValueError:
+            return None
+
+    def get_value(self, position):
+        """Return the value of the port at position in the flat arrays."""
+        devices = self.devices
+        if not self.inputs:
+            return devices.output_signals[position]
+        source_id = devices.input_sources[position]
+        if source_id == NO_ID:  # unconnected input
+            return None
+        source_port = devices.input_source_ports[position]
+        return (source_id, None if source_port == NO_ID else source_port)
+
+    def __getitem__(self, port_id):
+        """Return the value of the port."""
+        position = self.find(port_id)
+        if position is None:
+            raise KeyError(port_id)
+        return self.get_value(position)
+
+    def __setitem__(self, port_id, value):
+        """Set the value of the port, adding the port if it is missing."""
+        position = self.find(port_id)
+        if position is None:
+            position = self.devices.add_port(self.index, port_id, self.inputs)
+        devices = self.devices
+        if not self.inputs:
+            devices.output_signals[position] = value
+        elif value is None:
+            devices.input_sources[position] = NO_ID
+        else:
+            [source_id, source_port] = value
+            devices.input_sources[position] = source_id
+            devices.input_source_ports[position] = (
+                NO_ID if source_port is None else source_port)
+
+    def __iter__(self):
+        """Iterate over the port IDs."""
+        [start, stop, port_ids] = self.get_span()
+        for position in range(start, stop):
+            port_id = port_ids[position]
+            yield None if port_id == NO_ID else port_id
+
+    def __len__(self):
+        """Return the number of ports."""
+        [start, stop, port_ids] = self.get_span()
+        return stop - start
+
+    def values(self):
+        """Return the list of port values, in port order."""
+        [start, stop, port_ids] = self.get_span()
+        if not self.inputs:
+            return list(self.devices.output_signals[start:stop])
+        return [self.get_value(position) for position in range(start, stop)]
+
+    def items(self):
+        """Return the list of (port_id, value) pairs, in port order."""
+        return list(zip(self, self.values()))
+
+    def setdefault(self, port_id, value=None):
+        """Return the value of the port, adding it with value if missing."""
+        if port_id not in self:
+            self[port_id] = value
+        return self[port_id]
+
+    def __reduce__(self):
+        """Pickle as a plain dictionary, without the arrays."""
+        return (dict, (dict(self.items()),))
+
+    def __repr__(self):
+        """Return the representation of the equivalent dictionary."""
+        return repr(dict(self.items()))
+
+
+class DeviceView:
+    """Present one device in the arrays as a devices.Device.
+
+    Views of the same device compare equal. A view is copied along with its
+    arrays, but pickled as a separate devices.Device, so that the devices
+    sent to worker processes do not carry the whole network with them.
+
+    Parameters
+    ----------
+    devices: instance of the ArrayDevices() class.
+    index: index of the device in the arrays.
+
+    Public methods
+    --------------
+    No public methods.
+    """
+
+    __slots__ = ["devices", "index"]
+
+    def __init__(self, devices, index):
+        """Initialise the device presented."""
+        self.devices = devices
+        self.index = index
+
+    @property
+    def device_id(self):
+        """Return the device ID."""
+        return self.devices.device_ids[self.index]
+
+    @property
+    def device_kind(self):
+        """Return the device kind, or None."""
+        device_kind = self.devices.device_kinds[self.index]
+        return None if device_kind == NO_ID else device_kind
+
+    @device_kind.setter
+    def device_kind(self, device_kind):
+        """Set the device kind."""
+        self.devices.device_kinds[self.index] = (
+            NO_ID if device_kind is None else device_kind)
+
+    @property
+    def inputs(self):
+        """Return the inputs of the device as a PortMap."""
+        return PortMap(self.devices, self.index, True)
+
+    @property
+    def outputs(self):
+        """Return the outputs of the device as a PortMap."""
+        return PortMap(self.devices, self.index, False)
+
+    @outputs.setter
+    def outputs(self, outputs):
+        """Set the signals of the outputs in the outputs dictionary."""
+        device_outputs = self.outputs
+        for output_id, signal in outputs.items():
+            device_outputs[output_id] = signal
+
+    def __eq__(self, other):
+        """Return True if the other view presents the same device."""
+        if not isinstance(other, DeviceView):
+            return NotImplemented
+        return self.devices is other.devices and self.index == other.index
+
+    def __hash__(self):
+        """Return a hash of the device index."""
+        return hash(self.index)
+
+    def __copy__(self):
+        """Return another view of the same device."""
+        return DeviceView(self.devices, self.index)
+
+    def __deepcopy__(self, memo):
+        """Return a view of the device in a copy of the arrays."""
+        return DeviceView(copy.deepcopy(self.devices, memo), self.index)
+
+    def __reduce__(self):
+        """Pickle as a devices.Device holding the same properties."""
+        state = {name: getattr(self, name) for name in PROPERTIES}
+        state.update({"device_kind": self.device_kind,
+                      "inputs": dict(self.inputs.items()),
+                      "outputs": dict(self.outputs.items())})
+        return (Device, (self.device_id,), (None, state))  # slots only
+
+
+def make_property(name):
+    """Return a property reading and writing the named property list."""
+    def get_property(view):
+        column = view.devices.properties.get(name)
+        if column is None:  # no device has set this property
+            return None
+        return column[view.index]
+
+    def set_property(view, value):
+        devices = view.devices
+        column = devices.properties.get(name)
+        if column is None:
+            if value is None:
+                return
+            column = devices.properties[name] = [None] * len(
+                devices.device_ids)
+        column[view.index] = value
+
+    return property(get_property, set_property)
+
+
+for property_name in PROPERTIES:
+    setattr(DeviceView, property_name, make_property(property_name))
+
+
+class DeviceList(collections.abc.Sequence):
+    """Present all the devices in the arrays as a list of views.
+
+    Parameters
+    ----------
+    devices: instance of the ArrayDevices() class.
+
+    Public methods
+    --------------
+    No public methods.
+    """
+
+    def __init__(self, devices):
+        """Initialise the devices presented."""
+        self.devices = devices
+
+    def __getitem__(self, index):
+        """Return the view at index, or a list of views for a slice."""
+        count = len(self.devices.device_ids)
+        if isinstance(index, slice):
+            return [DeviceView(self.devices, position)
+                    for position in range(*index.indices(count))]
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("device index out of range")
+        return DeviceView(self.devices, index)
+
+    def __iter__(self):
+        """Iterate over the views of the devices, in the order added."""
+        for index in range(len(self.devices.device_ids)):
+            yield DeviceView(self.devices, index)
+
+    def __len__(self):
+        """Return the number of devices."""
+        return len(self.devices.device_ids)
+
+    def __eq__(self, other):
+        """Return True if other lists the same devices."""
+        if isinstance(other, (list, DeviceList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+class ArrayDevices(Devices):
+    """Make and store devices in parallel arrays.
+
+    A drop-in replacement for devices.Devices for very large networks. Each
+    device is identified by its index in the arrays, in the order the
+    devices were added. Device IDs, kinds and port counts take a few bytes
+    per device, and each port a few bytes more, instead of a Device object
+    and two dictionaries per device. get_device is a single array lookup.
+    Other properties, such as clock_counter, are kept in lists created when
+    a device first sets them, so a network of gates holds none of them.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+
+    Public methods
+    --------------
+    get_index(self, device_id): Returns the index of the device in the
+                                arrays, or None.
+
+    add_port(self, index, port_id, inputs): Adds a port to the device at
+                                            index and returns its position
+                                            in the flat port arrays.
+
+    All the public methods of devices.Devices are available.
+    """
+
+    def __init__(self, names):
+        """Initialise the device arrays and constants."""
+        super().__init__(names)
+        self.device_ids = array("q")
+        self.device_kinds = array("q")
+        # device_indices stores the index of each device, indexed by ID
+        self.device_indices = array("q")
+
+        # Ports of each device are contiguous in the flat port arrays
+        self.input_starts = array("q")
+        self.input_counts = array("q")
+        self.input_ports = array("q")
+        self.input_sources = array("q")  # NO_ID if unconnected
+        self.input_source_ports = array("q")
+        self.output_starts = array("q")
+        self.output_counts = array("q")
+        self.output_ports = array("q")
+        self.output_signals = array("b")
+
+        # properties stores {property_name: [value]}, indexed by device index
+        self.properties = {}
+        self.devices_list = DeviceList(self)
+
+    def get_index(self, device_id):
+        """Return the index of the device in the arrays, or None."""
+        if not isinstance(device_id, int) or device_id < 0:
+            return None
+        if device_id >= len(self.device_indices):
+            return None
+        index = self.device_indices[device_id]
+        return None if index == NO_ID else index
+
+    def get_device(self, device_id):
+        """Return a view of the device corresponding to device_id."""
+        index = self.get_index(device_id)
+        if index is None:
+            return None
+        return DeviceView(self, index)
+
+    def find_devices(self, device_kind=None):
+        """Return a list of device IDs of the specified device_kind.
+
+        Return a list of all device IDs in the network if no device_kind is
+        specified.
+        """
+        if device_kind is None:
+            return list(self.device_ids)
+        return [device_id for device_id, kind
+                in zip(self.device_ids, self.device_kinds)
+                if kind == device_kind]
+
+    def add_device(self, device_id, device_kind):
+        """Add the specified device to the network."""
+        index = len(self.device_ids)
+        if device_id >= len(self.device_indices):
+            self.device_indices.extend(
+                [NO_ID] * (device_id + 1 - len(self.device_indices)))
+        self.device_indices[device_id] = index
+        self.device_ids.append(device_id)
+        self.device_kinds.append(NO_ID if device_kind is None else
+                                 device_kind)
+        self.input_starts.append(len(self.input_ports))
+        self.input_counts.append(0)
+        self.output_starts.append(len(self.output_ports))
+        self.output_counts.append(0)
+        for column in self.properties.values():
+            column.append(None)
+        self.netlist_changes += 1
+
+    def add_port(self, index, port_id, inputs):
+        """Add a port to the device at index.
+
+        Return the position of the new port in the flat port arrays. The
+        ports of a device which is not the last to have added one are moved
+        to the end of the arrays first, leaving a gap behind.
+        """
+        if inputs:
+            [starts, counts] = [self.input_starts, self.input_counts]
+            columns = [self.input_ports, self.input_sources,
+                       self.input_source_ports]
+            values = [NO_ID if port_id is None else port_id, NO_ID, NO_ID]
+        else:
+            [starts, counts] = [self.output_starts, self.output_counts]
+            columns = [self.output_ports, self.output_signals]
+            values = [NO_ID if port_id is None else port_id, self.LOW]
+        start = starts[index]
+        count = counts[index]
+        if start + count != len(columns[0]):  # move the ports to the end
+            starts[index] = len(columns[0])
+            for column in columns:
+                column.extend(column[start:start + count])
+        position = len(columns[0])
+        for column, value in zip(columns, values):
+            column.append(value)
+        counts[index] = count + 1
+        return position
+
+    def add_input(self, device_id, input_id):
+        """Add the specified input to the specified device.
+
+        Return True if successful.
+        """
+        index = self.get_index(device_id)
+        if index is None:
+            return False
+        inputs = PortMap(self, index, True)
+        if input_id not in inputs:
+            self.netlist_changes += 1
+        inputs.setdefault(input_id)
+        return True
+
+    def add_output(self, device_id, output_id, signal=0):
+        """Add the specified output to the specified device.
+
+        Return True if successful. The default output signal is LOW (0).
+        """
+        index = self.get_index(device_id)
+        if index is None:
+            return False
+        outputs = PortMap(self, index, False)
+        if output_id not in outputs:
+            self.netlist_changes += 1
+        else:
+            self.state_changes += 1
+        outputs[output_id] = signal
+        return True
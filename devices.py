@@ -10,10 +10,16 @@ Devices - makes and stores all the devices in the logic network.
 """
 import random
 
+from memory import RomImage
+from waveform import Waveform, WaveformFile, parse_waveform
+
 
 class Device:
     """Store device properties.
 
+    One device is made for every gate in the network, so its properties are
+    kept in slots rather than an instance dictionary.
+
     Parameters
     ----------
     device_id: device ID.
@@ -23,6 +29,14 @@ class Device:
     No public methods.
     """
 
+    __slots__ = ["device_id", "inputs", "outputs", "device_kind",
+                 "clock_half_period", "clock_counter", "switch_state",
+                 "dtype_memory", "siggen_period", "siggen_waveform",
+                 "siggen_counter", "siggen_cursor", "initial_state",
+                 "register_width", "register_state", "memory_address_bits",
+                 "memory_data_bits", "memory_file", "memory",
+                 "memory_writes"]
+
     def __init__(self, device_id):
         """Initialise device properties."""
         self.device_id = device_id
@@ -40,9 +54,22 @@ class Device:
         self.switch_state = None
         self.dtype_memory = None
         self.siggen_period = None  # Int, total period of siggen waveform.
-        self.siggen_waveform = None  # List of integers, represents period.
+        # waveform.Waveform or WaveformFile, switching points of the period.
+        self.siggen_waveform = None
         self.siggen_counter = None  # Int, counter for siggen.
+        # Int, index in siggen_waveform of the next switching point
+        self.siggen_cursor = None
         self.initial_state = None  # Initial state of siggen.
+        # Int, number of bits of a register, counter or shift register.
+        self.register_width = None
+        self.register_state = None  # Int, value stored in the register.
+        self.memory_address_bits = None  # Int, address width of ROM or RAM.
+        self.memory_data_bits = None  # Int, data width of ROM or RAM.
+        self.memory_file = None  # memory.RomImage of a ROM.
+        # Contents of a ROM or RAM, a memory.RomImage or a bytearray.
+        self.memory = None
+        # Int, number of times the contents of a RAM have changed.
+        self.memory_writes = None
 
 
 class Devices:
@@ -81,8 +108,8 @@ class Devices:
     set_switch(self, device_id, signal): Sets switch_state of specified device
                                          to signal.
 
-    get_siggen_waveform(self, waveform): Return a list of cumulative period
-                                         integers for siggen waveform.
+    get_siggen_waveform(self, waveform): Return the cumulative switching
+                                         points of the siggen waveform.
 
     get_starting_state(self, waveform): Return starting state of the siggen.
 
@@ -100,13 +127,33 @@ class Devices:
 
     make_d_type(self, device_id): Makes a D-type device.
 
-    cold_startup(self): Simulates cold start-up of D-types and clocks,
-                        and resets siggen devices to their initial state.
+    get_indexed_port_ids(self, prefix, count): Returns the name IDs of the
+                                               indexed ports prefix0 to
+                                               prefix<count - 1>.
+
+    is_indexed_port(self, port_name, input_port=True): Checks if port_name is
+                                                       an indexed input or
+                                                       output port name.
+
+    make_register(self, device_id, device_kind, width): Makes a register,
+                                counter or shift register of the given width.
+
+    make_memory(self, device_id, device_kind, memory_file, address_bits,
+                data_bits): Makes a ROM of the memory file, or a RAM if
+                            memory_file is None.
+
+    cold_startup(self): Simulates cold start-up of D-types, registers and
+                        clocks, resets siggen devices to their initial
+                        state, and clears RAMs.
 
     check_waveform(self, device_property): Checks if device_property of a
                                            SIGGEN waveform is in the correct
                                            format.
 
+    check_memory(self, device_kind, device_property): Checks if
+                                device_property of a ROM or RAM is in the
+                                correct format.
+
     make_device(self, device_id, device_kind, device_property=None): Creates
                        the specified device and returns errors if unsuccessful.
     """
@@ -116,9 +163,18 @@ class Devices:
         self.names = names
 
         self.devices_list = []
-
-        gate_strings = ["AND", "OR", "NAND", "NOR", "XOR"]
+        # netlist_changes is incremented whenever a device, port or
+        # connection is added, and state_changes whenever device states are
+        # changed other than by the code generated for the network, so that
+        # the generated code can tell when it is out of date. Code writing
+        # outputs or device states directly must increment state_changes.
+        self.netlist_changes = 0
+        self.state_changes = 0
+
+        gate_strings = ["AND", "OR", "NAND", "NOR", "XOR", "XNOR"]
         device_strings = ["CLOCK", "SWITCH", "DTYPE", "SIGGEN"]
+        register_strings = ["REGISTER", "COUNTER", "SHIFTREG"]
+        memory_strings = ["ROM", "RAM"]
         dtype_inputs = ["CLK", "SET", "CLEAR", "DATA"]
         dtype_outputs = ["Q", "QBAR"]
 
@@ -128,16 +184,35 @@ class Devices:
 
         self.signal_types = [self.LOW, self.HIGH, self.RISING,
                              self.FALLING, self.BLANK] = range(5)
-        self.gate_types = [self.AND, self.OR, self.NAND, self.NOR,
-                           self.XOR] = self.names.lookup(gate_strings)
+        self.gate_types = [self.AND, self.OR, self.NAND, self.NOR, self.XOR,
+                           self.XNOR] = self.names.lookup(gate_strings)
+        # Parity gates default to two inputs
+        self.parity_gate_types = [self.XOR, self.XNOR]
         self.device_types = [self.CLOCK, self.SWITCH, self.D_TYPE,
                              self.SIGGEN] = self.names.lookup(device_strings)
         self.dtype_input_ids = [self.CLK_ID, self.SET_ID, self.CLEAR_ID,
                                 self.DATA_ID] = self.names.lookup(dtype_inputs)
         self.dtype_output_ids = [
             self.Q_ID, self.QBAR_ID] = self.names.lookup(dtype_outputs)
-
-        self.max_gate_inputs = 16
+        self.register_types = [
+            self.REGISTER, self.COUNTER,
+            self.SHIFTREG] = self.names.lookup(register_strings)
+        self.memory_types = [self.ROM, self.RAM] = self.names.lookup(
+            memory_strings)
+        [self.WE_ID] = self.names.lookup(["WE"])  # RAM write enable
+
+        # Prefixes of indexed port names, such as D0, I17 and Q31
+        self.indexed_input_prefixes = ["D", "A", "I"]
+        self.indexed_output_prefixes = ["Q"]
+        # indexed_port_ids stores {(prefix, count): [port_id]}
+        self.indexed_port_ids = {}
+
+        self.max_gate_inputs = 1024
+        # I1 to I16 name gate inputs whether or not a gate has them
+        self.named_gate_inputs = 16
+        self.max_register_width = 64
+        self.max_address_bits = 24
+        self.max_data_bits = 64
 
     def get_device(self, device_id):
         """Return the Device object corresponding to device_id."""
@@ -165,6 +240,7 @@ class Devices:
         new_device = Device(device_id)
         new_device.device_kind = device_kind
         self.devices_list.append(new_device)
+        self.netlist_changes += 1
 
     def add_input(self, device_id, input_id):
         """Add the specified input to the specified device.
@@ -173,6 +249,8 @@ class Devices:
         """
         device = self.get_device(device_id)
         if device is not None:
+            if input_id not in device.inputs:
+                self.netlist_changes += 1
             device.inputs.setdefault(input_id)
             return True
         else:
@@ -185,6 +263,10 @@ class Devices:
         """
         device = self.get_device(device_id)
         if device is not None:
+            if output_id not in device.outputs:
+                self.netlist_changes += 1
+            else:
+                self.state_changes += 1
             device.outputs[output_id] = signal
             return True
         else:
@@ -235,36 +317,31 @@ class Devices:
             return False
         else:
             device.switch_state = signal
+            self.state_changes += 1
             return True
 
     def get_siggen_waveform(self, waveform):
-        """Return list of cumulative period integers for siggen waveform."""
-        logic_list = []
-        previous_state = ""
-        total_period = 0
-
-        # Converting waveform string into cumulative periods.
-        for index, logic in enumerate(waveform):
-            if index == 0:
-                pass
-            else:
-                if ((logic == "_" and previous_state == "-") or
-                        (logic == "-" and previous_state == "_")):
-                    logic_list.append(total_period)
-            # Update previous logic state, and total period.
-            previous_state = logic
-            total_period += 1
-
-        # For last waveform period.
-        logic_list.append(total_period)
+        """Return the cumulative switching points of the siggen waveform.
 
-        return logic_list
+        waveform is a string in the repeat syntax of the waveform module, or
+        a waveform.WaveformFile, which is returned as it is. A string is
+        returned as a waveform.Waveform, which only expands its repeats as
+        far as the switching points are read.
+        """
+        if isinstance(waveform, WaveformFile):
+            return waveform
+        return Waveform(waveform)
 
     def get_starting_state(self, waveform):
         """Return starting logic state for the siggen."""
-        if waveform[0] == "_":
+        if isinstance(waveform, WaveformFile):
+            first_level = waveform.first_level
+        else:
+            # A waveform starts with a level, possibly inside groups
+            first_level = waveform.lstrip("[")[:1]
+        if first_level == "_":
             return self.LOW
-        elif waveform[0] == "-":
+        elif first_level == "-":
             return self.HIGH
         else:
             return None
@@ -289,10 +366,11 @@ class Devices:
     def make_siggen(self, device_id, waveform):
         """Make a SIGGEN device with the user-specified waveform.
 
-        Waveform is a string, consisting of dashes and underscores.
-        Dashes represent logic high, underscores represent logic low.
-        Period is the number of simulation cycles before waveform
-        repeats itself.
+        Waveform is a string, consisting of dashes and underscores, which
+        may be shortened with the repeat syntax of the waveform module, or a
+        waveform.WaveformFile. Dashes represent logic high, underscores
+        represent logic low. Period is the number of simulation cycles before
+        waveform repeats itself.
         """
         # Add siggen to device_list.
         self.add_device(device_id, self.SIGGEN)
@@ -306,15 +384,18 @@ class Devices:
         self.add_output(device.device_id, output_id=None,
                         signal=starting_state)
         device.siggen_counter = 0
+        device.siggen_cursor = 0
 
     def make_gate(self, device_id, device_kind, no_of_inputs):
-        """Make logic gates with the specified number of inputs."""
+        """Make logic gates with the specified number of inputs.
+
+        The inputs are named I1 to I<no_of_inputs>.
+        """
         self.add_device(device_id, device_kind)
         self.add_output(device_id, output_id=None)
 
-        for input_number in range(1, no_of_inputs + 1):
-            input_name = "".join(["I", str(input_number)])
-            [input_id] = self.names.lookup([input_name])
+        input_ids = self.get_indexed_port_ids("I", no_of_inputs + 1)
+        for input_id in input_ids[1:]:
             self.add_input(device_id, input_id)
 
     def make_d_type(self, device_id):
@@ -326,18 +407,106 @@ class Devices:
             self.add_output(device_id, output_id)
         self.cold_startup()  # D-type initialised to a random state
 
+    def get_indexed_port_ids(self, prefix, count):
+        """Return the name IDs of the ports prefix0 to prefix<count - 1>."""
+        key = (prefix, count)
+        if key not in self.indexed_port_ids:
+            self.indexed_port_ids[key] = self.names.lookup(
+                [prefix + str(index) for index in range(count)])
+        return self.indexed_port_ids[key]
+
+    def is_indexed_port(self, port_name, input_port=True):
+        """Return True if port_name is an indexed port name, such as D0.
+
+        Gate inputs are I1 to I<max_gate_inputs>. Whether the port exists on
+        a device is not checked.
+        """
+        if input_port:
+            prefixes = self.indexed_input_prefixes
+        else:
+            prefixes = self.indexed_output_prefixes
+        prefix = port_name.rstrip("0123456789")
+        index = port_name[len(prefix):]
+        if (prefix not in prefixes or index == "" or
+                (index != "0" and index.startswith("0"))):
+            return False
+        if prefix == "I":
+            return int(index) in range(1, self.max_gate_inputs + 1)
+        return True
+
+    def make_register(self, device_id, device_kind, width):
+        """Make a register, counter or shift register of the given width.
+
+        All three have CLK and CLEAR inputs and outputs Q0 to Q<width - 1>,
+        holding the bits of an integer, least significant first. A register
+        loads its inputs D0 to D<width - 1> on a rising clock edge, a counter
+        counts up, and a shift register shifts its DATA input into Q0.
+        """
+        self.add_device(device_id, device_kind)
+        device = self.get_device(device_id)
+        device.register_width = width
+        for input_id in [self.CLK_ID, self.CLEAR_ID]:
+            self.add_input(device_id, input_id)
+        if device_kind == self.REGISTER:
+            for input_id in self.get_indexed_port_ids("D", width):
+                self.add_input(device_id, input_id)
+        elif device_kind == self.SHIFTREG:
+            self.add_input(device_id, self.DATA_ID)
+        for output_id in self.get_indexed_port_ids("Q", width):
+            self.add_output(device_id, output_id)
+        self.cold_startup()  # register initialised to a random state
+
+    def make_memory(self, device_id, device_kind, memory_file, address_bits,
+                    data_bits):
+        """Make a ROM of the memory file, or a RAM if memory_file is None.
+
+        Both have address inputs A0 to A<address_bits - 1> and outputs Q0 to
+        Q<data_bits - 1>, which show the word at the address. Words are
+        stored little-endian in whole bytes. A RAM also has data inputs D0 to
+        D<data_bits - 1>, written on a rising edge of CLK while WE is HIGH,
+        and its contents are held in a bytearray.
+        """
+        self.add_device(device_id, device_kind)
+        device = self.get_device(device_id)
+        device.memory_address_bits = address_bits
+        device.memory_data_bits = data_bits
+        for input_id in self.get_indexed_port_ids("A", address_bits):
+            self.add_input(device_id, input_id)
+        if device_kind == self.RAM:
+            for input_id in self.get_indexed_port_ids("D", data_bits):
+                self.add_input(device_id, input_id)
+            for input_id in [self.WE_ID, self.CLK_ID]:
+                self.add_input(device_id, input_id)
+            word_size = (data_bits + 7) // 8
+            device.memory = bytearray(word_size << address_bits)
+            device.memory_writes = 0
+        else:
+            device.memory_file = memory_file
+            device.memory = memory_file
+        for output_id in self.get_indexed_port_ids("Q", data_bits):
+            self.add_output(device_id, output_id)
+
     def cold_startup(self):
-        """Simulate cold start-up of D-types and clocks.
+        """Simulate cold start-up of D-types, registers and clocks.
 
-        Set the memory of the D-types to a random state and make the clocks
-        begin from a random point in their cycles.
+        Set the memory of the D-types and registers to a random state and
+        make the clocks begin from a random point in their cycles.
 
         Resets all siggen devices to their original, initial state.
         """
+        self.state_changes += 1
         for device in self.devices_list:
             if device.device_kind == self.D_TYPE:
                 device.dtype_memory = random.choice([self.LOW, self.HIGH])
 
+            elif device.device_kind in self.register_types:
+                device.register_state = random.getrandbits(
+                    device.register_width)
+
+            elif device.device_kind == self.RAM:
+                device.memory[:] = bytes(len(device.memory))
+                device.memory_writes += 1
+
             elif device.device_kind == self.CLOCK:
                 clock_signal = random.choice([self.LOW, self.HIGH])
                 self.add_output(device.device_id, output_id=None,
@@ -348,6 +517,7 @@ class Devices:
 
             elif device.device_kind == self.SIGGEN:
                 device.siggen_counter = 0  # Reset siggen devices.
+                device.siggen_cursor = 0
                 self.add_output(device.device_id, output_id=None,
                                 signal=device.initial_state)
 
@@ -356,11 +526,32 @@ class Devices:
 
         Return True if device_property is in correct format. False otherwise.
         """
-        for logic in device_property:
-            if (logic != "_" and logic != "-"):
-                return False
+        if isinstance(device_property, WaveformFile):
+            return True  # checked when the file was opened
+        try:
+            parse_waveform(device_property)
+        except (TypeError, ValueError):
+            return False
         return True
 
+    def check_memory(self, device_kind, device_property):
+        """Check device_property of a ROM or RAM device.
+
+        Return True if device_property is in correct format. False otherwise.
+        """
+        if not isinstance(device_property, (list, tuple)):
+            return False
+        if device_kind == self.ROM:
+            if (len(device_property) != 3 or
+                    not isinstance(device_property[0], RomImage)):
+                return False
+            device_property = device_property[1:]
+        if len(device_property) != 2:
+            return False
+        [address_bits, data_bits] = device_property
+        return (address_bits in range(1, self.max_address_bits + 1) and
+                data_bits in range(1, self.max_data_bits + 1))
+
     def make_device(self, device_id, device_kind, device_property=None):
         """Create the specified device.
 
@@ -391,7 +582,7 @@ class Devices:
                 error_type = self.NO_ERROR
 
         elif device_kind == self.SIGGEN:
-            # Device property is the SIGGEN waveform string.
+            # Device property is the SIGGEN waveform string or file.
             if device_property is None:
                 error_type = self.NO_QUALIFIER
             # Check if device_property is in correct format.
@@ -403,20 +594,16 @@ class Devices:
 
         elif device_kind in self.gate_types:
             # Device property is the number of inputs
-            if device_kind == self.XOR:
-                if device_property is not None:
-                    error_type = self.QUALIFIER_PRESENT
-                else:
-                    self.make_gate(device_id, device_kind, 2)
-                    error_type = self.NO_ERROR
-            else:  # other gates
-                if device_property is None:
-                    error_type = self.NO_QUALIFIER
-                elif device_property not in range(1, 17):  # between 1 and 16
-                    error_type = self.INVALID_QUALIFIER
-                else:
-                    self.make_gate(device_id, device_kind, device_property)
-                    error_type = self.NO_ERROR
+            if (device_property is None and
+                    device_kind in self.parity_gate_types):
+                device_property = 2
+            if device_property is None:
+                error_type = self.NO_QUALIFIER
+            elif device_property not in range(1, self.max_gate_inputs + 1):
+                error_type = self.INVALID_QUALIFIER
+            else:
+                self.make_gate(device_id, device_kind, device_property)
+                error_type = self.NO_ERROR
 
         elif device_kind == self.D_TYPE:
             if device_property is not None:
@@ -425,6 +612,29 @@ class Devices:
                 self.make_d_type(device_id)
                 error_type = self.NO_ERROR
 
+        elif device_kind in self.memory_types:
+            # Device property is (memory_file, address_bits, data_bits) for
+            # a ROM, and (address_bits, data_bits) for a RAM
+            if device_property is None:
+                error_type = self.NO_QUALIFIER
+            elif not self.check_memory(device_kind, device_property):
+                error_type = self.INVALID_QUALIFIER
+            else:
+                if device_kind == self.RAM:
+                    device_property = (None,) + tuple(device_property)
+                self.make_memory(device_id, device_kind, *device_property)
+                error_type = self.NO_ERROR
+
+        elif device_kind in self.register_types:
+            # Device property is the width in bits
+            if device_property is None:
+                error_type = self.NO_QUALIFIER
+            elif device_property not in range(1, self.max_register_width + 1):
+                error_type = self.INVALID_QUALIFIER
+            else:
+                self.make_register(device_id, device_kind, device_property)
+                error_type = self.NO_ERROR
+
         else:
             error_type = self.BAD_DEVICE
 
@@ -5,21 +5,418 @@ or adjust the network properties.
 
 Classes:
 --------
+TraceBuffer - stores the geometry and summary of a monitor trace.
+GlyphAtlas - stores pre-rasterised glyphs in a texture for drawing text.
 MyGLCanvas - handles all canvas drawing operations.
+SignalList - shows a long, searchable list of names in a virtual list.
 Gui - configures the main window and all the widgets.
 """
 import wx
 import wx.glcanvas as wxcanvas
 import numpy as np
 import math
-from OpenGL import GL, GLU, GLUT
+import bisect
+import threading
+import time
+from OpenGL import GL, GLU
 
-from names import Names
-from devices import Devices
-from network import Network
-from monitors import Monitors
-from scanner import Scanner
-from parse import Parser
+from hotreload import parse_file, apply_changes, Netlist, FileWatcher
+
+
+class TraceBuffer:
+    """Store the geometry and multi-resolution summary of a monitor trace.
+
+    In full detail, the trace is drawn as a single line strip with two
+    vertices per cycle, in coordinates relative to the start of the trace.
+    Vertices are kept in a NumPy array and uploaded to a vertex buffer object
+    the first time they are drawn. When the simulation continues, only the
+    vertices of the new cycles are built and uploaded.
+
+    For zoomed out views, the trace is also summarised in a min/max pyramid:
+    level k holds, for each bucket of 2**k cycles, the lowest and highest
+    level the signal takes in the bucket (0 for LOW, 1 for HIGH). A bucket
+    holding only BLANK signals has a minimum above its maximum.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+    signal_list: list of signal levels recorded by the monitor.
+    cycle_width: width of one cycle.
+    height: vertical distance between the LOW and HIGH levels.
+
+    Public methods
+    --------------
+    update(self, cycles): Builds the vertices and summaries of the cycles not
+                          yet in the buffer.
+
+    upload(self): Uploads the vertices not yet on the graphics card.
+
+    draw(self, first_cycle, last_cycle): Draws the cycles in the range in
+                                         full detail.
+
+    get_summary(self, level, first_cycle, last_cycle): Returns the first
+                                                       cycles, minima and
+                                                       maxima of the buckets
+                                                       covering the range.
+
+    draw_summary(self, level, first_cycle, last_cycle): Draws the min/max
+                                                        summary of the range.
+
+    draw_cuboids(self, level, first_cycle, last_cycle, draw_cuboid,
+                 depth): Draws the range as 3D cuboids from cached display
+                         lists.
+
+    delete(self): Frees the vertex buffer object and display lists.
+    """
+
+    def __init__(self, devices, signal_list, cycle_width=25, height=50):
+        """Initialise the vertex arrays and the summary pyramid."""
+        self.signal_list = signal_list
+        self.cycle_width = cycle_width
+        self.height = height
+        self.cycles = 0  # number of cycles in the buffer
+        self.count = 0  # number of vertices in the buffer
+        self.vertices = np.zeros((0, 2), "f")  # capacity rows, count used
+        # first_vertex[j] is the index of the first vertex of cycle j
+        self.first_vertex = np.zeros(1, "i")
+
+        self.vbo = None  # created when the trace is first drawn
+        self.uploaded = 0  # number of vertices on the graphics card
+        self.buffer_size = 0  # capacity of the vertex buffer object
+
+        # Vertical position of the two vertices of a cycle, indexed by
+        # signal. Signals without a level (BLANK) are not drawn.
+        self.start_levels = np.full(devices.BLANK + 1, np.nan, "f")
+        self.end_levels = np.full(devices.BLANK + 1, np.nan, "f")
+        for signal, start, end in [(devices.HIGH, 0, 0),
+                                   (devices.LOW, -height, -height),
+                                   (devices.RISING, 0, -height),
+                                   (devices.FALLING, -height, 0)]:
+            self.start_levels[signal] = start
+            self.end_levels[signal] = end
+
+        # Lowest and highest level of each signal, for the pyramid
+        self.low_levels = np.ones(devices.BLANK + 1, "b")
+        self.high_levels = np.zeros(devices.BLANK + 1, "b")
+        for signal, low, high in [(devices.HIGH, 1, 1), (devices.LOW, 0, 0),
+                                  (devices.RISING, 0, 1),
+                                  (devices.FALLING, 0, 1)]:
+            self.low_levels[signal] = low
+            self.high_levels[signal] = high
+        self.minima = [np.zeros(0, "b")]  # one array per pyramid level
+        self.maxima = [np.zeros(0, "b")]
+
+        # 3D cuboids are compiled into display lists of block_size buckets.
+        # display_lists stores {(level, block): (list_id, cycles_built)}
+        self.devices = devices
+        self.block_size = 64
+        self.display_lists = {}
+
+    def update(self, cycles):
+        """Build the vertices and summaries of the cycles not yet built.
+
+        Return the number of vertices in the buffer.
+        """
+        cycles = min(cycles, len(self.signal_list))
+        if cycles <= self.cycles:
+            return self.count
+        signals = np.array(self.signal_list[self.cycles:cycles], "i")
+        starts = self.start_levels[signals]
+        ends = self.end_levels[signals]
+        drawn = ~np.isnan(starts)
+        x_values = np.arange(self.cycles, cycles)[drawn] * self.cycle_width
+
+        new_count = self.count + 2 * len(x_values)
+        if new_count > len(self.vertices):  # grow the vertex array
+            vertices = np.zeros((max(2 * new_count, 1024), 2), "f")
+            vertices[:self.count] = self.vertices[:self.count]
+            self.vertices = vertices
+        new_vertices = self.vertices[self.count:new_count]
+        new_vertices[0::2, 0] = x_values
+        new_vertices[0::2, 1] = starts[drawn]
+        new_vertices[1::2, 0] = x_values + self.cycle_width
+        new_vertices[1::2, 1] = ends[drawn]
+        self.first_vertex = np.concatenate(
+            [self.first_vertex, self.count + np.cumsum(2 * drawn)])
+
+        # Extend the pyramid, recomputing only the buckets that changed
+        first = self.cycles  # first changed bucket at the current level
+        self.minima[0] = np.concatenate([self.minima[0],
+                                         self.low_levels[signals]])
+        self.maxima[0] = np.concatenate([self.maxima[0],
+                                         self.high_levels[signals]])
+        level = 0
+        while len(self.minima[level]) > 1:
+            if level + 1 < len(self.minima):
+                first = first >> 1
+            else:  # new level, build it completely
+                first = 0
+                self.minima.append(np.zeros(0, "b"))
+                self.maxima.append(np.zeros(0, "b"))
+            lower_minima = self.minima[level][2 * first:]
+            lower_maxima = self.maxima[level][2 * first:]
+            pairs = np.arange(0, len(lower_minima), 2)
+            self.minima[level + 1] = np.concatenate(
+                [self.minima[level + 1][:first],
+                 np.minimum.reduceat(lower_minima, pairs)])
+            self.maxima[level + 1] = np.concatenate(
+                [self.maxima[level + 1][:first],
+                 np.maximum.reduceat(lower_maxima, pairs)])
+            level += 1
+
+        self.count = new_count
+        self.cycles = cycles
+        return self.count
+
+    def upload(self):
+        """Upload the vertices not yet on the graphics card."""
+        if self.uploaded == self.count:
+            return
+        if self.vbo is None:
+            self.vbo = GL.glGenBuffers(1)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+        if len(self.vertices) > self.buffer_size:  # upload everything
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, self.vertices.nbytes,
+                            self.vertices, GL.GL_DYNAMIC_DRAW)
+            self.buffer_size = len(self.vertices)
+        else:  # upload only the new vertices
+            new_vertices = self.vertices[self.uploaded:self.count]
+            GL.glBufferSubData(GL.GL_ARRAY_BUFFER,
+                               self.uploaded * self.vertices.itemsize * 2,
+                               new_vertices.nbytes, new_vertices)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        self.uploaded = self.count
+
+    def draw(self, first_cycle, last_cycle):
+        """Draw cycles first_cycle to last_cycle - 1 in full detail."""
+        first_cycle = min(first_cycle, self.cycles)
+        last_cycle = min(last_cycle, self.cycles)
+        first = int(self.first_vertex[first_cycle])
+        count = int(self.first_vertex[last_cycle]) - first
+        if count <= 0:
+            return
+        self.upload()
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glVertexPointer(2, GL.GL_FLOAT, 0, None)
+        GL.glDrawArrays(GL.GL_LINE_STRIP, first, count)
+        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+    def get_summary(self, level, first_cycle, last_cycle):
+        """Return the buckets of the pyramid level covering the range.
+
+        Return [first_cycles, minima, maxima], with one entry per bucket.
+        """
+        first_bucket = first_cycle >> level
+        last_bucket = min(len(self.minima[level]),
+                          ((last_cycle - 1) >> level) + 1)
+        first_cycles = np.arange(first_bucket, last_bucket) << level
+        return [first_cycles, self.minima[level][first_bucket:last_bucket],
+                self.maxima[level][first_bucket:last_bucket]]
+
+    def draw_summary(self, level, first_cycle, last_cycle):
+        """Draw the min/max summary of cycles first_cycle to last_cycle - 1.
+
+        Each bucket is drawn from its highest level at its start to its
+        lowest level at its end, so buckets where the signal changes fill
+        the space between the levels.
+        """
+        [first_cycles, minima, maxima] = self.get_summary(level, first_cycle,
+                                                          last_cycle)
+        drawn = minima <= maxima
+        starts = first_cycles[drawn]
+        ends = np.minimum(starts + (1 << level), self.cycles)
+        vertices = np.empty((2 * len(starts), 2), "f")
+        vertices[0::2, 0] = starts * self.cycle_width
+        vertices[0::2, 1] = (maxima[drawn] - 1) * self.height
+        vertices[1::2, 0] = ends * self.cycle_width
+        vertices[1::2, 1] = (minima[drawn] - 1) * self.height
+        if not len(vertices):
+            return
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glVertexPointer(2, GL.GL_FLOAT, 0, vertices)
+        GL.glDrawArrays(GL.GL_LINE_STRIP, 0, len(vertices))
+        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+
+    def draw_cuboids(self, level, first_cycle, last_cycle, draw_cuboid,
+                     depth):
+        """Draw cycles first_cycle to last_cycle - 1 as 3D cuboids.
+
+        Cuboids are drawn with draw_cuboid, depth apart along z, one per
+        cycle at level 0 and one per bucket above. They are compiled into a
+        display list per block of buckets, which is only recompiled when
+        cycles are added to the block, so rotating and zooming the view
+        replays the lists without rebuilding any geometry.
+        """
+        block_cycles = self.block_size << level
+        last_cycle = min(last_cycle, self.cycles)
+        if last_cycle <= first_cycle:
+            return
+        for block in range(first_cycle // block_cycles,
+                           (last_cycle - 1) // block_cycles + 1):
+            start = block * block_cycles
+            end = min(start + block_cycles, self.cycles)
+            [list_id, cycles_built] = self.display_lists.get((level, block),
+                                                             [None, None])
+            if cycles_built == end:
+                GL.glCallList(list_id)
+                continue
+            if list_id is None:
+                list_id = GL.glGenLists(1)
+            GL.glNewList(list_id, GL.GL_COMPILE_AND_EXECUTE)
+            if level == 0:
+                for cycle in range(start, end):
+                    if self.signal_list[cycle] == self.devices.HIGH:
+                        draw_cuboid(0, cycle * depth, 5, depth / 2, 11)
+                    elif self.signal_list[cycle] == self.devices.LOW:
+                        draw_cuboid(0, cycle * depth, 5, depth / 2, 1)
+            else:  # half height where the signal changes in the bucket
+                bucket = 1 << level
+                [first_cycles, minima, maxima] = self.get_summary(level,
+                                                                  start, end)
+                for cycle, low, high in zip(first_cycles, minima, maxima):
+                    if low > high:  # no signal recorded
+                        continue
+                    draw_cuboid(0, (cycle + (bucket - 1) / 2) * depth, 5,
+                                bucket * depth / 2, 1 + 5 * (low + high))
+            GL.glEndList()
+            self.display_lists[(level, block)] = [list_id, end]
+
+    def delete(self):
+        """Free the vertex buffer object and display lists."""
+        if self.vbo is not None:
+            GL.glDeleteBuffers(1, [self.vbo])
+            self.vbo = None
+        for list_id, cycles_built in self.display_lists.values():
+            GL.glDeleteLists(list_id, 1)
+        self.display_lists = {}
+
+
+class GlyphAtlas:
+    """Store pre-rasterised glyphs in a texture for drawing text.
+
+    The printable ASCII characters are drawn once with wx into a single
+    alpha texture. Each label is laid out into textured quads, in pixels
+    relative to the start of its baseline, and the quads are cached by
+    label text.
+
+    Parameters
+    ----------
+    font: font to rasterise the glyphs with.
+
+    Public methods
+    --------------
+    get_label(self, text): Returns the quads of a label as arrays of vertex
+                           positions and texture coordinates.
+
+    bind(self): Binds the atlas texture.
+
+    delete(self): Frees the atlas texture.
+    """
+
+    def __init__(self, font=None):
+        """Rasterise the glyphs and upload the atlas texture."""
+        if font is None:  # similar to the GLUT Helvetica 12 bitmap font
+            font = wx.Font(9, wx.FONTFAMILY_SWISS, wx.FONTSTYLE_NORMAL,
+                           wx.FONTWEIGHT_NORMAL)
+        characters = [chr(code) for code in range(32, 127)]
+        dc = wx.MemoryDC(wx.Bitmap(1, 1))
+        dc.SetFont(font)
+        extents = {character: dc.GetFullTextExtent(character)
+                   for character in characters}
+        self.line_height = max(extent[1] for extent in extents.values())
+        self.descent = max(extent[2] for extent in extents.values())
+
+        # Pack the glyphs into rows of a texture 256 pixels wide
+        self.width = 256
+        positions = {}
+        x = y = 0
+        for character in characters:
+            glyph_width = extents[character][0]
+            if x + glyph_width > self.width:
+                x = 0
+                y += self.line_height + 1
+            positions[character] = (x, y)
+            x += glyph_width + 1
+        self.height = 1
+        while self.height < y + self.line_height:
+            self.height *= 2
+
+        bitmap = wx.Bitmap(self.width, self.height)
+        dc.SelectObject(bitmap)
+        dc.SetBackground(wx.BLACK_BRUSH)
+        dc.Clear()
+        dc.SetTextForeground(wx.WHITE)
+        for character, (x, y) in positions.items():
+            dc.DrawText(character, x, y)
+        dc.SelectObject(wx.NullBitmap)
+        pixels = np.frombuffer(bytes(bitmap.ConvertToImage().GetData()),
+                               np.uint8).reshape(self.height, self.width, 3)
+        alpha = np.ascontiguousarray(pixels[:, :, 0])
+
+        # glyphs stores {character: (x, y, width)} in the texture
+        self.glyphs = {character: positions[character] +
+                       (extents[character][0],) for character in characters}
+        self.labels = {}  # {text: [positions, texture_coordinates]}
+
+        self.texture = GL.glGenTextures(1)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER,
+                           GL.GL_NEAREST)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER,
+                           GL.GL_NEAREST)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_ALPHA, self.width,
+                        self.height, 0, GL.GL_ALPHA, GL.GL_UNSIGNED_BYTE,
+                        alpha)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+    def get_label(self, text):
+        """Return the quads of a label, four vertices per character.
+
+        Return [positions, texture_coordinates]. Positions are in pixels
+        relative to the start of the baseline, and each newline moves the
+        baseline 20 pixels down. Characters missing from the atlas are drawn
+        as "?".
+        """
+        if text in self.labels:
+            return self.labels[text]
+        positions = []
+        texture_coordinates = []
+        pen_x = pen_y = 0
+        bottom = -self.descent
+        top = self.line_height - self.descent
+        for character in text:
+            if character == "\n":
+                pen_x = 0
+                pen_y -= 20
+                continue
+            (x, y, width) = self.glyphs.get(character, self.glyphs["?"])
+            # Row 0 of the texture is the top of the rasterised image
+            u_left = x / self.width
+            u_right = (x + width) / self.width
+            v_top = y / self.height
+            v_bottom = (y + self.line_height) / self.height
+            positions += [(pen_x, pen_y + bottom),
+                          (pen_x + width, pen_y + bottom),
+                          (pen_x + width, pen_y + top),
+                          (pen_x, pen_y + top)]
+            texture_coordinates += [(u_left, v_bottom), (u_right, v_bottom),
+                                    (u_right, v_top), (u_left, v_top)]
+            pen_x += width
+        label = [np.array(positions, "f").reshape(-1, 2),
+                 np.array(texture_coordinates, "f").reshape(-1, 2)]
+        self.labels[text] = label
+        return label
+
+    def bind(self):
+        """Bind the atlas texture."""
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture)
+
+    def delete(self):
+        """Free the atlas texture."""
+        GL.glDeleteTextures([self.texture])
 
 
 class MyGLCanvas(wxcanvas.GLCanvas):
@@ -52,6 +449,25 @@ class MyGLCanvas(wxcanvas.GLCanvas):
 
     render_text(self, text, x_pos, y_pos, z_pos): Handles text drawing
                                            operations.
+
+    draw_text(self): Draws the text queued by render_text.
+
+    reset(self, devices, monitors): Draws the traces of a newly loaded
+                                    network.
+
+    get_trace_buffer(self, name, signal_list): Returns the up to date trace
+                                               buffer of a monitor.
+
+    get_level(self, cycles, max_buckets): Returns the pyramid level at which
+                                          the cycles fit in max_buckets.
+
+    get_label_step(self, cycle_spacing, min_spacing): Returns the number of
+                                                      cycles between axis
+                                                      labels.
+
+    get_visible_range(self, x_min, x_max, z_min, z_max): Returns the range of
+                                                         z of the 3D traces
+                                                         that is in view.
     """
 
     def __init__(self, parent, devices, monitors, size):
@@ -60,7 +476,6 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                          attribList=[wxcanvas.WX_GL_RGBA,
                                      wxcanvas.WX_GL_DOUBLEBUFFER,
                                      wxcanvas.WX_GL_DEPTH_SIZE, 16, 0])
-        GLUT.glutInit()
         self.init = False
         self.context = wxcanvas.GLContext(self)
 
@@ -69,6 +484,19 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         self.cycles_completed = 0
         self.dotted = False
         self.dimension = True   # 3D by default
+        self.useful_monitors = {}
+
+        # Text is queued by render_text and drawn from the glyph atlas in a
+        # single batch, whose quads are reused while the labels are the same
+        self.glyph_atlas = None  # created once the GL context is current
+        self.text_queue = []  # [(text, x_pos, y_pos, z_pos)]
+        self.label_set = None  # texts of the cached batch
+        self.label_positions = np.zeros((0, 2), "f")
+        self.label_texture_coordinates = np.zeros((0, 2), "f")
+        self.label_index = np.zeros(0, "i")  # label number of each vertex
+
+        # trace_buffers stores {monitor_name: TraceBuffer} for the 2D traces
+        self.trace_buffers = {}
 
         # Constants for OpenGL materials and lights
         self.mat_diffuse = [0.0, 0.0, 0.0, 1.0]
@@ -196,6 +624,8 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         if not margin:
             margin = 0
 
+        size = self.GetClientSize()
+
         if self.dimension:  # 3D Trace
             # Clear everything
             GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
@@ -206,18 +636,31 @@ class MyGLCanvas(wxcanvas.GLCanvas):
             range_end = range_start + self.cycles_completed
             label_offset = range_start * cycle_width - 10 - margin * 8
             x_start = -1 * cycle_width
+            x_max = (len(self.useful_monitors) - 1) * monitor_spacing
             y_val = 0
             z_start = cycle_width * (range_start - 0.5)
             z_end = cycle_width * (range_end + 1 - 0.5)
             tick = 3
-            if self.cycles_completed > 0:
+            visible = self.get_visible_range(x_start,
+                                             x_max + monitor_spacing,
+                                             z_start, z_end)
+            if self.cycles_completed > 0 and visible is not None:
+                # Cycles in view, with a cycle of margin on each side
+                first = max(0, int((visible[0] - z_start) // cycle_width) - 1)
+                last = min(self.cycles_completed,
+                           int((visible[1] - z_start) // cycle_width) + 2)
+                level = self.get_level(last - first, size.width // 4)
+                step = self.get_label_step(
+                    size.width / max(last - first, 1), 40)
+                ticks = range(first - first % step, last + 1, step)
+
                 # Draw z axis
                 GL.glColor3f(0.0, 0.0, 0.0)  # axis trace is black
                 GL.glLineWidth(2)
                 GL.glBegin(GL.GL_LINES)
                 GL.glVertex3f(x_start, y_val, z_start)
                 GL.glVertex3f(x_start, y_val, z_end)
-                for i in range(self.cycles_completed + 1):
+                for i in ticks:
                     GL.glVertex3f(x_start + tick, y_val,
                                   z_start + cycle_width * i)
                     GL.glVertex3f(x_start - tick, y_val,
@@ -232,27 +675,24 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                 GL.glEnd()
                 # Add labels for axis
                 self.render_text("Time", x_start, y_val, label_offset)
-                for i in range(self.cycles_completed + 1):
+                for i in ticks:
                     self.render_text(str(i), x_start - 10, y_val,
                                      z_start + cycle_width * i)
 
                 # Draw signals based on specified monitors
-                for i in range(len(self.useful_monitors)):
-                    key = list(self.useful_monitors.keys())[i]
-                    signal_list = self.useful_monitors[key]
-                    if i == len(self.useful_monitors) - 1:
-                        x_max = i * monitor_spacing
-                    for j in range(range_start, range_end):
-                        z = j * cycle_width
-                        self.render_text(key, i * monitor_spacing,
-                                         y_val, label_offset)
-                        GL.glColor3f(.051, .702, .62)
-                        if signal_list[j - range_start] == self.devices.HIGH:
-                            self.draw_cuboid(i * monitor_spacing,
-                                             z, 5, 10, 11)
-                        elif signal_list[j - range_start] == self.devices.LOW:
-                            self.draw_cuboid(i * monitor_spacing,
-                                             z, 5, 10, 1)
+                for i, (key, signal_list) in enumerate(
+                        self.useful_monitors.items()):
+                    self.render_text(key, i * monitor_spacing,
+                                     y_val, label_offset)
+                    trace = self.get_trace_buffer(key, signal_list)
+                    GL.glColor3f(.051, .702, .62)
+                    # Cuboids are cached relative to the start of the trace
+                    GL.glPushMatrix()
+                    GL.glTranslatef(i * monitor_spacing, 0.0,
+                                    range_start * cycle_width)
+                    trace.draw_cuboids(level, first, last, self.draw_cuboid,
+                                       cycle_width)
+                    GL.glPopMatrix()
 
                 # Draw dotted lines on monitors
                 if self.dotted:
@@ -262,7 +702,7 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                     GL.glLineWidth(0.5)
                     GL.glColor3f(.173, .412, .604)
                     GL.glBegin(GL.GL_LINES)
-                    for i in range(self.cycles_completed + 1):
+                    for i in ticks:
                         GL.glVertex3f(x_start, y_val,
                                       z_start + cycle_width * i)
                         GL.glVertex3f(x_max + monitor_spacing, y_val,
@@ -285,10 +725,23 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                     x_start = 100
                 x_end = x_start + cycle_width*(self.cycles_completed + 1)
                 tick = 3
+
+                # Cycles in view, from the pan and zoom of the canvas
+                first = math.floor((-self.pan_x / self.zoom - x_start)
+                                   / cycle_width) - 1
+                last = math.ceil(((size.width - self.pan_x) / self.zoom
+                                  - x_start) / cycle_width) + 1
+                first = min(max(first, 0), self.cycles_completed)
+                last = min(max(last, first), self.cycles_completed)
+                level = self.get_level(last - first, size.width)
+                step = self.get_label_step(cycle_width * self.zoom, 40)
+                ticks = range(first - first % step,
+                              min(last, self.cycles_completed) + 1, step)
+
                 GL.glBegin(GL.GL_LINES)
                 GL.glVertex2f(x_start, y_val)
                 GL.glVertex2f(x_end, y_val)
-                for i in range(self.cycles_completed + 1):
+                for i in ticks:
                     GL.glVertex2f(x_start + cycle_width*i, y_val + tick)
                     GL.glVertex2f(x_start + cycle_width*i, y_val - tick)
                 # Draw arrow at end of axis
@@ -299,44 +752,30 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                 GL.glEnd()
                 # Add labels for axis
                 self.render_text("Time", 10, y_val - 5)
-                for i in range(self.cycles_completed + 1):
+                for i in ticks:
                     self.render_text(str(i),
                                      x_start + cycle_width*i - 5,
                                      y_val - 15)
 
                 # Draw signals based on specified monitors
                 y_start = y_val + 100
-                for i in range(len(self.useful_monitors)):
-                    key = list(self.useful_monitors.keys())[i]
+                max_height = y_start
+                for i, (key, signal_list) in enumerate(
+                        self.useful_monitors.items()):
                     height = y_start + i*100
                     self.render_text(key, 10, height - 30)
                     self.render_text("1", x_start - 15, height - 5)
                     self.render_text("0", x_start - 15, height - 55)
-                    signal_list = self.useful_monitors[key]
-                    if i == len(self.useful_monitors) - 1:
-                        max_height = height
+                    max_height = height
+                    trace = self.get_trace_buffer(key, signal_list)
                     GL.glColor3f(.051, .702, .62)
-                    GL.glBegin(GL.GL_LINE_STRIP)
-                    for j in range(self.cycles_completed):
-                        if signal_list[j] == self.devices.HIGH:
-                            GL.glVertex2f((j * cycle_width) + x_start, height)
-                            GL.glVertex2f(((j + 1) * cycle_width)
-                                          + x_start, height)
-                        elif signal_list[j] == self.devices.LOW:
-                            GL.glVertex2f((j * cycle_width) + x_start,
-                                          height - 50)
-                            GL.glVertex2f(((j + 1) * cycle_width)
-                                          + x_start, height - 50)
-                        elif signal_list[j] == self.devices.RISING:
-                            GL.glVertex2f((j * cycle_width) + x_start, height)
-                            GL.glVertex2f(((j + 1) * cycle_width)
-                                          + x_start, height - 50)
-                        elif signal_list[j] == self.devices.FALLING:
-                            GL.glVertex2f((j * cycle_width) + x_start,
-                                          height - 50)
-                            GL.glVertex2f(((j + 1) * cycle_width)
-                                          + x_start, height)
-                    GL.glEnd()
+                    GL.glPushMatrix()
+                    GL.glTranslatef(x_start, height, 0.0)
+                    if level == 0:
+                        trace.draw(first, last)
+                    else:  # several cycles per pixel
+                        trace.draw_summary(level, first, last)
+                    GL.glPopMatrix()
 
                 # Draw dotted lines on monitors
                 if self.dotted:
@@ -346,17 +785,114 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                     GL.glLineWidth(0.5)
                     GL.glColor3f(.173, .412, .604)
                     GL.glBegin(GL.GL_LINES)
-                    for i in range(self.cycles_completed + 1):
+                    for i in ticks:
                         GL.glVertex2f(x_start + cycle_width*i, y_val)
                         GL.glVertex2f(x_start + cycle_width*i, max_height + 20)
                     GL.glEnd()
                     GL.glPopAttrib()
 
+        for key in list(self.trace_buffers):  # removed monitors
+            if key not in self.useful_monitors:
+                self.trace_buffers.pop(key).delete()
+
+        self.draw_text()
+
         # We have been drawing to the back buffer, flush the graphics pipeline
         # and swap the back buffer to the front
         GL.glFlush()
         self.SwapBuffers()
 
+    def reset(self, devices, monitors):
+        """Draw the traces of a newly loaded network.
+
+        Trace buffers of the old network are freed, while the GL context and
+        glyph atlas are kept.
+        """
+        self.SetCurrent(self.context)
+        for trace in self.trace_buffers.values():
+            trace.delete()
+        self.trace_buffers = {}
+        self.devices = devices
+        self.monitors = monitors
+        self.cycles_completed = 0
+        self.useful_monitors = {}
+        self.Refresh()
+
+    def get_trace_buffer(self, name, signal_list):
+        """Return the trace buffer of a monitor.
+
+        The buffer is brought up to date with the cycles completed, and is
+        rebuilt when the monitor has been reset since it was last drawn.
+        """
+        trace = self.trace_buffers.get(name)
+        if (trace is None or trace.signal_list is not signal_list or
+                trace.cycles > self.cycles_completed):
+            if trace is not None:
+                trace.delete()
+            trace = TraceBuffer(self.devices, signal_list)
+            self.trace_buffers[name] = trace
+        trace.update(self.cycles_completed)
+        return trace
+
+    def get_level(self, cycles, max_buckets):
+        """Return the pyramid level at which cycles fit in max_buckets.
+
+        Level 0 draws every cycle; each level above halves the detail.
+        """
+        level = 0
+        while (cycles >> level) > max(max_buckets, 1):
+            level += 1
+        return level
+
+    def get_label_step(self, cycle_spacing, min_spacing):
+        """Return the number of cycles between axis labels.
+
+        The step is 1, 2 or 5 times a power of ten, and is the smallest that
+        keeps labels at least min_spacing pixels apart.
+        """
+        step = 1
+        while True:
+            for multiple in [1, 2, 5]:
+                if step * multiple * cycle_spacing >= min_spacing:
+                    return step * multiple
+            step *= 10
+
+    def get_visible_range(self, x_min, x_max, z_min, z_max):
+        """Return the range of z of the 3D traces that is in view.
+
+        The rectangle x_min <= x <= x_max, z_min <= z <= z_max in the plane
+        y = 0 is clipped against the view frustum. Return [z_low, z_high],
+        or None if no part of the rectangle is in view.
+        """
+        # Row vectors times the matrices as returned by OpenGL give clip
+        # coordinates; the object z is carried along in the last column
+        transform = np.dot(GL.glGetDoublev(GL.GL_MODELVIEW_MATRIX),
+                           GL.glGetDoublev(GL.GL_PROJECTION_MATRIX))
+        polygon = []
+        for x, z in [(x_min, z_min), (x_max, z_min), (x_max, z_max),
+                     (x_min, z_max)]:
+            clip = np.dot([x, 0, z, 1], transform)
+            polygon.append(np.append(clip, z))
+
+        # Sutherland-Hodgman clipping against the six frustum planes
+        for axis, sign in [(0, 1), (0, -1), (1, 1), (1, -1), (2, 1),
+                           (2, -1)]:
+            clipped = []
+            for i, current in enumerate(polygon):
+                previous = polygon[i - 1]
+                d_current = current[3] + sign * current[axis]
+                d_previous = previous[3] + sign * previous[axis]
+                if (d_current >= 0) != (d_previous >= 0):
+                    t = d_previous / (d_previous - d_current)
+                    clipped.append(previous + t * (current - previous))
+                if d_current >= 0:
+                    clipped.append(current)
+            polygon = clipped
+            if not polygon:
+                return None
+        z_values = [point[4] for point in polygon]
+        return [min(z_values), max(z_values)]
+
     def draw_cuboid(self, x_pos, z_pos, half_width, half_depth, height):
         """Draw a cuboid, the basic building block for all signals.
 
@@ -455,18 +991,204 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         self.Refresh()  # triggers the paint event
 
     def render_text(self, text, x_pos, y_pos, z_pos=0):
-        """Handle text drawing operations."""
+        """Handle text drawing operations.
+
+        The text is queued, and drawn by draw_text at the end of the frame.
+        """
+        self.text_queue.append((text, x_pos, y_pos, z_pos))
+
+    def draw_text(self):
+        """Draw the text queued by render_text in one batch.
+
+        Like raster positions, each label starts at the window position of
+        its anchor point, and labels whose anchor is out of view are not
+        drawn.
+        """
+        if not self.text_queue:
+            return
+        if self.glyph_atlas is None:
+            self.glyph_atlas = GlyphAtlas()
+        texts = tuple(label[0] for label in self.text_queue)
+        if texts != self.label_set:  # rebuild the cached batch
+            labels = [self.glyph_atlas.get_label(text) for text in texts]
+            self.label_positions = np.concatenate(
+                [label[0] for label in labels])
+            self.label_texture_coordinates = np.concatenate(
+                [label[1] for label in labels])
+            self.label_index = np.repeat(np.arange(len(labels)),
+                                         [len(label[0]) for label in labels])
+            self.label_set = texts
+
+        # Project the anchors to window coordinates
+        anchors = np.array([label[1:] + (1,) for label in self.text_queue],
+                           "d")
+        self.text_queue = []
+        transform = np.dot(GL.glGetDoublev(GL.GL_MODELVIEW_MATRIX),
+                           GL.glGetDoublev(GL.GL_PROJECTION_MATRIX))
+        clip = np.dot(anchors, transform)
+        w_values = clip[:, 3:]
+        in_view = ((w_values[:, 0] > 0) &
+                   np.all(np.abs(clip[:, :3]) <= w_values, axis=1))
+        size = self.GetClientSize()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            window = np.floor((clip[:, :2] / w_values + 1) / 2 *
+                              [size.width, size.height])
+        drawn = in_view[self.label_index]
+        positions = (self.label_positions +
+                     window[self.label_index]).astype("f")[drawn]
+        texture_coordinates = self.label_texture_coordinates[drawn]
+        if not len(positions):
+            return
+
+        # Draw the quads in window coordinates
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glPushMatrix()
+        GL.glLoadIdentity()
+        GL.glOrtho(0, size.width, 0, size.height, -1, 1)
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        GL.glPushMatrix()
+        GL.glLoadIdentity()
+        GL.glPushAttrib(GL.GL_ENABLE_BIT | GL.GL_COLOR_BUFFER_BIT)
+        GL.glDisable(GL.GL_LIGHTING)
+        GL.glDisable(GL.GL_DEPTH_TEST)
+        GL.glDisable(GL.GL_CULL_FACE)
+        GL.glEnable(GL.GL_TEXTURE_2D)
+        GL.glEnable(GL.GL_BLEND)
+        GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
         GL.glColor3f(0.0, 0.0, 0.0)  # text is black
-        GL.glRasterPos3f(x_pos, y_pos, z_pos)
-        font = GLUT.GLUT_BITMAP_HELVETICA_12
+        self.glyph_atlas.bind()
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glEnableClientState(GL.GL_TEXTURE_COORD_ARRAY)
+        GL.glVertexPointer(2, GL.GL_FLOAT, 0, positions)
+        GL.glTexCoordPointer(2, GL.GL_FLOAT, 0, texture_coordinates)
+        GL.glDrawArrays(GL.GL_QUADS, 0, len(positions))
+        GL.glDisableClientState(GL.GL_TEXTURE_COORD_ARRAY)
+        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        GL.glPopAttrib()
+        GL.glPopMatrix()
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glPopMatrix()
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+
+
+class SignalList(wx.ListCtrl):
+    """Show a long, searchable list of names in a virtual list control.
+
+    Only the rows in view are drawn, and their text is asked for when they
+    are drawn, so lists of thousands of switches or signals open and scroll
+    quickly. The names shown can be narrowed by an incremental search.
 
-        for character in text:
-            if character == '\n':
-                y_pos = y_pos - 20
-                GL.glRasterPos3f(x_pos, y_pos, z_pos)
-            else:
-                GLUT.glutBitmapCharacter(font, ord(character))
-        GL.glEnable(GL.GL_LIGHTING)
+    Parameters
+    ----------
+    parent: parent window.
+    headings: list of column headings.
+    get_columns: function returning the strings of the other columns for a
+                 name, or None if there is only one column.
+    sort: keep the names in alphabetical order if True.
+
+    Public methods
+    --------------
+    set_names(self, names): Replaces the listed names.
+
+    add_name(self, name): Adds a name to the list.
+
+    remove_name(self, name): Removes a name from the list.
+
+    set_filter(self, text): Shows only the names containing text.
+
+    get_selected_names(self): Returns the names of the selected rows.
+
+    OnGetItemText(self, item, column): Returns the text of a cell.
+    """
+
+    def __init__(self, parent, headings, get_columns=None, sort=False):
+        """Initialise the columns and the name index."""
+        super().__init__(parent, wx.ID_ANY, size=(220, 150),
+                         style=wx.LC_REPORT | wx.LC_VIRTUAL)
+        for column, heading in enumerate(headings):
+            self.InsertColumn(column, heading, width=200 if column == 0
+                              else 60)
+        self.get_columns = get_columns
+        self.sort = sort
+
+        self.names = []
+        self.keys = []  # lower case names, searched by set_filter
+        self.text = ""  # current search text
+        self.shown = []  # indices into names of the rows shown
+
+    def set_names(self, names):
+        """Replace the listed names, keeping the search text."""
+        self.names = sorted(names) if self.sort else list(names)
+        self.keys = [name.lower() for name in self.names]
+        self.update_rows()
+
+    def add_name(self, name):
+        """Add a name to the list."""
+        index = (bisect.bisect(self.names, name) if self.sort
+                 else len(self.names))
+        self.names.insert(index, name)
+        self.keys.insert(index, name.lower())
+        self.update_rows()
+
+    def remove_name(self, name):
+        """Remove a name from the list, if present."""
+        if name in self.names:
+            index = self.names.index(name)
+            del self.names[index]
+            del self.keys[index]
+            self.update_rows()
+
+    def set_filter(self, text):
+        """Show only the names containing text, ignoring case.
+
+        When the search text is extended, only the rows already shown are
+        searched again.
+        """
+        key = text.lower()
+        if key.startswith(self.text.lower()):
+            candidates = self.shown
+        else:
+            candidates = range(len(self.keys))
+        self.text = text
+        self.show_rows([index for index in candidates
+                        if key in self.keys[index]])
+
+    def update_rows(self):
+        """Search all the names again after the list changed."""
+        key = self.text.lower()
+        self.show_rows([index for index, name in enumerate(self.keys)
+                        if key in name])
+
+    def show_rows(self, shown):
+        """Show the names at the indices in shown, clearing the selection.
+
+        Rows are selected by position, so a selection would move to other
+        names when rows are added or removed.
+        """
+        item = self.GetFirstSelected()
+        while item != -1:
+            self.Select(item, False)
+            item = self.GetNextSelected(item)
+        self.shown = shown
+        self.SetItemCount(len(self.shown))
+        self.Refresh()
+
+    def get_selected_names(self):
+        """Return the names of the selected rows."""
+        selected = []
+        item = self.GetFirstSelected()
+        while item != -1:
+            selected.append(self.names[self.shown[item]])
+            item = self.GetNextSelected(item)
+        return selected
+
+    def OnGetItemText(self, item, column):
+        """Return the text of a cell, called when the row is drawn."""
+        name = self.names[self.shown[item]]
+        if column == 0:
+            return name
+        return self.get_columns(name)[column - 1]
 
 
 class Gui(wx.Frame):
@@ -494,17 +1216,54 @@ class Gui(wx.Frame):
     on_continue_button(self, event): Event handler for when the user clicks the
                                      continue button.
 
+    on_cancel_button(self, event): Event handler for when the user clicks the
+                                   cancel button.
+
+    start_simulation(self, cycles): Runs the network for the specified number
+                                    of cycles in a worker thread.
+
+    run_simulation(self, cycles): Executes the network in the worker thread,
+                                  posting progress back to the GUI.
+
+    on_progress(self, cycles_done, cycles, rate): Updates the progress bar
+                                                  and redraws the canvas.
+
+    on_simulation_done(self, cycles_done, cycles, rate): Updates the widgets
+                                                         when a run ends.
+
     on_quit_button(self, event): Event handler for when the user clicks the
                                  quit button.
 
-    toggle_switch(self, switch_id): Event handler for when the user toggles
-                                    a switch.
+    read_file(self, path): Parses a definition file in a worker thread.
+
+    on_file_parsed(self, path, names, devices, network, monitors,
+                   error_messages): Loads the parsed network or shows the
+                                    parser errors.
+
+    watch_file(self, path): Reloads the network whenever the definition file
+                            changes.
+
+    on_file_changed(self, change): Applies a change of the definition file.
+
+    load_network(self, names, devices, network, monitors): Replaces the
+                                                          simulated network.
+
+    build_panels(self): Refills the switch and monitor lists.
+
+    get_switch_columns(self, switch_name): Returns the state shown next to a
+                                           switch.
+
+    on_search(self, signal_list): Event handler for when the user types in
+                                  the search box of a list.
 
-    on_remove_button(self, monitor): Event handler for when the user clicks a
-                                     clear button.
+    on_toggle_button(self, event): Event handler for when the user toggles
+                                   the selected switches.
 
-    on_add_monitor_button(self, event): Event handler for when the user clicks
-                                        the add monitor button.
+    on_remove_button(self, event): Event handler for when the user clears the
+                                   selected monitors.
+
+    on_add_monitor_button(self, event): Event handler for when the user adds
+                                        the selected signals as monitors.
 
     on_dotted_button(self, event): Event handler for when the user clicks the
                                    add dotted lines button.
@@ -524,8 +1283,17 @@ class Gui(wx.Frame):
         self.network = network
 
         self.cycles_completed = 0  # number of simulation cycles completed
-        self.monitored_list = self.monitors.get_signal_names()[0]
-        self.not_monitored_list = self.monitors.get_signal_names()[1]
+        self.switch_devices = {}  # {switch_name: Device}, for the switch list
+        self.useful_monitors = {}
+
+        # Runs execute in a worker thread. The lock is held while the thread
+        # executes a chunk of cycles, and while the main thread changes
+        # switches or monitors, so changes only happen between cycles.
+        self.simulation_lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.simulation_thread = None
+        self.chunk_size = 100  # cycles executed per lock acquisition
+        self.frame_interval = 1 / 20  # minimum seconds between redraws
 
         """Initialise widgets and layout."""
         super().__init__(parent=None, title=title, size=(800, 600))
@@ -558,6 +1326,9 @@ class Gui(wx.Frame):
         self.run_button = wx.Button(self, wx.ID_ANY, _(u"Run"))
         self.continue_button = wx.Button(self, wx.ID_ANY, _(u"Continue"))
         self.quit_button = wx.Button(self, wx.ID_ANY, _(u"Quit"))
+        self.progress_gauge = wx.Gauge(self, wx.ID_ANY, range=1)
+        self.cancel_button = wx.Button(self, wx.ID_ANY, _(u"Cancel"))
+        self.text_progress = wx.StaticText(self, wx.ID_ANY, "")
         self.text_switches = wx.StaticText(self, wx.ID_ANY, _(u"Switches:"))
         self.text_monitors = wx.StaticText(self,
                                            wx.ID_ANY, _(u"Monitor Points:"))
@@ -569,15 +1340,13 @@ class Gui(wx.Frame):
         # Configure sizer children for side_sizer
         self.item_cycles = wx.BoxSizer(wx.HORIZONTAL)
         self.item_run = wx.BoxSizer(wx.HORIZONTAL)
+        self.item_progress = wx.BoxSizer(wx.HORIZONTAL)
         self.item_text_switches = wx.BoxSizer(wx.HORIZONTAL)
         self.item_switches = wx.BoxSizer(wx.VERTICAL)
         self.item_text_monitors = wx.BoxSizer(wx.HORIZONTAL)
         self.item_monitors = wx.BoxSizer(wx.VERTICAL)
         self.item_dotted = wx.BoxSizer(wx.HORIZONTAL)
 
-        # Configure sizer children for monitor_window
-        self.monitor_dropdown = wx.BoxSizer(wx.HORIZONTAL)
-
         # Configure item_cycles sizer, child to side_sizer
         self.item_cycles.Add(self.text_cycles, 1, wx.ALIGN_CENTER | wx.ALL, 5)
         self.item_cycles.Add(self.spin, 3, wx.ALL, 5)
@@ -587,71 +1356,43 @@ class Gui(wx.Frame):
         self.item_run.Add(self.continue_button, 1, wx.ALL, 5)
         self.item_run.Add(self.quit_button, 1, wx.ALL, 5)
 
+        # Configure item_progress sizer, child to side_sizer
+        self.item_progress.Add(self.progress_gauge, 3,
+                               wx.ALIGN_CENTER | wx.ALL, 5)
+        self.item_progress.Add(self.cancel_button, 1, wx.ALL, 5)
+
         # Configure item_text_switches sizer, child to side_sizer
         self.item_text_switches.Add(self.text_switches, 1, wx.ALL, 5)
 
-        # Configure scrollable switch_window, child to side_sizer
-        self.switch_window = wx.ScrolledWindow(self, style=wx.VSCROLL)
-        self.switch_window.SetSizer(self.item_switches)
-        self.switch_window.SetScrollRate(10, 10)
-        self.switch_window.SetAutoLayout(True)
-        switches = self.devices.find_devices(self.devices.SWITCH)
-
-        for switch_id in switches:
-            self.switch_subitem = wx.BoxSizer(wx.HORIZONTAL)
-            self.item_switches.Add(self.switch_subitem, 0, 0, 0)
-            label = self.names.get_name_string(switch_id)
-            self.switch_text = wx.StaticText(self.switch_window,
-                                             wx.ID_ANY,
-                                             label)
-            switch_state = self.devices.get_device(switch_id).switch_state
-
-            if switch_state == 0:
-                self.switch_button = wx.Button(self.switch_window,
-                                               wx.ID_ANY, _(u"OFF"))
-                self.switch_button.SetBackgroundColour(wx.Colour(255, 69, 0))
-            else:
-                self.switch_button = wx.Button(self.switch_window,
-                                               wx.ID_ANY, _(u"ON"))
-                self.switch_button.SetBackgroundColour(wx.Colour(42, 145, 52))
-            self.switch_button.Bind(wx.EVT_BUTTON,
-                                    self.toggle_switch(switch_id))
-            self.switch_subitem.Add(self.switch_text, 1,
-                                    wx.ALIGN_CENTER | wx.ALL, 5)
-            self.switch_subitem.Add(self.switch_button, 0, wx.ALL, 5)
+        # Configure the switch list, child to side_sizer. The lists are
+        # virtual, so only the rows in view are drawn however many switches
+        # and signals there are.
+        self.switch_search = wx.SearchCtrl(self, wx.ID_ANY)
+        self.switch_list = SignalList(self, [_(u"Switch"), _(u"State")],
+                                      self.get_switch_columns, sort=True)
+        self.toggle_button = wx.Button(self, wx.ID_ANY, _(u"Toggle"))
+        self.item_switches.Add(self.switch_search, 0, wx.EXPAND | wx.ALL, 5)
+        self.item_switches.Add(self.switch_list, 1, wx.EXPAND | wx.ALL, 5)
+        self.item_switches.Add(self.toggle_button, 0, wx.ALL, 5)
 
         # Configure item_text_monitors sizer, child to side_sizer
         self.item_text_monitors.Add(self.text_monitors, 1, wx.ALL, 5)
 
-        # Configure scrollable monitor_window, child to side_sizer
-        self.monitor_window = wx.ScrolledWindow(self, style=wx.VSCROLL)
-        self.monitor_window.SetSizer(self.item_monitors)
-        self.monitor_window.SetScrollRate(10, 10)
-        self.monitor_window.SetAutoLayout(True)
-        self.monitor_combo = wx.ComboBox(self.monitor_window,
-                                         wx.ID_ANY,
-                                         choices=self.not_monitored_list,
-                                         style=wx.CB_READONLY)
-        self.add_monitor_button = wx.Button(self.monitor_window,
-                                            wx.ID_ANY, _(u"Add Monitor"))
-        self.item_monitors.Add(self.monitor_dropdown, 0, 0, 0)
-        self.monitor_dropdown.Add(self.add_monitor_button, 0, wx.LEFT, 5)
-        self.monitor_dropdown.Add(self.monitor_combo, 1, wx.LEFT, 5)
-
-        self.monitored_list = self.monitors.get_signal_names()[0]
-        for monitor in self.monitored_list:
-            self.monitor_subitem = wx.BoxSizer(wx.HORIZONTAL)
-            self.item_monitors.Add(self.monitor_subitem, 0, 0, 0)
-            self.new_monitor_text = wx.StaticText(self.monitor_window,
-                                                  wx.ID_ANY, monitor)
-            self.new_monitor_button = wx.Button(self.monitor_window,
-                                                wx.ID_ANY, _(u"Clear"))
-            self.new_monitor_button.SetBackgroundColour(wx.Colour(255, 69, 0))
-            self.new_monitor_button.Bind(wx.EVT_BUTTON,
-                                         self.on_remove_button(monitor))
-            self.monitor_subitem.Add(self.new_monitor_button, 0, wx.ALL, 5)
-            self.monitor_subitem.Add(self.new_monitor_text,
-                                     1, wx.ALIGN_CENTER | wx.ALL, 5)
+        # Configure the monitor and signal lists, child to side_sizer
+        self.monitor_search = wx.SearchCtrl(self, wx.ID_ANY)
+        self.monitor_list = SignalList(self, [_(u"Monitor")])
+        self.remove_monitor_button = wx.Button(self, wx.ID_ANY, _(u"Clear"))
+        self.signal_search = wx.SearchCtrl(self, wx.ID_ANY)
+        self.signal_list = SignalList(self, [_(u"Signal")], sort=True)
+        self.add_monitor_button = wx.Button(self, wx.ID_ANY,
+                                            _(u"Add Monitor"))
+        self.item_monitors.Add(self.monitor_search, 0, wx.EXPAND | wx.ALL, 5)
+        self.item_monitors.Add(self.monitor_list, 1, wx.EXPAND | wx.ALL, 5)
+        self.item_monitors.Add(self.remove_monitor_button, 0, wx.ALL, 5)
+        self.item_monitors.Add(self.signal_search, 0, wx.EXPAND | wx.ALL, 5)
+        self.item_monitors.Add(self.signal_list, 1, wx.EXPAND | wx.ALL, 5)
+        self.item_monitors.Add(self.add_monitor_button, 0, wx.ALL, 5)
+        self.build_panels()
 
         # Configure item_dotted sizer, child to side_sizer
         self.item_dotted.Add(self.dotted_button, 0, wx.ALL, 5)
@@ -664,10 +1405,12 @@ class Gui(wx.Frame):
         # Add side_sizer children
         self.side_sizer.Add(self.item_cycles, 1, wx.ALL, 5)
         self.side_sizer.Add(self.item_run, 1, wx.ALL, 5)
+        self.side_sizer.Add(self.item_progress, 1, wx.EXPAND | wx.ALL, 5)
+        self.side_sizer.Add(self.text_progress, 0, wx.ALL, 5)
         self.side_sizer.Add(self.item_text_switches, 1, wx.ALL, 5)
-        self.side_sizer.Add(self.switch_window, 3, wx.EXPAND | wx.ALL, 5)
+        self.side_sizer.Add(self.item_switches, 3, wx.EXPAND | wx.ALL, 5)
         self.side_sizer.Add(self.item_text_monitors, 1, wx.ALL, 5)
-        self.side_sizer.Add(self.monitor_window, 3, wx.EXPAND | wx.ALL, 5)
+        self.side_sizer.Add(self.item_monitors, 6, wx.EXPAND | wx.ALL, 5)
         self.side_sizer.Add(self.item_dotted, 1, wx.ALL, 5)
 
         # Bind events to widgets
@@ -675,7 +1418,21 @@ class Gui(wx.Frame):
         self.run_button.Bind(wx.EVT_BUTTON, self.on_run_button)
         self.continue_button.Bind(wx.EVT_BUTTON, self.on_continue_button)
         self.quit_button.Bind(wx.EVT_BUTTON, self.on_quit_button)
+        self.cancel_button.Bind(wx.EVT_BUTTON, self.on_cancel_button)
+        self.toggle_button.Bind(wx.EVT_BUTTON, self.on_toggle_button)
+        self.switch_list.Bind(wx.EVT_LIST_ITEM_ACTIVATED,
+                              self.on_toggle_button)
+        self.remove_monitor_button.Bind(wx.EVT_BUTTON, self.on_remove_button)
+        self.monitor_list.Bind(wx.EVT_LIST_ITEM_ACTIVATED,
+                               self.on_remove_button)
         self.add_monitor_button.Bind(wx.EVT_BUTTON, self.on_add_monitor_button)
+        self.signal_list.Bind(wx.EVT_LIST_ITEM_ACTIVATED,
+                              self.on_add_monitor_button)
+        self.switch_search.Bind(wx.EVT_TEXT,
+                                self.on_search(self.switch_list))
+        self.monitor_search.Bind(wx.EVT_TEXT,
+                                 self.on_search(self.monitor_list))
+        self.signal_search.Bind(wx.EVT_TEXT, self.on_search(self.signal_list))
         self.dotted_button.Bind(wx.EVT_BUTTON, self.on_dotted_button)
         self.dimension_button.Bind(wx.EVT_BUTTON, self.on_dimension_button)
 
@@ -683,6 +1440,11 @@ class Gui(wx.Frame):
         self.run_button.SetBackgroundColour(wx.Colour(42, 145, 52))
         self.continue_button.SetBackgroundColour(wx.Colour(175, 238, 238))
         self.quit_button.SetBackgroundColour(wx.Colour(255, 69, 0))
+        self.cancel_button.Disable()
+
+        # Reload the network when the definition file is edited
+        self.watcher = None
+        self.watch_file(path)
 
         self.SetSizeHints(1000, 600)
         self.SetSizer(self.main_sizer)
@@ -702,10 +1464,6 @@ class Gui(wx.Frame):
                           _(u"About the Logic Simulator"),
                           wx.ICON_INFORMATION | wx.OK)
         else:
-            names = Names()
-            devices = Devices(names)
-            network = Network(names, devices)
-            monitors = Monitors(names, devices, network)
             openFileDialog = wx.FileDialog(self, _(u"Open txt file"), "", "",
                                            wildcard="TXT files (*.txt)|*.txt",
                                            style=wx.FD_OPEN +
@@ -713,110 +1471,258 @@ class Gui(wx.Frame):
             if openFileDialog.ShowModal() == wx.ID_CANCEL:
                 return
             path = openFileDialog.GetPath()
-            scanner = Scanner(path, names)
-            parser = Parser(names, devices, network, monitors, scanner)
-            if parser.parse_network():
-                self.main_sizer.GetContainingWindow().Close()
-                app = wx.App()
-                gui = Gui("Logic Simulator", path, names, devices, network,
-                          monitors)
-                gui.Show(True)
-                app.MainLoop()
-            else:
-                full_error_message = "".join(parser.error_messages)
-                error_app = wx.App()
-                error = ErrorWindow("Error!", full_error_message)
-                error.Show(True)
-                error_app.MainLoop()
+            self.text_progress.SetLabel(_(u"Loading {0}").format(path))
+            threading.Thread(target=self.read_file, args=(path,),
+                             daemon=True).start()
+
+    def read_file(self, path):
+        """Parse the definition file at path in a worker thread.
+
+        The result is passed back to the main thread with wx.CallAfter.
+        """
+        [names, devices, network, monitors,
+         error_messages] = parse_file(path)
+        wx.CallAfter(self.on_file_parsed, path, names, devices, network,
+                     monitors, error_messages)
+
+    def on_file_parsed(self, path, names, devices, network, monitors,
+                       error_messages):
+        """Load the parsed network, or show the parser errors."""
+        if not self:  # the window was closed while parsing
+            return
+        self.text_progress.SetLabel("")
+        if names is not None:
+            self.load_network(names, devices, network, monitors)
+            self.watch_file(path)
+        else:
+            full_error_message = "".join(error_messages)
+            error = ErrorWindow("Error!", full_error_message)
+            error.Show(True)
+
+    def watch_file(self, path):
+        """Reload the network whenever the definition file at path changes.
+
+        Changes are detected by a hotreload.FileWatcher thread and applied
+        on the main thread by on_file_changed.
+        """
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if path is None:
+            return
+
+        def callback(change):
+            wx.CallAfter(self.on_file_changed, change)
+        self.watcher = FileWatcher(path, Netlist(self.names, self.devices,
+                                                 self.monitors), callback)
+        self.watcher.start()
+
+    def on_file_changed(self, change):
+        """Apply a change of the definition file to the simulation.
+
+        If only monitors or initial switch states changed, the simulation
+        keeps its state and only those changes are applied. Otherwise the
+        new network replaces the old one.
+        """
+        if not self:  # the window was closed
+            return
+        if change.names is None:
+            full_error_message = "".join(change.error_messages)
+            error = ErrorWindow("Error!", full_error_message)
+            error.Show(True)
+        elif change.changes is not None:
+            with self.simulation_lock:
+                apply_changes(change.changes, self.names, self.devices,
+                              self.monitors, self.cycles_completed)
+                self.useful_monitors = self.build_gui_monitor_dictionary()
+            self.build_panels()
+            if self.cycles_completed > 0:
+                self.canvas.render("", self.cycles_completed,
+                                   self.useful_monitors)
+        else:
+            self.load_network(change.names, change.devices, change.network,
+                              change.monitors)
+
+    def load_network(self, names, devices, network, monitors):
+        """Replace the simulated network, keeping the window and canvas.
+
+        Any run in progress is cancelled, and the switch and monitor panels
+        are rebuilt for the new network.
+        """
+        if self.simulation_thread is not None:
+            self.cancel_event.set()
+            self.simulation_thread.join()
+            self.simulation_thread = None
+            self.run_button.Enable()
+            self.continue_button.Enable()
+            self.cancel_button.Disable()
+        self.progress_gauge.SetValue(0)
+
+        network.detect_period = self.network.detect_period
+        if self.network.use_clusters and not network.use_clusters:
+            network.use_clusters = True
+            network.compile_clusters(monitors.monitors_dictionary)
+        self.names = names
+        self.devices = devices
+        self.network = network
+        self.monitors = monitors
+        self.cycles_completed = 0
+        self.useful_monitors = {}
+        self.canvas.reset(devices, monitors)
+        self.build_panels()
+
+    def build_panels(self):
+        """Refill the switch and monitor lists for the current network.
+
+        The names are gathered once here, and afterwards moved between the
+        lists as monitors are added and removed.
+        """
+        self.switch_devices = {}
+        for device in self.devices.devices_list:
+            if device.device_kind == self.devices.SWITCH:
+                switch_name = self.names.get_name_string(device.device_id)
+                self.switch_devices[switch_name] = device
+        [monitored_list, not_monitored_list] = self.monitors.get_signal_names()
+        self.switch_list.set_names(self.switch_devices)
+        self.monitor_list.set_names(monitored_list)
+        self.signal_list.set_names(not_monitored_list)
+
+    def get_switch_columns(self, switch_name):
+        """Return the state shown next to the switch in the switch list."""
+        if self.switch_devices[switch_name].switch_state == 0:
+            return [_(u"OFF")]
+        return [_(u"ON")]
+
+    def on_search(self, signal_list):
+        """Handle the event when the user types in the search box of a list."""
+        def on_text(event):
+            signal_list.set_filter(event.GetString())
+        return on_text
 
     def on_run_button(self, event):
         """Handle the event when the user clicks the run button."""
+        if self.simulation_thread is not None:  # a run is in progress
+            return
         self.cycles_completed = 0
         cycles = self.spin.GetValue()
-        self.monitored_list = self.monitors.get_signal_names()[0]
         self.monitors.reset_monitors()
         self.devices.cold_startup()
-        for _ in range(cycles):
-            if self.network.execute_network():
-                self.monitors.record_signals()
-                self.cycles_completed += 1
-        self.useful_monitors = self.build_gui_monitor_dictionary()
-        self.canvas.render("", self.cycles_completed, self.useful_monitors)
+        self.start_simulation(cycles)
 
     def on_continue_button(self, event):
         """Handle the event when the user clicks the continue button."""
+        if self.simulation_thread is not None:  # a run is in progress
+            return
         if self.cycles_completed > 0:
             cycles = self.spin.GetValue()
-            self.monitored_list = self.monitors.get_signal_names()[0]
-            for _ in range(cycles):
-                if self.network.execute_network():
-                    self.monitors.record_signals()
-                    self.cycles_completed += 1
-            self.useful_monitors = self.build_gui_monitor_dictionary()
-            self.canvas.render("", self.cycles_completed,
-                               self.useful_monitors)
+            self.start_simulation(cycles)
+
+    def on_cancel_button(self, event):
+        """Handle the event when the user clicks the cancel button."""
+        self.cancel_event.set()
 
     def on_quit_button(self, event):
         """Handle the event when the user clicks the run button."""
+        self.cancel_event.set()
+        self.watch_file(None)
         self.main_sizer.GetContainingWindow().Close()
 
-    def toggle_switch(self, switch_id):
-        """Handle the event when the user toggles a switch."""
-        def switch_change(event):
-            switch_object = event.GetEventObject()
-            if switch_object.GetLabel() == _(u"ON"):
-                current_state = 1
-            else:
-                current_state = 0
-            new_state = 1 - current_state
-            self.devices.set_switch(switch_id, new_state)
-            if new_state == 0:
-                switch_object.SetBackgroundColour(wx.Colour(255, 69, 0))
-                switch_object.SetLabel(_(u"OFF"))
-            else:
-                switch_object.SetBackgroundColour(wx.Colour(42, 145, 52))
-                switch_object.SetLabel(_(u"ON"))
-        return switch_change
-
-    def on_remove_button(self, monitor):
-        """Handle the event when the user clicks a remove button."""
-        def on_button_click(event):
-            subitem = event.GetEventObject().GetContainingSizer()
-            self.item_monitors.Hide(subitem)
-            self.item_monitors.Remove(subitem)
+    def start_simulation(self, cycles):
+        """Run the network for the specified number of cycles.
+
+        The cycles are executed by a worker thread, so the window stays
+        responsive and the run can be cancelled.
+        """
+        self.cancel_event.clear()
+        self.run_button.Disable()
+        self.continue_button.Disable()
+        self.cancel_button.Enable()
+        self.progress_gauge.SetRange(max(cycles, 1))
+        self.progress_gauge.SetValue(0)
+        self.simulation_thread = threading.Thread(
+            target=self.run_simulation, args=(cycles,), daemon=True)
+        self.simulation_thread.start()
+
+    def run_simulation(self, cycles):
+        """Execute the network in the worker thread.
+
+        Progress is posted back to the main thread with wx.CallAfter, at
+        most once every frame_interval seconds.
+        """
+        start_time = time.perf_counter()
+        last_update = start_time
+        cycles_done = 0
+        while cycles_done < cycles and not self.cancel_event.is_set():
+            chunk = min(self.chunk_size, cycles - cycles_done)
+            with self.simulation_lock:
+                self.cycles_completed += self.network.run_cycles(
+                    chunk, self.monitors)
+                cycles_done += chunk
+            now = time.perf_counter()
+            if now - last_update >= self.frame_interval:
+                last_update = now
+                wx.CallAfter(self.on_progress, cycles_done, cycles,
+                             cycles_done / (now - start_time))
+        elapsed = time.perf_counter() - start_time
+        rate = cycles_done / elapsed if elapsed > 0 else 0
+        wx.CallAfter(self.on_simulation_done, cycles_done, cycles, rate)
+
+    def on_progress(self, cycles_done, cycles, rate):
+        """Update the progress bar and redraw the canvas during a run."""
+        if not self:  # the window was closed during the run
+            return
+        self.progress_gauge.SetValue(cycles_done)
+        self.text_progress.SetLabel(
+            _(u"{0} of {1} cycles, {2:.0f} cycles/s").format(
+                cycles_done, cycles, rate))
+        with self.simulation_lock:
+            cycles_completed = self.cycles_completed
+            self.useful_monitors = self.build_gui_monitor_dictionary()
+        if cycles_completed > 0:
+            self.canvas.render("", cycles_completed, self.useful_monitors)
+
+    def on_simulation_done(self, cycles_done, cycles, rate):
+        """Update the widgets and redraw the canvas when a run ends."""
+        if not self or self.simulation_thread is None:  # closed or reloaded
+            return
+        self.simulation_thread.join()
+        self.simulation_thread = None
+        self.run_button.Enable()
+        self.continue_button.Enable()
+        self.cancel_button.Disable()
+        self.on_progress(cycles_done, cycles, rate)
+        if cycles_done < cycles:
+            self.text_progress.SetLabel(
+                _(u"Cancelled after {0} of {1} cycles").format(cycles_done,
+                                                               cycles))
+
+    def on_toggle_button(self, event):
+        """Handle the event when the user toggles the selected switches."""
+        with self.simulation_lock:  # takes effect between cycles
+            for switch_name in self.switch_list.get_selected_names():
+                device = self.switch_devices[switch_name]
+                self.devices.set_switch(device.device_id,
+                                        1 - device.switch_state)
+        self.switch_list.Refresh()
+
+    def on_remove_button(self, event):
+        """Handle the event when the user clears the selected monitors."""
+        for monitor in self.monitor_list.get_selected_names():
             [device_id, output_id] = self.devices.get_signal_ids(monitor)
-            self.monitors.remove_monitor(device_id, output_id)
-            self.not_monitored_list = self.monitors.get_signal_names()[1]
-            self.monitor_combo.SetItems(self.not_monitored_list)
-            self.item_monitors.Layout()
-            self.main_sizer.Layout()
-        return on_button_click
+            with self.simulation_lock:
+                self.monitors.remove_monitor(device_id, output_id)
+            self.monitor_list.remove_name(monitor)
+            self.signal_list.add_name(monitor)
 
     def on_add_monitor_button(self, event):
-        """Handle the event when the user clicks the add monitor button."""
-        monitor = self.monitor_combo.GetStringSelection()
-        if monitor:
+        """Handle the event when the user adds the selected signals."""
+        for monitor in self.signal_list.get_selected_names():
             [device_id, output_id] = self.devices.get_signal_ids(monitor)
-            self.monitors.make_monitor(device_id,
-                                       output_id, self.cycles_completed)
-            self.not_monitored_list = self.monitors.get_signal_names()[1]
-            self.monitor_combo.SetItems(self.not_monitored_list)
-
-            self.monitor_subitem = wx.BoxSizer(wx.HORIZONTAL)
-            self.item_monitors.Add(self.monitor_subitem, 0, 0, 0)
-
-            self.new_monitor_text = wx.StaticText(self.monitor_window,
-                                                  wx.ID_ANY,
-                                                  monitor)
-            self.new_monitor_button = wx.Button(self.monitor_window,
-                                                wx.ID_ANY, _(u"Clear"))
-            self.new_monitor_button.SetBackgroundColour(wx.Colour(255, 69, 0))
-            self.new_monitor_button.Bind(wx.EVT_BUTTON,
-                                         self.on_remove_button(monitor))
-            self.monitor_subitem.Add(self.new_monitor_button, 0, wx.ALL, 5)
-            self.monitor_subitem.Add(self.new_monitor_text,
-                                     1, wx.ALIGN_CENTER | wx.ALL, 5)
-            self.main_sizer.Layout()
+            with self.simulation_lock:
+                self.monitors.make_monitor(device_id,
+                                           output_id, self.cycles_completed)
+            self.signal_list.remove_name(monitor)
+            self.monitor_list.add_name(monitor)
 
     def on_dotted_button(self, event):
         """Handle the event when the user clicks the add dotted line button."""
@@ -835,7 +1741,8 @@ class Gui(wx.Frame):
         """Convert monitors.dictionary to a more useful dictionary."""
         new_dict = {}
         for device_id, output_id in self.monitors.monitors_dictionary:
-            monitor_name = self.devices.get_signal_name(device_id, output_id)
+            monitor_name = self.monitors.get_monitor_name(device_id,
+                                                          output_id)
             value = self.monitors.monitors_dictionary[(device_id, output_id)]
             new_dict[monitor_name] = value
         return new_dict
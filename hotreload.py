@@ -0,0 +1,307 @@
+"""Watch definition files and reload networks when they change.
+
+Used in the Logic Simulator project to shorten the edit-simulate loop. When
+the definition file of a running simulation is edited, it is parsed again in
+the background and compared with the network loaded before. If only the
+monitors or the initial switch states changed, the live simulation keeps its
+state and only those changes are applied. Otherwise the new network replaces
+the old one.
+
+Classes
+-------
+Netlist - describes the structure of a parsed network by name.
+FileChange - stores the result of reparsing a changed definition file.
+FileWatcher - reparses a definition file when its contents change.
+
+Functions
+---------
+parse_file - parses a definition file into new simulator objects.
+apply_changes - applies monitor and switch changes to a live network.
+"""
+import hashlib
+import os
+import queue
+import threading
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+
+
+def parse_file(path, devices_class=Devices, output=None):
+    """Parse the definition file at path into new simulator objects.
+
+    The devices are stored in an instance of devices_class, either
+    devices.Devices or devicearrays.ArrayDevices. Parser messages are
+    printed to the output stream, standard output if None.
+
+    Return [names, devices, network, monitors, []] if successful, or
+    [None, None, None, None, error_messages].
+    """
+    names = Names()
+    devices = devices_class(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    try:
+        scanner = Scanner(path, names, output)
+    except SystemExit:  # the scanner could not open the file
+        return [None, None, None, None, ["File could not be read."]]
+    parser = Parser(names, devices, network, monitors, scanner, output)
+    parsed = parser.parse_network()
+    scanner.file_object.close()
+    if not parsed:
+        return [None, None, None, None, parser.error_messages]
+    return [names, devices, network, monitors, []]
+
+
+def apply_changes(changes, names, devices, monitors, cycles_completed,
+                  set_switch=None):
+    """Apply the changes returned by Netlist.compare to a live network.
+
+    changes is [switch_states, added_monitors, removed_monitors]. Switches
+    are set with set_switch(device_id, signal), which defaults to
+    devices.set_switch. New monitors are padded with BLANK signals for the
+    cycles_completed cycles already simulated.
+    """
+    [switch_states, added_monitors, removed_monitors] = changes
+    if set_switch is None:
+        set_switch = devices.set_switch
+    for switch_name, signal in switch_states.items():
+        set_switch(names.query(switch_name), signal)
+    for signal_name in removed_monitors:
+        monitors.remove_monitor(*devices.get_signal_ids(signal_name))
+    for signal_name in added_monitors:
+        [device_id, output_id] = devices.get_signal_ids(signal_name)
+        monitors.make_monitor(device_id, output_id, cycles_completed)
+    devices.state_changes += 1  # set_switch may not be devices.set_switch
+
+
+class Netlist:
+    """Describe the structure of a parsed network by name.
+
+    Names are used instead of IDs, so that networks parsed with different
+    Names instances can be compared. The monitors and the initial switch
+    states are kept apart from the rest of the structure, as they can be
+    changed without restarting the simulation.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    monitors: instance of the monitors.Monitors() class.
+
+    Public methods
+    --------------
+    compare(self, other): Returns the monitor and switch changes from this
+                          netlist to the other, or None if the structure of
+                          the network changed.
+    """
+
+    # Device properties set by the definition file, apart from switch states
+    properties = ["device_kind", "clock_half_period", "siggen_period",
+                  "siggen_waveform", "initial_state", "register_width",
+                  "memory_address_bits", "memory_data_bits", "memory_file"]
+
+    def __init__(self, names, devices, monitors):
+        """Describe the devices, connections and monitors by name."""
+        self.structure = {}  # {device_name: (properties, inputs, outputs)}
+        self.switch_states = {}  # {switch_name: initial state}
+        for device in devices.devices_list:
+            device_name = names.get_name_string(device.device_id)
+            properties = []
+            for attribute in self.properties:
+                value = getattr(device, attribute)
+                if isinstance(value, list):
+                    value = tuple(value)
+                properties.append(value)
+            properties[0] = names.get_name_string(device.device_kind)
+            inputs = []
+            for input_id, signal in device.inputs.items():
+                if signal is not None:
+                    signal = self.get_name(names, *signal)
+                inputs.append((names.get_name_string(input_id), signal))
+            outputs = [self.get_name(names, device.device_id, output_id)
+                       for output_id in device.outputs]
+            self.structure[device_name] = (tuple(properties),
+                                           tuple(sorted(inputs)),
+                                           tuple(outputs))
+            if device.device_kind == devices.SWITCH:
+                self.switch_states[device_name] = device.switch_state
+        self.monitored = [self.get_name(names, *signal)
+                          for signal in monitors.monitors_dictionary]
+
+    def get_name(self, names, device_id, port_id):
+        """Return the name string of the signal."""
+        if port_id is None:
+            return names.get_name_string(device_id)
+        return ".".join([names.get_name_string(device_id),
+                         names.get_name_string(port_id)])
+
+    def compare(self, other):
+        """Return the changes from this netlist to the other.
+
+        Return [switch_states, added_monitors, removed_monitors], where
+        switch_states maps the names of switches whose initial state changed
+        to their new state. Return None if any device or connection changed.
+        """
+        if self.structure != other.structure:
+            return None
+        switch_states = {name: state
+                         for name, state in other.switch_states.items()
+                         if self.switch_states[name] != state}
+        added_monitors = [name for name in other.monitored
+                          if name not in self.monitored]
+        removed_monitors = [name for name in self.monitored
+                            if name not in other.monitored]
+        return [switch_states, added_monitors, removed_monitors]
+
+
+class FileChange:
+    """Store the result of reparsing a changed definition file.
+
+    Parameters
+    ----------
+    path: path of the definition file.
+    objects: [names, devices, network, monitors] parsed from the file, or
+             None if the file has errors.
+    netlist: Netlist of the parsed network, or None.
+    changes: changes returned by Netlist.compare, or None if the structure
+             of the network changed.
+    error_messages: list of parser error messages.
+
+    Public methods
+    --------------
+    No public methods.
+    """
+
+    def __init__(self, path, objects, netlist, changes, error_messages):
+        """Initialise the change properties."""
+        self.path = path
+        [self.names, self.devices, self.network,
+         self.monitors] = objects or [None] * 4
+        self.netlist = netlist
+        self.changes = changes
+        self.error_messages = error_messages
+
+
+class FileWatcher:
+    """Reparse a definition file when its contents change.
+
+    The file is checked every interval seconds by a background thread once
+    start is called, or whenever check is called. Changes are passed to
+    callback, called from the watcher thread, or queued if no callback is
+    given. The scanner rewrites line endings when it reads a file, so the
+    contents, not the modification time, decide whether the file changed.
+
+    Parameters
+    ----------
+    path: path of the definition file.
+    netlist: Netlist of the network loaded from the file.
+    callback: function called with each FileChange, or None.
+    interval: seconds between checks of the file.
+    devices_class: class storing the devices of reparsed networks.
+
+    Public methods
+    --------------
+    start(self): Starts checking the file in a background thread.
+
+    stop(self): Stops the background thread.
+
+    check(self, output=None): Checks the file once, and returns a
+                              FileChange if its contents changed, or None.
+
+    get_change(self): Returns the next queued FileChange, or None.
+    """
+
+    def __init__(self, path, netlist, callback=None, interval=1.0,
+                 devices_class=Devices):
+        """Record the current state of the file."""
+        self.path = path
+        self.netlist = netlist
+        self.callback = callback
+        self.interval = interval
+        self.devices_class = devices_class
+        self.changes = queue.Queue()  # used if there is no callback
+
+        self.stat = self.get_stat()
+        self.digest = self.get_digest()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def get_stat(self):
+        """Return the size and modification time of the file, or None."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:  # the file is being replaced by an editor
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def get_digest(self):
+        """Return a hash of the file contents, ignoring line endings."""
+        try:
+            with open(self.path, "rb") as opened_file:
+                contents = opened_file.read()
+        except OSError:
+            return None
+        return hashlib.sha1(contents.replace(b"\r\n", b"\n")).hexdigest()
+
+    def start(self):
+        """Start checking the file in a background thread."""
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.watch, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background thread."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def watch(self):
+        """Check the file every interval seconds until stopped."""
+        while not self.stop_event.wait(self.interval):
+            change = self.check()
+            if change is None:
+                continue
+            if self.callback is None:
+                self.changes.put(change)
+            else:
+                self.callback(change)
+
+    def check(self, output=None):
+        """Check the file once.
+
+        Return a FileChange if the contents of the file changed since the
+        last check, or None. Parser messages are printed to the output
+        stream, standard output if None.
+        """
+        stat = self.get_stat()
+        if stat is None or stat == self.stat:
+            return None
+        digest = self.get_digest()
+        if digest is None or digest == self.digest:
+            self.stat = stat
+            return None
+        [names, devices, network, monitors,
+         error_messages] = parse_file(self.path, self.devices_class,
+                                      output)
+        self.stat = self.get_stat()  # the scanner rewrote the file
+        self.digest = digest
+        if names is None:
+            return FileChange(self.path, None, None, None, error_messages)
+        netlist = Netlist(names, devices, monitors)
+        changes = self.netlist.compare(netlist)
+        self.netlist = netlist
+        return FileChange(self.path, [names, devices, network, monitors],
+                          netlist, changes, [])
+
+    def get_change(self):
+        """Return the next queued FileChange, or None."""
+        try:
+            return self.changes.get_nowait()
+        except queue.Empty:
+            return None
@@ -8,17 +8,31 @@ Usage
 -----
 Show help: logsim.py -h
 Command line user interface: logsim.py -c <file path>
+Command line user interface with N worker processes:
+    logsim.py -j <N> -c <file path>
+Repeat periodic behaviour instead of simulating it: logsim.py -p ...
+Compile small gate clusters into truth tables: logsim.py --clusters ...
+Store devices in compact arrays, for very large networks:
+    logsim.py --compact ...
+Simulation server on localhost TCP port (default 8765):
+    logsim.py --serve [--port <port>]
+Simulation server on a Unix socket: logsim.py --serve --socket <path>
 Graphical user interface (English): logsim.py <file path>
 Graphical user interface (Thai): logsim.py -t <file path>
 Graphical user interface (French): logsim.py -f <file path>
+
+Start-up time
+-------------
+The GUI stack (wx, OpenGL and the gui module), the server, the worker
+process modules and the compact device store are only imported when they are
+used. The command line user interface must reach its prompt on a small
+definition file within 0.5 seconds; test_logsim.py checks this budget.
 """
 import getopt
 import sys
 import builtins
 import os
 
-import wx
-
 from names import Names
 from devices import Devices
 from network import Network
@@ -26,7 +40,7 @@ from monitors import Monitors
 from scanner import Scanner
 from parse import Parser
 from userint import UserInterface
-from gui import Gui
+from hotreload import Netlist, FileWatcher
 
 
 def main(arg_list):
@@ -38,6 +52,16 @@ def main(arg_list):
     umessage = ("Usage:\n"
                 "Show help: logsim.py -h\n"
                 "Command line user interface: logsim.py -c <file path>\n"
+                "Command line user interface with N worker processes: "
+                "logsim.py -j <N> -c <file path>\n"
+                "Repeat periodic behaviour instead of simulating it: "
+                "logsim.py -p ...\n"
+                "Compile small gate clusters into truth tables: "
+                "logsim.py --clusters ...\n"
+                "Store devices in compact arrays, for very large networks: "
+                "logsim.py --compact ...\n"
+                "Simulation server: logsim.py --serve [--port <port>] "
+                "[--socket <path>]\n"
                 "Graphical user interface (English): logsim.py <file path>\n"
                 "Graphical user interface (Thai): logsim.py -t <file path>\n"
                 "Graphical user interface (French): logsim.py -f <file path>\n"
@@ -46,22 +70,59 @@ def main(arg_list):
                 "logsim.py <file path>\n"
                 "Specifying file path is optional")
     try:
-        options, arguments = getopt.getopt(arg_list, "hc:t:f:")
+        options, arguments = getopt.getopt(arg_list, "hpc:t:f:j:",
+                                           ["serve", "port=", "socket=",
+                                            "compact", "clusters"])
     except getopt.GetoptError:
         print("Error: invalid command line arguments\n")
         print(umessage)
         sys.exit()
 
+    # Number of worker processes for the command line user interface
+    workers = 1
+    for option, value in options:
+        if option == "-j":
+            if not value.isdigit() or int(value) < 1:
+                print("Error: expected a positive number of workers\n")
+                print(umessage)
+                sys.exit()
+            workers = int(value)
+    # Repeat periodic behaviour of the network instead of simulating it
+    detect_period = ("-p", "") in options
+    # Execute small combinational clusters from truth tables
+    use_clusters = ("--clusters", "") in options
+    # Store devices in arrays rather than one object per device
+    devices_class = Devices
+    if ("--compact", "") in options:
+        from devicearrays import ArrayDevices
+        devices_class = ArrayDevices
+    options = [(option, value) for option, value in options
+               if option not in ["-j", "-p", "--compact", "--clusters"]]
+
+    # Serve simulations over a socket instead of starting an interface
+    server_options = dict(options)
+    if "--serve" in server_options:
+        port = server_options.get("--port", "8765")
+        if not port.isdigit():
+            print("Error: expected a port number\n")
+            print(umessage)
+            sys.exit()
+        from server import SimulationServer
+        server = SimulationServer()
+        server.serve(int(port), server_options.get("--socket"))
+        sys.exit()
+    elif "--port" in server_options or "--socket" in server_options:
+        print("Error: --port and --socket require --serve\n")
+        print(umessage)
+        sys.exit()
+
     # Initialise instances of the four inner simulator classes
     names = Names()
-    devices = Devices(names)
+    devices = devices_class(names)
     network = Network(names, devices)
     monitors = Monitors(names, devices, network)
-
-    # Supported Languages
-    supLang = {u"en_GB.UTF-8": wx.LANGUAGE_ENGLISH,
-               u"th_TH.UTF-8": wx.LANGUAGE_THAI,
-               u"fr_FR.UTF-8": wx.LANGUAGE_FRENCH, }
+    network.detect_period = detect_period
+    network.use_clusters = use_clusters
 
     for option, path in options:
         if option == "-h":  # print the usage message
@@ -71,45 +132,35 @@ def main(arg_list):
             scanner = Scanner(path, names)
             parser = Parser(names, devices, network, monitors, scanner)
             if parser.parse_network():
+                simulator = None
+                if workers > 1:
+                    from partition import ParallelSimulator
+                    simulator = ParallelSimulator(names, devices, network,
+                                                  monitors, workers)
+                    simulator.start()
+                # Reload the network when the definition file is edited
+                watcher = FileWatcher(path, Netlist(names, devices, monitors),
+                                      devices_class=devices_class)
+                watcher.start()
                 # Initialise an instance of the userint.UserInterface() class
-                userint = UserInterface(names, devices, network, monitors)
+                userint = UserInterface(names, devices, network, monitors,
+                                        simulator, watcher)
                 userint.command_interface()
+                watcher.stop()
+                if simulator is not None:
+                    simulator.stop()
         elif option == "-t":  # Launch GUI in Thai
             scanner = Scanner(path, names)
             parser = Parser(names, devices, network, monitors, scanner)
             if parser.parse_network():
-                app = wx.App()
-
-                # Internationalisation
-                builtins._ = wx.GetTranslation
-                locale = wx.Locale()
-                locale.Init(wx.LANGUAGE_THAI)  # Set language to Thai
-
-                locale.AddCatalogLookupPathPrefix('locale')
-                locale.AddCatalog('gui')
-
-                gui = Gui("Logic Simulator", path, names, devices, network,
-                          monitors)
-                gui.Show(True)
-                app.MainLoop()
+                launch_gui(path, names, devices, network, monitors,
+                           "th_TH.UTF-8")
         elif option == "-f":  # Launch GUI in French
             scanner = Scanner(path, names)
             parser = Parser(names, devices, network, monitors, scanner)
             if parser.parse_network():
-                app = wx.App()
-
-                # Internationalisation
-                builtins._ = wx.GetTranslation
-                locale = wx.Locale()
-                locale.Init(wx.LANGUAGE_FRENCH)  # Set language to French
-
-                locale.AddCatalogLookupPathPrefix('locale')
-                locale.AddCatalog('gui')
-
-                gui = Gui("Logic Simulator", path, names, devices, network,
-                          monitors)
-                gui.Show(True)
-                app.MainLoop()
+                launch_gui(path, names, devices, network, monitors,
+                           "fr_FR.UTF-8")
 
     if not options:  # no option given, use the graphical user interface
 
@@ -117,58 +168,53 @@ def main(arg_list):
             print("Error: Only one file path required\n")
             print(umessage)
             sys.exit()
+        # If an unsupported language is requested default to English
+        try:
+            lang = os.environ["LANG"]  # Get LANG variable
+        except KeyError:
+            lang = None  # Set to None if LANG unset
         if arguments:   # Try to launch GUI with path
             [path] = arguments
             scanner = Scanner(path, names)
             parser = Parser(names, devices, network, monitors, scanner)
             if parser.parse_network():
-                app = wx.App()
-
-                # Internationalisation
-                builtins._ = wx.GetTranslation
-                locale = wx.Locale()
-                # If an unsupported language is requested default to English
-                try:
-                    lang = os.environ["LANG"]  # Get LANG variable
-                except KeyError:
-                    lang = None  # Set to None if LANG unset
-                if lang in supLang:
-                    selLang = supLang[lang]
-                else:
-                    selLang = wx.LANGUAGE_ENGLISH
-                locale.Init(selLang)
-
-                locale.AddCatalogLookupPathPrefix('locale')
-                locale.AddCatalog('gui')
-
-                gui = Gui("Logic Simulator", path, names, devices, network,
-                          monitors)
-                gui.Show(True)
-                app.MainLoop()
+                launch_gui(path, names, devices, network, monitors, lang)
         else:   # Launch GUI without path
-            app = wx.App()
-
-            # Internationalisation
-            builtins._ = wx.GetTranslation
-            locale = wx.Locale()
-            # If an unsupported language is requested default to English
-            try:
-                lang = os.environ["LANG"]  # Get LANG variable
-            except KeyError:
-                lang = None  # Set to None if LANG unset
-            if lang in supLang:
-                selLang = supLang[lang]
-            else:
-                selLang = wx.LANGUAGE_ENGLISH
-            locale.Init(selLang)
-
-            locale.AddCatalogLookupPathPrefix('locale')
-            locale.AddCatalog('gui')
-
-            gui = Gui("Logic Simulator", None, names, devices, network,
-                      monitors)
-            gui.Show(True)
-            app.MainLoop()
+            launch_gui(None, names, devices, network, monitors, lang)
+
+
+def launch_gui(path, names, devices, network, monitors, lang=None):
+    """Run the graphical user interface in the language lang.
+
+    wx and the GUI modules are only imported here, so that the command line
+    user interface and the server never load the GUI stack. Unsupported
+    languages default to English.
+    """
+    import wx
+    from gui import Gui
+
+    # Supported Languages
+    supLang = {u"en_GB.UTF-8": wx.LANGUAGE_ENGLISH,
+               u"th_TH.UTF-8": wx.LANGUAGE_THAI,
+               u"fr_FR.UTF-8": wx.LANGUAGE_FRENCH, }
+
+    app = wx.App()
+
+    # Internationalisation
+    builtins._ = wx.GetTranslation
+    locale = wx.Locale()
+    if lang in supLang:
+        selLang = supLang[lang]
+    else:
+        selLang = wx.LANGUAGE_ENGLISH
+    locale.Init(selLang)
+
+    locale.AddCatalogLookupPathPrefix('locale')
+    locale.AddCatalog('gui')
+
+    gui = Gui("Logic Simulator", path, names, devices, network, monitors)
+    gui.Show(True)
+    app.MainLoop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+"""Map ROM images from binary files.
+
+Used in the Logic Simulator project to hold the contents of ROM devices. A
+ROM image is a binary file of data words, each stored little-endian in as
+many whole bytes as its data bits need, starting at address 0. Files shorter
+than the address space read as zeros past their end. The file is
+memory-mapped, so only the pages holding the addressed words are ever read.
+
+Classes
+-------
+RomImage - maps the contents of a ROM image file.
+"""
+import mmap
+import os
+
+
+class RomImage:
+    """Map the contents of a ROM image file.
+
+    Instances index and slice like the bytes of the file, and compare equal
+    if they map the same unchanged file.
+
+    Parameters
+    ----------
+    path: path of the ROM image file.
+
+    Public methods
+    --------------
+    No public methods.
+    """
+
+    def __init__(self, path):
+        """Map the file.
+
+        Raise OSError if the file cannot be read, or ValueError if it is
+        empty.
+        """
+        self.path = os.path.abspath(path)
+        with open(self.path, "rb") as image_file:
+            stat = os.fstat(image_file.fileno())
+            # Raises ValueError if the file is empty
+            self.mapping = mmap.mmap(image_file.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+        # The contents are not hashed, as that would read the whole file
+        self.key = (self.path, stat.st_size, stat.st_mtime_ns)
+
+    def __getitem__(self, index):
+        """Return the byte or bytes of the file at index."""
+        return self.mapping[index]
+
+    def __len__(self):
+        """Return the size of the file in bytes."""
+        return len(self.mapping)
+
+    def __eq__(self, other):
+        """Return True if the other image maps the same unchanged file."""
+        if not isinstance(other, RomImage):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        """Return a hash of the path, size and modification time."""
+        return hash(self.key)
+
+    def __deepcopy__(self, memo):
+        """Share the image between copies, as it is read-only."""
+        return self
+
+    def __reduce__(self):
+        """Map the file again when unpickled."""
+        return (RomImage, (self.path,))
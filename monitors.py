@@ -8,7 +8,9 @@ Classes
 Monitors - records and displays specified output signals.
 
 """
+import bisect
 import collections
+import sys
 
 
 class Monitors:
@@ -34,16 +36,30 @@ class Monitors:
     get_monitor_signal(self, device_id, output_id): Returns the signal level of
                                                     the specified monitor.
 
-    record_signals(self): Records the current signal level of all monitors.
+    record_signals(self, cycles=1): Records the current signal level of all
+                                    monitors for the number of cycles.
+
+    repeat_signals(self, period, repeats): Repeats the signals recorded in
+                                           the last period cycles.
 
     get_signal_names(self): Returns two lists of signal names: monitored and
                             not monitored.
 
+    get_monitor_name(self, device_id, output_id): Returns the signal name of
+                                                  the specified monitor.
+
+    update_index(self): Adds the outputs of newly created devices to the
+                        signal name index.
+
     reset_monitors(self): Clears the memory of all monitors.
 
     get_margin(self): Returns the length of the longest monitor's name.
 
-    display_signals(self): Displays signal trace(s) in the text console.
+    get_trace(self, signal_list): Returns the text trace of a signal list.
+
+    display_signals(self, start=None, stop=None, width=None): Displays signal
+                                                              trace(s) in the
+                                                              text console.
     """
 
     def __init__(self, names, devices, network):
@@ -56,9 +72,34 @@ class Monitors:
         # {(device_id, output_id): [signal_list]}
         self.monitors_dictionary = collections.OrderedDict()
 
+        # The signal name index stores the name of every device output, so
+        # that names are not rebuilt from the devices on every query. It is
+        # extended with the outputs of new devices by update_index.
+        self.signal_names = {}  # {(device_id, output_id): signal_name}
+        self.signals = []  # indexed signals, in the order of the devices
+        self.positions = {}  # {(device_id, output_id): position in signals}
+        self.not_monitored = []  # sorted positions of unmonitored signals
+        self.indexed_devices = 0  # number of devices in the index
+        # name_lengths stores {name_length: number of monitors}
+        self.name_lengths = collections.Counter()
+        self.margin = None  # length of the longest monitor name
+
         [self.NO_ERROR, self.NOT_OUTPUT,
          self.MONITOR_PRESENT] = self.names.unique_error_codes(3)
 
+        # Translation table from signals to trace characters. Any other
+        # value is left out of the trace.
+        self.trace_characters = {self.devices.LOW: "_",
+                                 self.devices.HIGH: "-",
+                                 self.devices.RISING: "/",
+                                 self.devices.FALLING: "\\",
+                                 self.devices.BLANK: " "}
+        self.trace_table = bytes.maketrans(
+            bytes(self.trace_characters),
+            "".join(self.trace_characters.values()).encode("ascii"))
+        self.trace_deleted = bytes(value for value in range(256)
+                                   if value not in self.trace_characters)
+
     def make_monitor(self, device_id, output_id, cycles_completed=0):
         """Add the specified signal to the monitors dictionary.
 
@@ -72,12 +113,25 @@ class Monitors:
         elif (device_id, output_id) in self.monitors_dictionary:
             return self.MONITOR_PRESENT
         else:
+            self.update_index()  # the device may be new to the index
             # If n simulation cycles have been completed before making this
             # monitor, then initialise the signal trace with an n-length list
             # of BLANK signals. Otherwise, initialise the trace with an empty
             # list.
             self.monitors_dictionary[(device_id, output_id)] = [
                 self.devices.BLANK] * cycles_completed
+            position = self.positions[(device_id, output_id)]
+            del self.not_monitored[bisect.bisect_left(self.not_monitored,
+                                                      position)]
+            name_length = len(self.signal_names[(device_id, output_id)])
+            self.name_lengths[name_length] += 1
+            if self.margin is None or name_length > self.margin:
+                self.margin = name_length
+            cluster = self.network.cluster_devices.get(device_id)
+            if cluster is not None and cluster.root_id != device_id:
+                # Interior gates of a compiled cluster are not simulated, so
+                # recompile the clusters with this output kept visible.
+                self.network.compile_clusters(self.monitors_dictionary)
             return self.NO_ERROR
 
     def remove_monitor(self, device_id, output_id):
@@ -89,6 +143,14 @@ class Monitors:
             return False
         else:
             del self.monitors_dictionary[(device_id, output_id)]
+            bisect.insort(self.not_monitored,
+                          self.positions[(device_id, output_id)])
+            name_length = len(self.signal_names[(device_id, output_id)])
+            self.name_lengths[name_length] -= 1
+            if not self.name_lengths[name_length]:
+                del self.name_lengths[name_length]
+                if name_length == self.margin:  # it was the longest name
+                    self.margin = max(self.name_lengths, default=None)
             return True
 
     def get_monitor_signal(self, device_id, output_id):
@@ -101,33 +163,66 @@ class Monitors:
         else:
             return None
 
-    def record_signals(self):
+    def record_signals(self, cycles=1):
         """Record the current signal level for every monitor.
 
-        This function is called at every simulation cycle.
+        This function is called at every simulation cycle. The level is
+        recorded the given number of times when cycles in which no signal
+        changes are skipped.
         """
         for device_id, output_id in self.monitors_dictionary:
             signal_level = self.get_monitor_signal(device_id, output_id)
-            self.monitors_dictionary[(device_id,
-                                      output_id)].append(signal_level)
+            if cycles == 1:
+                self.monitors_dictionary[(device_id,
+                                          output_id)].append(signal_level)
+            else:
+                self.monitors_dictionary[(device_id, output_id)].extend(
+                    [signal_level] * cycles)
+
+    def repeat_signals(self, period, repeats):
+        """Repeat the signals recorded in the last period cycles.
+
+        This function is called when the network is found to repeat itself
+        every period cycles, to record repeats more periods at once.
+        """
+        for signal_list in self.monitors_dictionary.values():
+            signal_list.extend(signal_list[-period:] * repeats)
 
     def get_signal_names(self):
         """Return two signal name lists: monitored and not monitored."""
-        non_monitored_signal_list = []
-        monitored_signal_list = []
-        for device_id, output_id in self.monitors_dictionary:
-            monitor_name = self.devices.get_signal_name(device_id, output_id)
-            monitored_signal_list.append(monitor_name)
+        self.update_index()
+        monitored_signal_list = [self.signal_names[signal]
+                                 for signal in self.monitors_dictionary]
+        non_monitored_signal_list = [
+            self.signal_names[self.signals[position]]
+            for position in self.not_monitored]
+        return [monitored_signal_list, non_monitored_signal_list]
 
-        for device_id in self.devices.find_devices():
-            device = self.devices.get_device(device_id)
-            for output_id in device.outputs:
-                if (device_id, output_id) not in self.monitors_dictionary:
-                    signal_name = self.devices.get_signal_name(device_id,
-                                                               output_id)
-                    non_monitored_signal_list.append(signal_name)
+    def get_monitor_name(self, device_id, output_id):
+        """Return the signal name of the specified monitor."""
+        return self.signal_names[(device_id, output_id)]
 
-        return [monitored_signal_list, non_monitored_signal_list]
+    def update_index(self):
+        """Add the outputs of newly created devices to the signal name index.
+
+        Devices are only ever appended to the devices list, so only the
+        devices after the last indexed one are visited.
+        """
+        devices_list = self.devices.devices_list
+        for device in devices_list[self.indexed_devices:]:
+            device_name = self.names.get_name_string(device.device_id)
+            for output_id in device.outputs:
+                signal = (device.device_id, output_id)
+                if output_id is None:
+                    self.signal_names[signal] = device_name
+                else:
+                    self.signal_names[signal] = ".".join(
+                        [device_name, self.names.get_name_string(output_id)])
+                self.positions[signal] = len(self.signals)
+                if signal not in self.monitors_dictionary:
+                    self.not_monitored.append(len(self.signals))
+                self.signals.append(signal)
+        self.indexed_devices = len(devices_list)
 
     def reset_monitors(self):
         """Clear the memory of all the monitors.
@@ -144,33 +239,44 @@ class Monitors:
         finding out how much space to leave after each monitor's name before
         starting to draw the signal trace.
         """
-        length_list = []  # for storing name lengths
-        for device_id, output_id in self.monitors_dictionary:
-            monitor_name = self.devices.get_signal_name(device_id, output_id)
-            name_length = len(monitor_name)
-            length_list.append(name_length)
-        if length_list:  # if the list is not empty
-            return max(length_list)
-        else:
-            return None
-
-    def display_signals(self):
-        """Display the signal trace(s) in the text console."""
+        return self.margin
+
+    def get_trace(self, signal_list):
+        """Return the text trace of the signal list, one character a cycle."""
+        try:
+            trace = bytes(signal_list).translate(self.trace_table,
+                                                 self.trace_deleted)
+        except (TypeError, ValueError):  # a signal is None or not a byte
+            return "".join([self.trace_characters.get(signal, "")
+                            for signal in signal_list])
+        return trace.decode("ascii")
+
+    def display_signals(self, start=None, stop=None, width=None):
+        """Display the signal trace(s) in the text console.
+
+        Only the cycles from start up to stop are displayed if given. If
+        width is given, traces too long to fit in lines of width characters
+        are wrapped into blocks, one line per monitor in each block. All the
+        lines are written at once.
+        """
         margin = self.get_margin()
+        labels = []
+        traces = []
         for device_id, output_id in self.monitors_dictionary:
-            monitor_name = self.devices.get_signal_name(device_id, output_id)
+            monitor_name = self.get_monitor_name(device_id, output_id)
             name_length = len(monitor_name)
             signal_list = self.monitors_dictionary[(device_id, output_id)]
-            print(monitor_name + (margin - name_length) * " ", end=": ")
-            for signal in signal_list:
-                if signal == self.devices.HIGH:
-                    print("-", end="")
-                if signal == self.devices.LOW:
-                    print("_", end="")
-                if signal == self.devices.RISING:
-                    print("/", end="")
-                if signal == self.devices.FALLING:
-                    print("\\", end="")
-                if signal == self.devices.BLANK:
-                    print(" ", end="")
-            print("\n", end="")
+            labels.append(monitor_name + (margin - name_length) * " " + ": ")
+            traces.append(self.get_trace(signal_list[start:stop]))
+
+        trace_length = max([len(trace) for trace in traces], default=0)
+        columns = trace_length
+        if width is not None and margin is not None:
+            columns = max(width - margin - 2, 1)
+        lines = []
+        for first in range(0, max(trace_length, 1), max(columns, 1)):
+            if first > 0:  # separate the blocks of wrapped traces
+                lines.append("\n")
+            for label, trace in zip(labels, traces):
+                lines.extend([label, trace[first:first + columns], "\n"])
+        sys.stdout.write("".join(lines))
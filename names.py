@@ -18,6 +18,9 @@ class Names:
     It also keeps track of the number of error codes defined by other classes,
     and allocates new, unique error codes on demand.
 
+    Name IDs are interned: every lookup of a name returns the same int
+    object, so the port IDs held by many devices share one object each.
+
     Parameters
     ----------
     No parameters.
@@ -44,6 +47,8 @@ class Names:
         """Initialise names list."""
         self.error_code_count = 0  # How many error codes have been declared.
         self.names_list = []
+        # name_ids stores {name_string: name_id}, the interned name IDs
+        self.name_ids = {}
 
     def unique_error_codes(self, num_error_codes):
         """Return a list of unique integer error codes."""
@@ -62,10 +67,7 @@ class Names:
         """
         if not isinstance(name_string, str):
             raise TypeError("Expected name_string to be a string.")
-        if name_string in self.names_list:
-            return self.names_list.index(name_string)
-        else:
-            return None
+        return self.name_ids.get(name_string)
 
     def lookup(self, name_string_list):
         """Return a list of name IDs for each name string in name_string_list.
@@ -80,13 +82,12 @@ class Names:
             if not isinstance(name_string, str):
                 raise TypeError(
                     "Expected string for each member of name_string_list.")
-            # If in the name_list, append to name_id_list.
-            if name_string in self.names_list:
-                name_id_list.append(self.names_list.index(name_string))
-            # If not, add it, then append.
-            else:
+            name_id = self.name_ids.get(name_string)
+            # If not in the names list, add it.
+            if name_id is None:
+                name_id = self.name_ids[name_string] = len(self.names_list)
                 self.names_list.append(name_string)
-                name_id_list.append(self.names_list.index(name_string))
+            name_id_list.append(name_id)
         return name_id_list
 
     def get_name_string(self, name_id):
@@ -5,9 +5,45 @@ Used in the Logic Simulator project to add and connect devices together.
 Classes
 --------
 Network - builds and executes the network.
+Cluster - stores a combinational cluster compiled into a truth table.
 """
 
 
+class Cluster:
+    """Store a combinational cluster compiled into a truth table.
+
+    A cluster is a fanout-free cone of logic gates with a single output, the
+    root gate. Its interior gates are not executed individually; instead the
+    root output is looked up in a precomputed truth table, indexed by the
+    logic levels of the cluster's primary inputs.
+
+    Parameters
+    ----------
+    root_id: device ID of the gate driving the cluster output.
+
+    Public methods
+    --------------
+    No public methods.
+    """
+
+    def __init__(self, root_id):
+        """Initialise cluster properties."""
+        self.root_id = root_id
+        self.root = None  # Device object of the root gate.
+
+        # Primary inputs stored as [(output_device_id, output_port_id)].
+        self.input_signals = []
+
+        # Primary inputs stored as [(Device, output_port_id, weight)], where
+        # weight is the value of the input's bit in the truth table index.
+        self.inputs = []
+
+        # Member gate Device objects in topological order, root last.
+        self.gates = []
+
+        self.table = None  # bytearray, root target for each input index.
+
+
 class Network:
     """Build and execute the network.
 
@@ -36,6 +72,9 @@ class Network:
 
     check_network(self): Checks if all inputs in the network are connected.
 
+    find_components(self): Returns the weakly connected components of the
+                           network as lists of device IDs.
+
     update_signal(self, signal, target): Updates the signal in the direction of
                                          the target.
 
@@ -47,9 +86,25 @@ class Network:
     execute_gate(self, device_id, x=None, y=None): Simulates a logic gate and
                                               updates its output signal value.
 
+    get_parity(self, device): Returns the output level of an XOR or XNOR
+                              gate device.
+
     execute_d_type(self, device_id): Simulates a D-type device and updates its
                                      output signal value.
 
+    get_d_type_sources(self): Returns the D-types with the outputs driving
+                              their CLK, SET and CLEAR inputs.
+
+    execute_d_types(self, d_type_sources): Simulates the D-types which may
+                                           change, skipping the others.
+
+    execute_register(self, device_id): Simulates a register, counter or
+                                       shift register and updates its output
+                                       signal values.
+
+    execute_memory(self, device_id): Simulates a ROM or RAM and updates its
+                                     output signal values.
+
     execute_clock(self, device_id): Simulates a clock and updates its output
                                     signal value. Can also be used for siggen
                                     devices.
@@ -60,6 +115,46 @@ class Network:
     update_siggen(self): If it is time to do so, sets siggen signals to RISING
                          or FALLING.
 
+    get_quiet_cycles(self, timed_devices=None): Returns the number of coming
+                                                cycles in which no clock or
+                                                siggen changes its output.
+
+    get_state(self): Returns the output signals and D-type and register
+                     memories.
+
+    skip_cycles(self, cycles, timed_devices=None): Advances the clock and
+                                                   siggen counters without
+                                                   executing any devices.
+
+    get_counters(self, timed_devices): Returns the clock and siggen
+                                       counters.
+
+    run_cycles(self, cycles, monitors, execute=None): Executes the network
+                                                      for a number of cycles,
+                                                      fast-forwarding through
+                                                      quiet cycles and, if
+                                                      enabled, repeating
+                                                      periodic behaviour.
+
+    get_gate_target(self, device_kind, input_levels): Returns the output
+                            level of a gate for the given HIGH/LOW inputs.
+
+    find_cluster(self, root_id, consumers, protected,
+                 max_inputs): Returns the fanout-free cluster rooted at the
+                              given gate, or None if it is not worth compiling.
+
+    evaluate_cluster(self, cluster, input_levels): Returns the level of every
+                                                   gate in the cluster.
+
+    compile_clusters(self, monitored=None, max_inputs=12): Compiles small
+                         combinational clusters into truth tables.
+
+    clear_clusters(self): Discards compiled clusters and restores the outputs
+                          of their interior gates.
+
+    execute_cluster(self, cluster): Updates the cluster output from its
+                                    truth table.
+
     execute_network(self): Executes all the devices in the network for one
                            simulation cycle.
     """
@@ -74,6 +169,37 @@ class Network:
          self.DEVICE_ABSENT] = self.names.unique_error_codes(6)
         self.steady_state = True  # for checking if signals have settled
 
+        # gate_rules stores {gate_kind: (x, y)}, see execute_gate
+        self.gate_rules = {
+            self.devices.AND: (self.devices.HIGH, self.devices.HIGH),
+            self.devices.OR: (self.devices.LOW, self.devices.LOW),
+            self.devices.NAND: (self.devices.HIGH, self.devices.LOW),
+            self.devices.NOR: (self.devices.LOW, self.devices.HIGH)}
+
+        # Level each signal is heading towards, indexed by signal value
+        self.target_levels = [None] * len(self.devices.signal_types)
+        self.target_levels[self.devices.LOW] = self.devices.LOW
+        self.target_levels[self.devices.HIGH] = self.devices.HIGH
+        self.target_levels[self.devices.RISING] = self.devices.HIGH
+        self.target_levels[self.devices.FALLING] = self.devices.LOW
+
+        # If True, run_cycles looks for a recurring state of the network and
+        # repeats the traces of its period instead of simulating them
+        self.detect_period = False
+        # Number of states remembered while looking for a period
+        self.period_history = 100000
+
+        # D-types with the outputs driving their CLK, SET and CLEAR inputs,
+        # see get_d_type_sources. Rebuilt when the network changes.
+        self.d_type_sources = None
+        self.d_type_device_count = None
+
+        # If True, the parser compiles clusters, see compile_clusters
+        self.use_clusters = False
+        self.clusters = []  # compiled combinational clusters
+        # cluster_devices stores {gate_id: cluster} for every compiled gate
+        self.cluster_devices = {}
+
     def get_connected_output(self, device_id, input_id):
         """Return the output connected to the given input.
 
@@ -117,6 +243,11 @@ class Network:
 
         Return self.NO_ERROR if successful, or the corresponding error if not.
         """
+        if self.clusters:  # compiled clusters would no longer be valid
+            self.clear_clusters()
+        self.d_type_sources = None
+        self.devices.netlist_changes += 1
+
         first_device = self.devices.get_device(first_device_id)
         second_device = self.devices.get_device(second_device_id)
 
@@ -167,6 +298,42 @@ class Network:
                     return False
         return True
 
+    def find_components(self):
+        """Return the weakly connected components of the network.
+
+        Each component is a list of device IDs, in the order the devices were
+        made. Devices in different components cannot affect each other.
+        """
+        # neighbours stores {device_id: [connected_device_id]}
+        neighbours = {}
+        for device in self.devices.devices_list:
+            neighbours.setdefault(device.device_id, [])
+            for signal in device.inputs.values():
+                if signal is not None:
+                    (output_device_id, output_port_id) = signal
+                    neighbours[device.device_id].append(output_device_id)
+                    neighbours.setdefault(output_device_id, []).append(
+                        device.device_id)
+
+        component_ids = {}  # {device_id: component_number}
+        components = []
+        for device in self.devices.devices_list:
+            if device.device_id in component_ids:
+                continue
+            component_ids[device.device_id] = len(components)
+            stack = [device.device_id]
+            while stack:  # depth-first search of the component
+                device_id = stack.pop()
+                for neighbour_id in neighbours[device_id]:
+                    if neighbour_id not in component_ids:
+                        component_ids[neighbour_id] = len(components)
+                        stack.append(neighbour_id)
+            components.append([])
+        for device in self.devices.devices_list:
+            components[component_ids[device.device_id]].append(
+                device.device_id)
+        return components
+
     def update_signal(self, signal, target):
         """Update the signal in the direction of the target.
 
@@ -222,31 +389,27 @@ class Network:
         """Simulate a logic gate and update its output signal value.
 
         The rule is: if all its inputs are x, then its output is y, else its
-        output is the inverse of y.
-        Note: (x,y) pairs for AND, OR, NOR, NAND, XOR are: (HIGH, HIGH), (LOW,
-        LOW), (LOW, HIGH), (HIGH, LOW), (None, None).
+        output is the inverse of y. Inputs are only read up to the first one
+        which is not x, so wide gates stop at their first controlling input.
+        Note: (x,y) pairs for AND, OR, NOR, NAND are: (HIGH, HIGH), (LOW,
+        LOW), (LOW, HIGH), (HIGH, LOW). XOR and XNOR gates are given
+        (None, None), and use the rule in get_parity instead.
         Return True if successful.
         """
         device = self.devices.get_device(device_id)
-        input_signal_list = []
-        for input_id in device.inputs:
-            input_signal = self.get_input_signal(device_id, input_id)
-            if input_signal is None:  # this input is unconnected
+        if device.device_kind in self.devices.parity_gate_types:
+            output_signal = self.get_parity(device)
+            if output_signal is None:  # an input is unconnected
                 return False
-            input_signal_list.append(input_signal)
-
-            if device.device_kind != self.devices.XOR:
+        else:
+            output_signal = y
+            for connected_output in device.inputs.values():
+                if connected_output is None:  # this input is unconnected
+                    return False
+                input_signal = self.get_output_signal(*connected_output)
                 if input_signal != x:
                     output_signal = self.invert_signal(y)
                     break
-                output_signal = y
-
-        if device.device_kind == self.devices.XOR:
-            # Output is high only if both inputs are different
-            if input_signal_list[0] == input_signal_list[1]:  # assume 2 inputs
-                output_signal = self.devices.LOW
-            else:
-                output_signal = self.devices.HIGH
 
         # Update and store the new signal
         signal = self.get_output_signal(device_id, None)
@@ -257,6 +420,33 @@ class Network:
         device.outputs[None] = updated_signal
         return True
 
+    def get_parity(self, device):
+        """Return the output level of an XOR or XNOR gate device.
+
+        An XOR output is HIGH if the signals of its first two inputs differ,
+        so a RISING and a HIGH input give HIGH. Each further input is
+        compared with the result so far in the same way, which gives the
+        parity of HIGH and LOW inputs. A single input is compared with LOW.
+        XNOR gives the inverse. Return None if an input is unconnected.
+        """
+        input_signal_list = []
+        for connected_output in device.inputs.values():
+            if connected_output is None:  # this input is unconnected
+                return None
+            input_signal_list.append(self.get_output_signal(*connected_output))
+        if len(input_signal_list) == 1:
+            input_signal_list.insert(0, self.devices.LOW)
+
+        output_signal = input_signal_list[0]
+        for input_signal in input_signal_list[1:]:
+            if input_signal != output_signal:
+                output_signal = self.devices.HIGH
+            else:
+                output_signal = self.devices.LOW
+        if device.device_kind == self.devices.XNOR:
+            return self.invert_signal(output_signal)
+        return output_signal
+
     def execute_d_type(self, device_id):
         """Simulate a D-type device and update its output signal value.
 
@@ -305,6 +495,177 @@ class Network:
 
         return True
 
+    def get_d_type_sources(self):
+        """Return the D-types with the outputs driving their CLK, SET, CLEAR.
+
+        Return a list of (device, clock_device, clock_port, set_device,
+        set_port, clear_device, clear_port) tuples of Device objects and
+        output IDs, in the order of find_devices. The sources are None if
+        any input of the D-type is unconnected. The list is kept until a
+        connection is made or a device is added.
+        """
+        devices_list = self.devices.devices_list
+        if (self.d_type_sources is None or
+                self.d_type_device_count != len(devices_list)):
+            self.d_type_sources = []
+            for device_id in self.devices.find_devices(self.devices.D_TYPE):
+                device = self.devices.get_device(device_id)
+                sources = []
+                for input_id in [self.devices.CLK_ID, self.devices.SET_ID,
+                                 self.devices.CLEAR_ID]:
+                    signal = device.inputs.get(input_id)
+                    if signal is None:
+                        break
+                    (source_id, source_port) = signal
+                    sources += [self.devices.get_device(source_id),
+                                source_port]
+                if (len(sources) < 6 or
+                        None in device.inputs.values()):  # unconnected
+                    sources = [None] * 6
+                self.d_type_sources.append(tuple([device] + sources))
+            self.d_type_device_count = len(devices_list)
+        return self.d_type_sources
+
+    def execute_d_types(self, d_type_sources):
+        """Simulate the D-types which may change this iteration.
+
+        The memory of a D-type only changes on a RISING clock or while SET
+        or CLEAR is HIGH, and its outputs only change while they are moving
+        towards the memory. D-types in none of these cases are skipped
+        without reading their inputs, which is what execute_d_type would
+        have done for them. D-types are executed in the same order as
+        before, as a D-type may read the outputs of one executed earlier.
+        Return True if successful.
+        """
+        RISING = self.devices.RISING
+        HIGH = self.devices.HIGH
+        Q_ID = self.devices.Q_ID
+        QBAR_ID = self.devices.QBAR_ID
+        for (device, clock_device, clock_port, set_device, set_port,
+             clear_device, clear_port) in d_type_sources:
+            outputs = device.outputs
+            if (clock_device is None or
+                    clock_device.outputs[clock_port] == RISING or
+                    set_device.outputs[set_port] == HIGH or
+                    clear_device.outputs[clear_port] == HIGH or
+                    outputs.get(Q_ID) != device.dtype_memory or
+                    outputs.get(QBAR_ID) != self.invert_signal(
+                        device.dtype_memory)):
+                if not self.execute_d_type(device.device_id):
+                    return False
+        return True
+
+    def execute_register(self, device_id):
+        """Simulate a register, counter or shift register.
+
+        The stored integer is updated on a RISING clock and cleared while
+        CLEAR is HIGH, like the memory of a D-type, so the whole device takes
+        one step per cycle. The Q outputs then move towards its bits. Return
+        True if successful.
+        """
+        device = self.devices.get_device(device_id)
+        clock_signal = self.get_input_signal(device_id, self.devices.CLK_ID)
+        clear_signal = self.get_input_signal(device_id,
+                                             self.devices.CLEAR_ID)
+        if clock_signal is None or clear_signal is None:  # unconnected
+            return False
+
+        if clock_signal == self.devices.RISING:
+            # Inputs are read at their level before the edge, as for D-types
+            high = [self.devices.HIGH, self.devices.FALLING]
+            width = device.register_width
+            if device.device_kind == self.devices.COUNTER:
+                state = device.register_state + 1
+            elif device.device_kind == self.devices.SHIFTREG:
+                data_signal = self.get_input_signal(device_id,
+                                                    self.devices.DATA_ID)
+                if data_signal is None:  # if the input is unconnected
+                    return False
+                state = (device.register_state << 1) | (data_signal in high)
+            else:
+                state = 0
+                for bit, input_id in enumerate(
+                        self.devices.get_indexed_port_ids("D", width)):
+                    data_signal = self.get_input_signal(device_id, input_id)
+                    if data_signal is None:  # if the input is unconnected
+                        return False
+                    if data_signal in high:
+                        state |= 1 << bit
+            device.register_state = state & ((1 << width) - 1)
+        if clear_signal == self.devices.HIGH:
+            device.register_state = 0
+
+        # Update the outputs towards the bits, Q0 first
+        state = device.register_state
+        for output_id, signal in device.outputs.items():
+            if state & 1:
+                new_signal = self.update_signal(signal, self.devices.HIGH)
+            else:
+                new_signal = self.update_signal(signal, self.devices.LOW)
+            if new_signal is None:  # if the update is unsuccessful
+                return False
+            device.outputs[output_id] = new_signal
+            state >>= 1
+        return True
+
+    def execute_memory(self, device_id):
+        """Simulate a ROM or RAM.
+
+        The outputs move towards the bits of the word at the address on the
+        inputs. A RAM first stores the word on its data inputs if CLK is
+        RISING and WE is HIGH, as a D-type stores DATA, and counts the write
+        in memory_writes if it changes the contents. Inputs are read at
+        their level before any transition. Return True if successful.
+        """
+        device = self.devices.get_device(device_id)
+        high = [self.devices.HIGH, self.devices.FALLING]
+        address = 0
+        for bit, input_id in enumerate(self.devices.get_indexed_port_ids(
+                "A", device.memory_address_bits)):
+            input_signal = self.get_input_signal(device_id, input_id)
+            if input_signal is None:  # if the input is unconnected
+                return False
+            if input_signal in high:
+                address |= 1 << bit
+        data_bits = device.memory_data_bits
+        word_size = (data_bits + 7) // 8
+        offset = address * word_size
+
+        if device.device_kind == self.devices.RAM:
+            clock_signal = self.get_input_signal(device_id,
+                                                 self.devices.CLK_ID)
+            write_signal = self.get_input_signal(device_id,
+                                                 self.devices.WE_ID)
+            if clock_signal is None or write_signal is None:  # unconnected
+                return False
+            if clock_signal == self.devices.RISING and write_signal in high:
+                word = 0
+                for bit, input_id in enumerate(
+                        self.devices.get_indexed_port_ids("D", data_bits)):
+                    input_signal = self.get_input_signal(device_id, input_id)
+                    if input_signal is None:  # if the input is unconnected
+                        return False
+                    if input_signal in high:
+                        word |= 1 << bit
+                data = word.to_bytes(word_size, "little")
+                if device.memory[offset:offset + word_size] != data:
+                    device.memory[offset:offset + word_size] = data
+                    device.memory_writes += 1
+
+        # Words past the end of a short ROM image read as zero
+        word = int.from_bytes(device.memory[offset:offset + word_size],
+                              "little")
+        for output_id, signal in device.outputs.items():  # Q0 first
+            if word & 1:
+                new_signal = self.update_signal(signal, self.devices.HIGH)
+            else:
+                new_signal = self.update_signal(signal, self.devices.LOW)
+            if new_signal is None:  # if the update is unsuccessful
+                return False
+            device.outputs[output_id] = new_signal
+            word >>= 1
+        return True
+
     def execute_clock(self, device_id):
         """Simulate a clock or siggen and update its output signal value.
 
@@ -356,9 +717,13 @@ class Network:
             # If reached end of overall period.
             if device.siggen_counter == device.siggen_period:
                 device.siggen_counter = 0
+                device.siggen_cursor = 0
                 device.outputs[None] = device.initial_state
-            # If reached a switching point.
-            elif device.siggen_counter in device.siggen_waveform:
+            # If reached a switching point. The cursor points to the next
+            # one, so the waveform is not searched.
+            elif (device.siggen_counter ==
+                  device.siggen_waveform[device.siggen_cursor]):
+                device.siggen_cursor += 1
                 output_signal = self.get_output_signal(device_id,
                                                        output_id=None)
                 if output_signal == self.devices.HIGH:
@@ -367,20 +732,366 @@ class Network:
                     device.outputs[None] = self.devices.RISING
             device.siggen_counter += 1
 
+    def get_quiet_cycles(self, timed_devices=None):
+        """Return the number of coming cycles without a clock or siggen edge.
+
+        These are the cycles before the next one in which update_clocks or
+        update_siggen changes an output. timed_devices is the list of clock
+        and siggen Device objects, found if not given. Return None if no
+        edge is ever due.
+        """
+        if timed_devices is None:
+            timed_devices = [device for device in self.devices.devices_list
+                             if device.device_kind in [self.devices.CLOCK,
+                                                       self.devices.SIGGEN]]
+        quiet_cycles = None
+        for device in timed_devices:
+            if device.device_kind == self.devices.CLOCK:
+                counter = device.clock_counter
+                if counter > device.clock_half_period:  # never switches
+                    continue
+                edge = device.clock_half_period
+            else:
+                # The last switching point is the end of the period, so the
+                # cursor is always in range
+                counter = device.siggen_counter
+                edge = device.siggen_waveform[device.siggen_cursor]
+            if quiet_cycles is None or edge - counter < quiet_cycles:
+                quiet_cycles = edge - counter
+        return quiet_cycles
+
+    def get_state(self):
+        """Return the output signals and the memories of all devices.
+
+        If the state is the same before and after a cycle without clock or
+        siggen edges, the network has settled. RAMs are represented by the
+        number of times their contents changed, so they are not copied.
+        """
+        state = []
+        for device in self.devices.devices_list:
+            state.extend(device.outputs.values())
+            state.append(device.dtype_memory)
+            state.append(device.register_state)
+            state.append(device.memory_writes)
+        return tuple(state)
+
+    def skip_cycles(self, cycles, timed_devices=None):
+        """Advance the clock and siggen counters by the number of cycles.
+
+        This is only the same as executing the cycles if get_quiet_cycles is
+        at least cycles and the network has settled.
+        """
+        self.devices.state_changes += 1
+        if timed_devices is None:
+            timed_devices = [device for device in self.devices.devices_list
+                             if device.device_kind in [self.devices.CLOCK,
+                                                       self.devices.SIGGEN]]
+        for device in timed_devices:
+            if device.device_kind == self.devices.CLOCK:
+                device.clock_counter += cycles
+            else:
+                device.siggen_counter += cycles
+
+    def get_counters(self, timed_devices):
+        """Return the counters of the clock and siggen Device objects."""
+        return tuple(device.clock_counter
+                     if device.device_kind == self.devices.CLOCK
+                     else device.siggen_counter for device in timed_devices)
+
+    def run_cycles(self, cycles, monitors, execute=None):
+        """Execute the network for the specified number of cycles.
+
+        Signals are recorded by monitors after every cycle. When no clock or
+        siggen edge is due, one cycle is executed, and if it left the state
+        of the network unchanged, the cycles up to the next edge are skipped
+        by advancing the counters and repeating the recorded signals.
+        execute is the function executing one cycle, execute_network by
+        default. Return the number of cycles completed, which is less than
+        cycles if the network oscillates.
+
+        If detect_period is set, the state of the network, including the
+        clock and siggen counters, is hashed between cycles. Nothing outside
+        the network changes during a run, so once a state recurs, the
+        network repeats the cycles in between. The state is compared in full
+        when it is seen a third time, and then the recorded period is
+        repeated for as many whole periods as remain. A RAM is part of the
+        state through its count of changes, so a network whose RAM contents
+        keep changing is not found to repeat.
+        """
+        if execute is None:
+            execute = self.execute_network
+        timed_devices = [device for device in self.devices.devices_list
+                         if device.device_kind in [self.devices.CLOCK,
+                                                   self.devices.SIGGEN]]
+        cycles_completed = 0
+        detect_period = self.detect_period
+        history = {}  # {hash of a state: cycles completed when seen}
+        repeat = None  # [state, cycles completed, expected period]
+        while cycles_completed < cycles:
+            if detect_period:
+                state = (self.get_state(), self.get_counters(timed_devices))
+                if repeat is not None and state == repeat[0]:
+                    period = cycles_completed - repeat[1]
+                    repeats = (cycles - cycles_completed) // period
+                    monitors.repeat_signals(period, repeats)
+                    cycles_completed += period * repeats
+                    detect_period = False  # less than a period remains
+                    continue
+                if repeat is not None and (cycles_completed >
+                                           repeat[1] + repeat[2]):
+                    repeat = None  # the hashes collided
+                key = hash(state)
+                if repeat is None and key in history:
+                    repeat = [state, cycles_completed,
+                              cycles_completed - history[key]]
+                if len(history) >= self.period_history:
+                    history.clear()
+                history[key] = cycles_completed
+            remaining = cycles - cycles_completed
+            quiet_cycles = self.get_quiet_cycles(timed_devices)
+            if quiet_cycles is None or quiet_cycles > remaining:
+                quiet_cycles = remaining
+            state = self.get_state() if quiet_cycles > 1 else None
+            if not execute():
+                return cycles_completed
+            monitors.record_signals()
+            cycles_completed += 1
+            if state is not None and self.get_state() == state:
+                # Settled, so nothing changes until the next edge
+                self.skip_cycles(quiet_cycles - 1, timed_devices)
+                monitors.record_signals(quiet_cycles - 1)
+                cycles_completed += quiet_cycles - 1
+        return cycles_completed
+
+    def get_gate_target(self, device_kind, input_levels):
+        """Return the output level of a gate for the given input levels.
+
+        input_levels is a list of HIGH or LOW signals. The same rule as
+        execute_gate is used: if all inputs are x, the output is y, else the
+        output is the inverse of y.
+        """
+        if device_kind in self.devices.parity_gate_types:
+            parity = self.devices.LOW
+            for level in input_levels:
+                parity ^= level
+            if device_kind == self.devices.XNOR:
+                return self.invert_signal(parity)
+            return parity
+        (x, y) = self.gate_rules[device_kind]
+        for level in input_levels:
+            if level != x:
+                return self.invert_signal(y)
+        return y
+
+    def find_cluster(self, root_id, absorbable, max_inputs):
+        """Return the fanout-free cluster of gates rooted at root_id.
+
+        Gates in the absorbable set are merged into the cluster as long as
+        it keeps at most max_inputs primary inputs. Return None if the
+        cluster would contain a single gate or feed back into itself.
+        """
+        root = self.devices.get_device(root_id)
+        members = {root_id: root}
+        input_signals = list(root.inputs.values())
+        if None in input_signals:  # unconnected input
+            return None
+
+        merged = True
+        while merged:
+            merged = False
+            for (source_id, source_port) in input_signals:
+                if source_id not in absorbable or source_id in members:
+                    continue
+                source = self.devices.get_device(source_id)
+                if None in source.inputs.values():  # unconnected input
+                    continue
+                new_input_signals = [
+                    signal for signal in input_signals
+                    if signal != (source_id, source_port)]
+                for signal in source.inputs.values():
+                    if signal not in new_input_signals:
+                        new_input_signals.append(signal)
+                if len(new_input_signals) <= max_inputs:
+                    members[source_id] = source
+                    input_signals = new_input_signals
+                    merged = True
+                    break
+
+        if len(members) < 2:
+            return None
+        for (source_id, source_port) in input_signals:
+            if source_id in members:  # the cluster feeds back into itself
+                return None
+
+        cluster = Cluster(root_id)
+        cluster.root = root
+        cluster.input_signals = input_signals
+        for bit, (source_id, source_port) in enumerate(input_signals):
+            source = self.devices.get_device(source_id)
+            cluster.inputs.append((source, source_port, 1 << bit))
+
+        # Breadth-first walk from the root, reversed so that every gate
+        # comes after the gates driving it
+        order = [root_id]
+        for device_id in order:
+            for (source_id, source_port) in members[device_id].inputs.values():
+                if source_id in members and source_id not in order:
+                    order.append(source_id)
+        cluster.gates = [members[device_id] for device_id in reversed(order)]
+
+        # Precompute the root target for every combination of input levels
+        cluster.table = bytearray(1 << len(input_signals))
+        for index in range(len(cluster.table)):
+            input_levels = []
+            for bit in range(len(input_signals)):
+                if index >> bit & 1:
+                    input_levels.append(self.devices.HIGH)
+                else:
+                    input_levels.append(self.devices.LOW)
+            levels = self.evaluate_cluster(cluster, input_levels)
+            cluster.table[index] = levels[(root_id, None)]
+        return cluster
+
+    def evaluate_cluster(self, cluster, input_levels):
+        """Return the level of every gate in the cluster.
+
+        input_levels lists the HIGH or LOW level of each primary input. The
+        result is a dictionary {(device_id, output_id): level}.
+        """
+        levels = dict(zip(cluster.input_signals, input_levels))
+        for device in cluster.gates:
+            gate_levels = [levels[signal] for signal in device.inputs.values()]
+            levels[(device.device_id, None)] = self.get_gate_target(
+                device.device_kind, gate_levels)
+        return levels
+
+    def compile_clusters(self, monitored=None, max_inputs=12):
+        """Compile small combinational clusters into truth tables.
+
+        A gate whose output only drives one other gate, and is not in
+        monitored, becomes part of its consumer's cluster. Return the number
+        of clusters compiled.
+
+        Clusters are only used once this is called. A cluster output settles
+        in one iteration rather than one per gate level, and its inputs are
+        read at the level they are heading towards, so the signals pass
+        through fewer transitions on the way. The settled outputs of
+        combinational logic are unchanged, but feedback loops, and D-types
+        or registers clocked, set or cleared by a cluster, may see different
+        transitions than with every gate executed.
+        """
+        self.clear_clusters()
+        if monitored is None:
+            monitored = []
+        protected = set(monitored)
+
+        # consumers stores {(device_id, output_id): [consumer_kind]}
+        consumers = {}
+        for device in self.devices.devices_list:
+            for signal in device.inputs.values():
+                consumers.setdefault(signal, []).append(device.device_kind)
+        gate_ids = [device.device_id for device in self.devices.devices_list
+                    if device.device_kind in self.devices.gate_types]
+        absorbable = set()
+        for gate_id in gate_ids:
+            kinds = consumers.get((gate_id, None), [])
+            if (len(kinds) == 1 and kinds[0] in self.devices.gate_types and
+                    (gate_id, None) not in protected):
+                absorbable.add(gate_id)
+
+        # Start from gates visible outside any cone; gates cut off from a
+        # cone by the input limit become roots in turn
+        roots = [gate_id for gate_id in gate_ids if gate_id not in absorbable]
+        queued = set(roots)
+        for root_id in roots:
+            if root_id in self.cluster_devices:
+                continue
+            cluster = self.find_cluster(root_id, absorbable, max_inputs)
+            if cluster is None:
+                root = self.devices.get_device(root_id)
+                cut_signals = root.inputs.values()
+            else:
+                self.clusters.append(cluster)
+                for device in cluster.gates:
+                    self.cluster_devices[device.device_id] = cluster
+                cut_signals = cluster.input_signals
+            for signal in cut_signals:
+                if signal is None:
+                    continue
+                (source_id, source_port) = signal
+                if source_id in absorbable and source_id not in queued:
+                    roots.append(source_id)
+                    queued.add(source_id)
+        return len(self.clusters)
+
+    def clear_clusters(self):
+        """Discard all compiled clusters.
+
+        The interior gates of a cluster are not executed, so their outputs
+        are set to the levels implied by the cluster inputs.
+        """
+        for cluster in self.clusters:
+            input_levels = [self.target_levels[device.outputs[output_id]]
+                            for device, output_id, weight in cluster.inputs]
+            levels = self.evaluate_cluster(cluster, input_levels)
+            for device in cluster.gates[:-1]:  # the root is kept up to date
+                device.outputs[None] = levels[(device.device_id, None)]
+        self.clusters = []
+        self.cluster_devices = {}
+        self.devices.netlist_changes += 1
+
+    def execute_cluster(self, cluster):
+        """Update the cluster output from its truth table.
+
+        Inputs in transition are read at the level they are heading towards.
+        The output moves towards the table entry through update_signal, so
+        it passes through RISING or FALLING like any other gate. Return True
+        if successful.
+        """
+        index = 0
+        for device, output_id, weight in cluster.inputs:
+            level = self.target_levels[device.outputs[output_id]]
+            if level == self.devices.HIGH:
+                index += weight
+        root = cluster.root
+        updated_signal = self.update_signal(root.outputs[None],
+                                            cluster.table[index])
+        if updated_signal is None:  # if the update is unsuccessful
+            return False
+        root.outputs[None] = updated_signal
+        return True
+
     def execute_network(self):
         """Execute all the devices in the network for one simulation cycle.
 
         Return True if successful and the network does not oscillate.
         """
+        self.devices.state_changes += 1
         clock_devices = self.devices.find_devices(self.devices.CLOCK)
         siggen_devices = self.devices.find_devices(self.devices.SIGGEN)
         switch_devices = self.devices.find_devices(self.devices.SWITCH)
-        d_type_devices = self.devices.find_devices(self.devices.D_TYPE)
+        d_type_sources = self.get_d_type_sources()
+        register_devices = []
+        for device_kind in self.devices.register_types:
+            register_devices += self.devices.find_devices(device_kind)
+        memory_devices = []
+        for device_kind in self.devices.memory_types:
+            memory_devices += self.devices.find_devices(device_kind)
         and_devices = self.devices.find_devices(self.devices.AND)
         or_devices = self.devices.find_devices(self.devices.OR)
         nand_devices = self.devices.find_devices(self.devices.NAND)
         nor_devices = self.devices.find_devices(self.devices.NOR)
         xor_devices = self.devices.find_devices(self.devices.XOR)
+        xnor_devices = self.devices.find_devices(self.devices.XNOR)
+
+        if self.cluster_devices:  # compiled gates are executed by clusters
+            [and_devices, or_devices, nand_devices, nor_devices,
+             xor_devices, xnor_devices] = [
+                [device_id for device_id in device_id_list
+                 if device_id not in self.cluster_devices]
+                for device_id_list in [and_devices, or_devices, nand_devices,
+                                       nor_devices, xor_devices,
+                                       xnor_devices]]
 
         # This sets clock signals to RISING or FALLING, where necessary.
         self.update_clocks()
@@ -402,8 +1113,13 @@ class Network:
                     return False
             # Execute D-type devices before clocks to catch the rising edge of
             # the clock
-            for device_id in d_type_devices:  # execute DTYPE devices
-                if not self.execute_d_type(device_id):
+            if not self.execute_d_types(d_type_sources):
+                return False
+            for device_id in register_devices:  # execute registers
+                if not self.execute_register(device_id):
+                    return False
+            for device_id in memory_devices:  # execute ROMs and RAMs
+                if not self.execute_memory(device_id):
                     return False
             for device_id in clock_devices:  # complete clock executions
                 if not self.execute_clock(device_id):
@@ -430,6 +1146,12 @@ class Network:
             for device_id in xor_devices:  # execute XOR devices
                 if not self.execute_gate(device_id, None, None):
                     return False
+            for device_id in xnor_devices:  # execute XNOR devices
+                if not self.execute_gate(device_id, None, None):
+                    return False
+            for cluster in self.clusters:  # execute compiled clusters
+                if not self.execute_cluster(cluster):
+                    return False
             if self.steady_state:
                 break
         return self.steady_state
@@ -9,11 +9,15 @@ Classes
 Parser - parses the definition file and builds the logic network.
 """
 
+import os
+
 from names import Names
 from network import Network
 from devices import Devices
 from monitors import Monitors
 from scanner import Symbol, Scanner
+from waveform import WaveformFile
+from memory import RomImage
 
 
 class Parser:
@@ -32,6 +36,7 @@ class Parser:
     network: instance of the network.Network() class.
     monitors: instance of the monitors.Monitors() class.
     scanner: instance of the scanner.Scanner() class.
+    output: stream for error messages, standard output if None.
 
     Public methods
     --------------
@@ -42,11 +47,27 @@ class Parser:
                         afterward=False): Display the error message
                         and calls the error recovery function.
 
+    open_waveform_file(self): Opens the waveform file named by the current
+                              STRING symbol, relative to the definition file.
+
+    is_indexed_port(self, input_port=True, device_id=None): Checks if the
+                                            current symbol names an indexed
+                                            port.
+
+    open_memory_file(self): Opens the ROM image named by the current STRING
+                            symbol, relative to the definition file.
+
+    memory_properties(self, property_names): Parses the properties of a ROM
+                                             or RAM.
+
+    number_of_inputs(self): Parses the number of inputs of a gate.
+
     parse_network(self): Parses the circuit definition file
                          and returns true if there are no errors.
     """
 
-    def __init__(self, names, devices, network, monitors, scanner):
+    def __init__(self, names, devices, network, monitors, scanner,
+                 output=None):
         """Initialise constants."""
         # Exception handling.
         if not isinstance(names, Names):
@@ -65,6 +86,7 @@ class Parser:
         self.network = network
         self.monitors = monitors
         self.scanner = scanner
+        self.output = output
 
         self.symbol = None
         self.prev_symbol = None
@@ -81,14 +103,17 @@ class Parser:
             self.NO_MONITOR_KEYWORD, self.AFTER_END,
             self.NO_END, self.INVALID_PROPERTY, self.USED_KEYWORD,
             self.NO_LIST, self.NOT_LOGIC,
-            self.NOT_WAVEFORM] = self.names.unique_error_codes(26)
+            self.NOT_WAVEFORM, self.BAD_WAVEFORM_FILE,
+            self.NOT_WIDTH, self.NOT_MEMORY_PROPERTY, self.NO_COMMA,
+            self.NOT_STRING,
+            self.BAD_MEMORY_FILE] = self.names.unique_error_codes(32)
 
         # Error messages stored in a list
         self.error_messages = []
 
     def print_message(self, message):
         """Print and appends the error message to self.error_messages."""
-        print(message)
+        print(message, file=self.output)
         self.error_messages.append(message + "\n")
 
     def error_recovery(self, error_type):
@@ -148,7 +173,7 @@ class Parser:
         self.error_count += 1
 
         # Display Line Number
-        print(f"Line {symbol.line_number}: ", end='')
+        print(f"Line {symbol.line_number}: ", end='', file=self.output)
         start_message = "Line " + str(symbol.line_number) + ": "
         self.error_messages.append(start_message)
 
@@ -173,11 +198,27 @@ class Parser:
             self.print_message("Syntax Error: Expected 'cycle'")
         elif error_type == self.NOT_WAVEFORM:
             self.print_message("Syntax Error: Expected 'waveform'")
+        elif error_type == self.NOT_WIDTH:
+            self.print_message("Syntax Error: Expected 'width'")
+        elif error_type == self.NOT_MEMORY_PROPERTY:
+            self.print_message("Syntax Error: Expected 'file', "
+                               + "'address_bits' or 'data_bits'")
+        elif error_type == self.NO_COMMA:
+            self.print_message("Syntax Error: Expected a ',' sign")
+        elif error_type == self.NOT_STRING:
+            self.print_message("Syntax Error: Expected a file path "
+                               + "in double quotes")
+        elif error_type == self.BAD_MEMORY_FILE:
+            self.print_message("Semantic Error: Memory file could not be "
+                               + "read or is empty")
         elif error_type == self.NOT_NUMBER:
             self.print_message("Syntax Error: Expected an integer value")
         elif error_type == self.NOT_LOGIC:
             self.print_message("Syntax Error: Expected "
                                + "logic levels (underscores and dashes)")
+        elif error_type == self.BAD_WAVEFORM_FILE:
+            self.print_message("Semantic Error: Waveform file could not be "
+                               + "read or is not a valid waveform")
         elif error_type == self.NO_DEVICES_KEYWORD:
             self.print_message("Syntax Error: Expected the keyword 'DEVICES'")
         elif error_type == self.NO_CONNECT_KEYWORD:
@@ -245,16 +286,121 @@ class Parser:
             # Print error position and pointer if syntax error
             scanner_message = self.scanner.print_pointer(symbol,
                                                          after=afterward)
-            print(scanner_message, end='')
+            print(scanner_message, end='', file=self.output)
             self.error_messages.append(scanner_message)
         else:
             # Print current line only if semantic error
             scanner_message = self.scanner.print_pointer(symbol, pointer=False)
-            print(scanner_message, end='')
+            print(scanner_message, end='', file=self.output)
             self.error_messages.append(scanner_message)
         # Call error recovery function to resume parsing at appropriate point
         self.error_recovery(error_type)
 
+    def get_file_path(self):
+        """Return the path named by the current STRING symbol.
+
+        The path is relative to the directory of the definition file.
+        """
+        return os.path.join(os.path.dirname(self.scanner.path),
+                            self.symbol.id)
+
+    def open_waveform_file(self):
+        """Open the waveform file named by the current STRING symbol.
+
+        Return the waveform.WaveformFile, or None if it could not be opened.
+        """
+        try:
+            return WaveformFile(self.get_file_path())
+        except (OSError, ValueError):
+            self.display_error(self.BAD_WAVEFORM_FILE, self.symbol,
+                               syntax_error=False)
+            return None
+
+    def open_memory_file(self):
+        """Open the ROM image named by the current STRING symbol.
+
+        Return the memory.RomImage, or None if it could not be opened.
+        """
+        try:
+            return RomImage(self.get_file_path())
+        except (OSError, ValueError):
+            self.display_error(self.BAD_MEMORY_FILE, self.symbol,
+                               syntax_error=False)
+            return None
+
+    def memory_properties(self, property_names):
+        """Parse the properties of a ROM or RAM, in the given order.
+
+        The current symbol is the left bracket. Return the list of property
+        values, with the symbol after the last one as the current symbol, or
+        None if errors occur.
+        """
+        limits = {"address_bits": self.devices.max_address_bits,
+                  "data_bits": self.devices.max_data_bits}
+        values = []
+        for property_name in property_names:
+            if values and self.symbol.type != self.scanner.COMMA:
+                self.display_error(self.NO_COMMA, self.symbol)
+                return None
+            self.symbol = self.scanner.get_symbol()
+            if (self.symbol.type != self.scanner.KEYWORD or
+                    self.symbol.id != self.names.query(property_name)):
+                self.display_error(self.NOT_MEMORY_PROPERTY, self.symbol)
+                return None
+            self.symbol = self.scanner.get_symbol()
+            if self.symbol.type != self.scanner.COLON:
+                self.display_error(self.NO_COLON, self.symbol)
+                return None
+            self.symbol = self.scanner.get_symbol()
+            if property_name == "file":
+                if self.symbol.type != self.scanner.STRING:
+                    self.display_error(self.NOT_STRING, self.symbol)
+                    return None
+                value = self.open_memory_file()
+                if value is None:
+                    return None
+            else:
+                if self.symbol.type != self.scanner.NUMBER:
+                    self.display_error(self.NOT_NUMBER, self.symbol)
+                    return None
+                if self.symbol.id not in range(1, limits[property_name] + 1):
+                    self.display_error(self.INVALID_PROPERTY, self.symbol)
+                    return None
+                value = self.symbol.id
+            values.append(value)
+            self.symbol = self.scanner.get_symbol()
+        return values
+
+    def number_of_inputs(self):
+        """Parse the number of inputs of a gate.
+
+        The current symbol is the left bracket. Return the number of inputs,
+        with the right bracket as the current symbol, or None if errors
+        occur.
+        """
+        [NUM_INPUTS_ID] = self.names.lookup(["number_of_inputs"])
+        self.symbol = self.scanner.get_symbol()
+        if self.symbol.id != NUM_INPUTS_ID:
+            self.display_error(self.NOT_NUM_INPUTS, self.symbol)
+            return None
+        self.symbol = self.scanner.get_symbol()
+        if self.symbol.type != self.scanner.COLON:
+            self.display_error(self.NO_COLON, self.symbol)
+            return None
+        self.symbol = self.scanner.get_symbol()
+        if self.symbol.type != self.scanner.NUMBER:
+            self.display_error(self.NOT_NUMBER, self.symbol)
+            return None
+        if self.symbol.id not in range(1, self.devices.max_gate_inputs + 1):
+            self.display_error(self.INVALID_PROPERTY, self.symbol)
+            return None
+        number_of_inputs = self.symbol.id
+        self.symbol = self.scanner.get_symbol()
+        if self.symbol.type != self.scanner.RIGHT_BRACKET:
+            self.display_error(self.NO_RIGHT_BRACKET, self.symbol)
+            return None
+        return number_of_inputs
+
     def check_valid_device(self):
         """Check if the device kind and properties are valid.
 
@@ -263,24 +409,36 @@ class Parser:
         """
         variable_input_gates = self.names.lookup(["AND", "OR", "NAND", "NOR"])
         [SWITCH_ID, CLOCK_ID, DTYPE_ID, INITIAL_STATE_ID,
-         NUM_INPUTS_ID, XOR_ID, CYCLE_ID, SIGGEN_ID,
-         WAVEFORM_ID] = self.names.lookup(["SWITCH", "CLOCK", "DTYPE",
-                                           "initial_state", "number_of_inputs",
-                                           "XOR", "cycle", "SIGGEN",
-                                           "waveform"])
+         CYCLE_ID, SIGGEN_ID,
+         WAVEFORM_ID, WIDTH_ID] = self.names.lookup(["SWITCH", "CLOCK",
+                                                     "DTYPE", "initial_state",
+                                                     "cycle", "SIGGEN",
+                                                     "waveform", "width"])
 
         # If symbol is an AND, OR, NAND, or NOR gate
         if (self.symbol.id in variable_input_gates):
+            device_kind = self.names.get_name_string(self.symbol.id)
+            self.symbol = self.scanner.get_symbol()
+            if self.symbol.type == self.scanner.LEFT_BRACKET:
+                device_property = self.number_of_inputs()
+                if device_property is None:
+                    return None, None
+                return device_kind, device_property
+            else:
+                self.display_error(self.NO_LEFT_BRACKET, self.symbol)
+                return None, None
+        # If symbol is a SWITCH
+        elif (self.symbol.id == SWITCH_ID):
             device_kind = self.names.get_name_string(self.symbol.id)
             self.symbol = self.scanner.get_symbol()
             if self.symbol.type == self.scanner.LEFT_BRACKET:
                 self.symbol = self.scanner.get_symbol()
-                if self.symbol.id == NUM_INPUTS_ID:
+                if self.symbol.id == INITIAL_STATE_ID:
                     self.symbol = self.scanner.get_symbol()
                     if self.symbol.type == self.scanner.COLON:
                         self.symbol = self.scanner.get_symbol()
                         if self.symbol.type == self.scanner.NUMBER:
-                            if self.symbol.id not in range(1, 17):
+                            if self.symbol.id not in [0, 1]:
                                 self.display_error(self.INVALID_PROPERTY,
                                                    self.symbol)
                                 return None, None
@@ -299,26 +457,22 @@ class Parser:
                         self.display_error(self.NO_COLON, self.symbol)
                         return None, None
                 else:
-                    self.display_error(self.NOT_NUM_INPUTS, self.symbol)
+                    self.display_error(self.NOT_INITIAL_STATE, self.symbol)
                     return None, None
             else:
                 self.display_error(self.NO_LEFT_BRACKET, self.symbol)
                 return None, None
-        # If symbol is a SWITCH
-        elif (self.symbol.id == SWITCH_ID):
+        # If symbol is a CLOCK
+        elif (self.symbol.id == CLOCK_ID):
             device_kind = self.names.get_name_string(self.symbol.id)
             self.symbol = self.scanner.get_symbol()
             if self.symbol.type == self.scanner.LEFT_BRACKET:
                 self.symbol = self.scanner.get_symbol()
-                if self.symbol.id == INITIAL_STATE_ID:
+                if self.symbol.id == CYCLE_ID:
                     self.symbol = self.scanner.get_symbol()
                     if self.symbol.type == self.scanner.COLON:
                         self.symbol = self.scanner.get_symbol()
                         if self.symbol.type == self.scanner.NUMBER:
-                            if self.symbol.id not in [0, 1]:
-                                self.display_error(self.INVALID_PROPERTY,
-                                                   self.symbol)
-                                return None, None
                             device_property = self.symbol.id
                             self.symbol = self.scanner.get_symbol()
                             if self.symbol.type == self.scanner.RIGHT_BRACKET:
@@ -334,23 +488,28 @@ class Parser:
                         self.display_error(self.NO_COLON, self.symbol)
                         return None, None
                 else:
-                    self.display_error(self.NOT_INITIAL_STATE, self.symbol)
+                    self.display_error(self.NOT_CYCLE, self.symbol)
                     return None, None
             else:
                 self.display_error(self.NO_LEFT_BRACKET, self.symbol)
                 return None, None
-        # If symbol is a CLOCK
-        elif (self.symbol.id == CLOCK_ID):
+        # If device is a SIGGEN.
+        elif (self.symbol.id == SIGGEN_ID):
             device_kind = self.names.get_name_string(self.symbol.id)
             self.symbol = self.scanner.get_symbol()
             if self.symbol.type == self.scanner.LEFT_BRACKET:
                 self.symbol = self.scanner.get_symbol()
-                if self.symbol.id == CYCLE_ID:
+                if self.symbol.id == WAVEFORM_ID:
                     self.symbol = self.scanner.get_symbol()
                     if self.symbol.type == self.scanner.COLON:
                         self.symbol = self.scanner.get_symbol()
-                        if self.symbol.type == self.scanner.NUMBER:
+                        if self.symbol.type in [self.scanner.LOGIC,
+                                                self.scanner.STRING]:
                             device_property = self.symbol.id
+                            if self.symbol.type == self.scanner.STRING:
+                                device_property = self.open_waveform_file()
+                                if device_property is None:
+                                    return None, None
                             self.symbol = self.scanner.get_symbol()
                             if self.symbol.type == self.scanner.RIGHT_BRACKET:
                                 return device_kind, device_property
@@ -359,28 +518,33 @@ class Parser:
                                                    self.symbol)
                                 return None, None
                         else:
-                            self.display_error(self.NOT_NUMBER, self.symbol)
+                            self.display_error(self.NOT_LOGIC, self.symbol)
                             return None, None
                     else:
                         self.display_error(self.NO_COLON, self.symbol)
                         return None, None
                 else:
-                    self.display_error(self.NOT_CYCLE, self.symbol)
+                    self.display_error(self.NOT_WAVEFORM, self.symbol)
                     return None, None
             else:
                 self.display_error(self.NO_LEFT_BRACKET, self.symbol)
                 return None, None
-        # If device is a SIGGEN.
-        elif (self.symbol.id == SIGGEN_ID):
+        # If symbol is a REGISTER, COUNTER or SHIFTREG
+        elif (self.symbol.id in self.devices.register_types):
             device_kind = self.names.get_name_string(self.symbol.id)
             self.symbol = self.scanner.get_symbol()
             if self.symbol.type == self.scanner.LEFT_BRACKET:
                 self.symbol = self.scanner.get_symbol()
-                if self.symbol.id == WAVEFORM_ID:
+                if self.symbol.id == WIDTH_ID:
                     self.symbol = self.scanner.get_symbol()
                     if self.symbol.type == self.scanner.COLON:
                         self.symbol = self.scanner.get_symbol()
-                        if self.symbol.type == self.scanner.LOGIC:
+                        if self.symbol.type == self.scanner.NUMBER:
+                            if self.symbol.id not in range(
+                                    1, self.devices.max_register_width + 1):
+                                self.display_error(self.INVALID_PROPERTY,
+                                                   self.symbol)
+                                return None, None
                             device_property = self.symbol.id
                             self.symbol = self.scanner.get_symbol()
                             if self.symbol.type == self.scanner.RIGHT_BRACKET:
@@ -390,19 +554,40 @@ class Parser:
                                                    self.symbol)
                                 return None, None
                         else:
-                            self.display_error(self.NOT_LOGIC, self.symbol)
+                            self.display_error(self.NOT_NUMBER, self.symbol)
                             return None, None
                     else:
                         self.display_error(self.NO_COLON, self.symbol)
                         return None, None
                 else:
-                    self.display_error(self.NOT_WAVEFORM, self.symbol)
+                    self.display_error(self.NOT_WIDTH, self.symbol)
+                    return None, None
+            else:
+                self.display_error(self.NO_LEFT_BRACKET, self.symbol)
+                return None, None
+        # If symbol is a ROM or RAM
+        elif (self.symbol.id in self.devices.memory_types):
+            device_kind = self.names.get_name_string(self.symbol.id)
+            property_names = ["address_bits", "data_bits"]
+            if self.symbol.id == self.devices.ROM:
+                property_names.insert(0, "file")
+            self.symbol = self.scanner.get_symbol()
+            if self.symbol.type == self.scanner.LEFT_BRACKET:
+                device_property = self.memory_properties(property_names)
+                if device_property is None:
+                    return None, None
+                if self.symbol.type == self.scanner.RIGHT_BRACKET:
+                    return device_kind, tuple(device_property)
+                else:
+                    self.display_error(self.NO_RIGHT_BRACKET, self.symbol)
                     return None, None
             else:
                 self.display_error(self.NO_LEFT_BRACKET, self.symbol)
                 return None, None
-        # If symbol is DTYPE device or XOR gate
-        elif (self.symbol.id == DTYPE_ID or self.symbol.id == XOR_ID):
+        # If symbol is DTYPE device or XOR or XNOR gate, whose number of
+        # inputs is optional and parsed by assign_device
+        elif (self.symbol.id == DTYPE_ID or
+              self.symbol.id in self.devices.parity_gate_types):
             device_kind = self.names.get_name_string(self.symbol.id)
             device_property = None
             return device_kind, device_property
@@ -427,7 +612,17 @@ class Parser:
                     [device_kind] = self.names.lookup([device_kind])
                     self.prev_symbol = self.symbol
                     self.symbol = self.scanner.get_symbol()
-                    if self.symbol.type != self.scanner.SEMICOLON:
+                    if (device_kind in self.devices.parity_gate_types and
+                            self.symbol.type == self.scanner.LEFT_BRACKET):
+                        # XOR and XNOR gates may set their number of inputs
+                        device_property = self.number_of_inputs()
+                        if device_property is None:  # errors displayed
+                            device_kind = None
+                        else:
+                            self.prev_symbol = self.symbol
+                            self.symbol = self.scanner.get_symbol()
+                    if (device_kind is not None and
+                            self.symbol.type != self.scanner.SEMICOLON):
                         self.display_error(self.NO_SEMICOLON, self.prev_symbol,
                                            afterward=True)
             else:
@@ -494,16 +689,33 @@ class Parser:
                 # If missing both the keyword and left curly
                 self.error_recovery(self.NO_LIST)  # Assume missing list
 
+    def is_indexed_port(self, input_port=True, device_id=None):
+        """Return True if the current symbol names an indexed port.
+
+        Indexed ports, such as D0 or Q31, belong to devices of variable
+        width. Inputs past I16 of a gate defined as device_id must be among
+        its number of inputs. Whether other ports exist is checked when
+        connecting.
+        """
+        if self.symbol.type != self.scanner.NAME:
+            return False
+        port_name = self.names.get_name_string(self.symbol.id)
+        if not self.devices.is_indexed_port(port_name, input_port):
+            return False
+        device = self.devices.get_device(device_id)
+        if (input_port and device is not None and
+                device.device_kind in self.devices.gate_types and
+                int(port_name[1:]) > self.devices.named_gate_inputs):
+            return self.symbol.id in device.inputs
+        return True
+
     def signame(self, input_port=True):
         """Return the device_id and the corresponding output or input port.
 
         Return None, None if error occurs.
         """
         valid_input_ports = self.names.lookup(["DATA", "CLK", "SET", "CLEAR",
-                                               "I1", "I2", "I3", "I4", "I5",
-                                               "I6", "I7", "I8", "I9", "I10",
-                                               "I11", "I12", "I13", "I14",
-                                               "I15", "I16"])
+                                               "WE"])
         valid_output_ports = self.names.lookup(["Q", "QBAR"])
         if self.symbol.type == self.scanner.NAME:
             self.prev_symbol = self.symbol
@@ -513,13 +725,15 @@ class Parser:
                 self.prev_symbol = self.symbol
                 self.symbol = self.scanner.get_symbol()
                 if (input_port is True and
-                   self.symbol.id in valid_input_ports):
+                   (self.symbol.id in valid_input_ports or
+                    self.is_indexed_port(input_port, device_id))):
                     device_port = self.symbol.id
                     self.prev_symbol = self.symbol
                     self.symbol = self.scanner.get_symbol()
                     return device_id, device_port
                 elif (input_port is False and
-                      self.symbol.id in valid_output_ports):
+                      (self.symbol.id in valid_output_ports or
+                       self.is_indexed_port(input_port))):
                     device_port = self.symbol.id
                     self.prev_symbol = self.symbol
                     self.symbol = self.scanner.get_symbol()
@@ -726,6 +940,10 @@ class Parser:
 
         # Return True if self.error_count is 0
         if self.error_count == 0:
+            if self.network.use_clusters:
+                # Compile small combinational clusters into truth tables
+                self.network.compile_clusters(
+                    self.monitors.monitors_dictionary)
             return True
         else:
             # Display total number of errors
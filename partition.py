@@ -0,0 +1,293 @@
+"""Simulate independent parts of the network in parallel worker processes.
+
+Used in the Logic Simulator project to spread networks made of several
+disconnected circuits over multiple processor cores.
+
+Classes
+-------
+ParallelSimulator - runs the components of a network in worker processes.
+
+Functions
+---------
+get_device_state - returns the simulation state of a device.
+set_device_state - restores the simulation state of a device.
+simulate_component - runs the simulation commands received by a worker.
+"""
+import multiprocessing
+
+from devices import Devices
+from network import Network
+from monitors import Monitors
+
+
+def get_device_state(device, with_memory=True):
+    """Return the simulation state of the Device object as a list.
+
+    The contents of a RAM are copied if with_memory is True, and otherwise
+    left out, as None.
+    """
+    memory = None
+    if with_memory and device.memory_writes is not None:  # a RAM
+        memory = (bytes(device.memory), device.memory_writes)
+    return [dict(device.outputs), device.dtype_memory, device.register_state,
+            device.clock_counter, device.siggen_counter,
+            device.siggen_cursor, memory]
+
+
+def set_device_state(device, state):
+    """Restore the simulation state of the Device object.
+
+    state is a list returned by get_device_state, in which the RAM
+    contents may be None if they are unchanged.
+    """
+    [device.outputs, device.dtype_memory, device.register_state,
+     device.clock_counter, device.siggen_counter, device.siggen_cursor,
+     memory] = state
+    if memory is not None:
+        [contents, device.memory_writes] = memory
+        device.memory[:] = contents
+
+
+def simulate_component(connection, names, devices_list):
+    """Run the simulation commands received by a worker process.
+
+    devices_list holds copies of the Device objects making up one or more
+    weakly connected components of the network. Commands are tuples
+    received through connection:
+
+    ("set_switch", device_id, signal): sets the switch state.
+    ("cold_startup",): simulates a cold start-up of the devices.
+    ("run", cycles, signals, use_clusters, detect_period): runs up to cycles
+                              cycles with Network.run_cycles, recording the
+                              listed signals, and sends back the number of
+                              cycles completed and the signal traces.
+                              Clusters are compiled if use_clusters is True,
+                              and periods detected if detect_period is.
+    ("finish", cycles): leaves the devices as they are after executing
+                        cycles cycles of the last run, which may not be
+                        more than were executed, and sends back their
+                        state.
+    ("stop",): ends the worker.
+
+    A worker that executed more cycles than asked for by "finish" restores
+    the state saved at the start of the run and runs the cycles again,
+    which gives the same result as the simulation is deterministic. The
+    contents of a RAM are only copied for this at the start of a run if
+    they changed since the last copy.
+    """
+    devices = Devices(names)
+    devices.devices_list = devices_list
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    compiled_signals = None  # monitored signals the clusters were built for
+    # sent_writes stores {device_id: memory_writes} of each RAM as last sent
+    sent_writes = {device.device_id: device.memory_writes
+                   for device in devices_list
+                   if device.device_kind == devices.RAM}
+    # saved_memories stores {device_id: (contents, memory_writes)} of each
+    # RAM, as last copied at the start of a run
+    saved_memories = {}
+
+    while True:
+        command = connection.recv()
+        if command[0] == "set_switch":
+            devices.set_switch(command[1], command[2])
+        elif command[0] == "cold_startup":
+            devices.cold_startup()
+        elif command[0] == "run":
+            [cycles, signals, use_clusters, detect_period] = command[1:]
+            for signal in list(monitors.monitors_dictionary):
+                if signal not in signals:
+                    monitors.remove_monitor(*signal)
+            for signal in signals:
+                monitors.make_monitor(*signal)
+            if use_clusters and signals != compiled_signals:
+                network.compile_clusters(monitors.monitors_dictionary)
+                compiled_signals = signals
+            monitors.reset_monitors()
+            network.detect_period = detect_period
+            start_states = []
+            for device in devices.devices_list:
+                state = get_device_state(device, with_memory=False)
+                if device.device_id in sent_writes:  # a RAM
+                    saved = saved_memories.get(device.device_id)
+                    if saved is None or saved[1] != device.memory_writes:
+                        saved = (bytes(device.memory), device.memory_writes)
+                        saved_memories[device.device_id] = saved
+                    state[-1] = saved
+                start_states.append(state)
+
+            cycles_completed = network.run_cycles(cycles, monitors)
+            # The cycle that oscillated was executed too
+            cycles_executed = min(cycles, cycles_completed + 1)
+            connection.send((cycles_completed,
+                             dict(monitors.monitors_dictionary)))
+        elif command[0] == "finish":
+            if command[1] != cycles_executed:
+                for device, state in zip(devices.devices_list,
+                                         start_states):
+                    set_device_state(device, state)
+                devices.state_changes += 1
+                network.run_cycles(command[1], monitors)
+                cycles_executed = command[1]
+
+            device_states = []
+            for device in devices.devices_list:
+                # Only changed RAM contents are sent
+                changed = (device.memory_writes !=
+                           sent_writes.get(device.device_id))
+                if changed:
+                    sent_writes[device.device_id] = device.memory_writes
+                device_states.append((device.device_id,
+                                      get_device_state(device, changed)))
+            connection.send(device_states)
+        elif command[0] == "stop":
+            break
+    connection.close()
+
+
+class ParallelSimulator:
+    """Run the weakly connected components of a network in worker processes.
+
+    The components found by Network.find_components are shared between the
+    workers, largest first. Each worker simulates its own copy of its
+    devices, and the workers only synchronise at the end of each run, when
+    their signal traces are merged into the monitors and their final device
+    states are copied back into devices. If a component oscillates, every
+    worker is brought back to the cycle that failed first, so the devices
+    are left as a single process would leave them.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+    monitors: instance of the monitors.Monitors() class.
+    workers: maximum number of worker processes.
+
+    Public methods
+    --------------
+    start(self): Starts the worker processes.
+
+    stop(self): Stops the worker processes.
+
+    set_switch(self, device_id, signal): Sets the switch state of the
+                                         specified device to signal.
+
+    cold_startup(self): Simulates cold start-up of all the devices.
+
+    run_network(self, cycles): Runs the network for the specified number of
+                               cycles and returns the number of cycles
+                               completed.
+    """
+
+    def __init__(self, names, devices, network, monitors, workers=None):
+        """Initialise the worker properties."""
+        self.names = names
+        self.devices = devices
+        self.network = network
+        self.monitors = monitors
+
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        self.workers = workers
+
+        self.connections = []  # one pipe connection per worker
+        self.processes = []
+        self.worker_ids = {}  # {device_id: worker_number}
+
+    def start(self):
+        """Start the worker processes, one per group of components.
+
+        Return the number of workers started.
+        """
+        self.stop()
+        components = self.network.find_components()
+        components.sort(key=len, reverse=True)
+        groups = [[] for _ in range(min(self.workers, len(components)))]
+        for component in components:  # give each to the smallest group
+            smallest = min(groups, key=len)
+            smallest.extend(component)
+
+        self.network.clear_clusters()  # make interior gate outputs valid
+        for worker_number, group in enumerate(groups):
+            group_ids = set(group)
+            devices_list = [device for device in self.devices.devices_list
+                            if device.device_id in group_ids]
+            for device_id in group:
+                self.worker_ids[device_id] = worker_number
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=simulate_component,
+                args=(worker_connection, self.names, devices_list),
+                daemon=True)
+            process.start()
+            self.connections.append(connection)
+            self.processes.append(process)
+        return len(self.processes)
+
+    def stop(self):
+        """Stop the worker processes."""
+        for connection in self.connections:
+            connection.send(("stop",))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+        self.worker_ids = {}
+
+    def set_switch(self, device_id, signal):
+        """Set the switch state of the specified device to signal.
+
+        Return True if successful.
+        """
+        if not self.devices.set_switch(device_id, signal):
+            return False
+        worker_number = self.worker_ids[device_id]
+        self.connections[worker_number].send(("set_switch", device_id,
+                                              signal))
+        return True
+
+    def cold_startup(self):
+        """Simulate cold start-up of all the devices in every worker."""
+        for connection in self.connections:
+            connection.send(("cold_startup",))
+
+    def run_network(self, cycles):
+        """Run the network for the specified number of cycles.
+
+        Signal traces are appended to the monitors. If any component
+        oscillates, the traces of every monitor are cut at the first cycle
+        that failed, and every device is left in its state after that
+        cycle, as in Network.execute_network. Return the number of cycles
+        completed.
+        """
+        for worker_number, connection in enumerate(self.connections):
+            signals = [signal for signal in self.monitors.monitors_dictionary
+                       if self.worker_ids[signal[0]] == worker_number]
+            connection.send(("run", cycles, signals,
+                             self.network.use_clusters,
+                             self.network.detect_period))
+        results = [connection.recv() for connection in self.connections]
+        if not results:  # no devices to simulate
+            return cycles
+
+        # device_objects stores {device_id: Device}
+        device_objects = {device.device_id: device
+                          for device in self.devices.devices_list}
+        cycles_completed = min([result[0] for result in results])
+        # The cycle that failed is executed everywhere, as in one process
+        cycles_executed = min(cycles, cycles_completed + 1)
+        for connection in self.connections:
+            connection.send(("finish", cycles_executed))
+        for cycles_done, traces in results:
+            for signal, trace in traces.items():
+                if signal in self.monitors.monitors_dictionary:
+                    self.monitors.monitors_dictionary[signal].extend(
+                        trace[:cycles_completed])
+        for connection in self.connections:
+            for device_id, state in connection.recv():
+                set_device_state(device_objects[device_id], state)
+        self.devices.state_changes += 1
+        return cycles_completed
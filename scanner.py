@@ -9,12 +9,16 @@ Scanner - reads definition file and translates characters into symbols.
 Symbol - encapsulates a symbol and stores its properties.
 """
 
+import bisect
 import sys
 
 
 class Symbol:
     """Encapsulate a symbol and store its properties.
 
+    One symbol is made for every token read, so its properties are kept in
+    slots rather than an instance dictionary.
+
     Parameters
     ----------
     No parameters.
@@ -24,10 +28,13 @@ class Symbol:
     No public methods.
     """
 
+    __slots__ = ["type", "id", "line_number", "line_position"]
+
     def __init__(self):
         """Initialise symbol properties."""
         self.type = None  # Int, representation of type of symbol.
-        self.id = None  # Int, for KEYWORD, NAME, NUMBER. Str, for LOGIC.
+        # Int, for KEYWORD, NAME, NUMBER. Str, for LOGIC and STRING.
+        self.id = None
         self.line_number = None  # Int, starts from 1.
         self.line_position = None  # Int, starts from 1.
 
@@ -44,6 +51,7 @@ class Scanner:
     ----------
     path: path to the circuit definition file.
     names: instance of the names.Names() class.
+    output: stream for messages, standard output if None.
 
     Public methods
     -------------
@@ -53,10 +61,16 @@ class Scanner:
     get_number(self): Assumes current character is a digit, returns the integer
                       number, and places next non-digit character in
                       current_character.
-    get_logic_level(self): Assumes current character is a dash (-) or
-                           underscore (_), returns the sequence of underscores
-                           and dashes, and places the next non-dash and
-                           non-underscore character in current_character.
+    get_logic_level(self): Assumes current character is a dash (-),
+                           underscore (_) or left square bracket ([), returns
+                           the waveform of dashes, underscores, square
+                           brackets and repeat counts, and places the next
+                           character that is none of these in
+                           current_character.
+    get_string(self): Assumes current character is a double quote ("),
+                      returns the characters up to the closing double quote,
+                      and leaves it in current_character. Returns None if
+                      the line ends first.
     advance(self): Reads the next character from the definition file and places
                    it into current_character. Ignores line breaks.
     skip_spaces(self): Calls advance() as necessary until current_character is
@@ -76,7 +90,7 @@ class Scanner:
                                               has occurred.
     """
 
-    def __init__(self, path, names):
+    def __init__(self, path, names, output=None):
         """Open specified file and initialise reserved words and IDs."""
         # Open specified file.
         windows_ending = b"\r\n"
@@ -94,7 +108,8 @@ class Scanner:
             self.file_object = open(path, "r")
             self.path = path
         except IOError as arg:  # Path file does not exist.
-            print("File does not exist. Please enter a valid path.\n", arg)
+            print("File does not exist. Please enter a valid path.\n", arg,
+                  file=output)
             sys.exit()
 
         # Creating an instance of the Names class.
@@ -106,24 +121,26 @@ class Scanner:
                                   self.LEFT_BRACKET, self.RIGHT_BRACKET,
                                   self.SEMICOLON, self.DOT, self.KEYWORD,
                                   self.NUMBER, self.NAME, self.EOF,
-                                  self.ERROR, self.LOGIC] = range(15)
+                                  self.ERROR, self.LOGIC,
+                                  self.STRING] = range(16)
 
         # Defining all the keywords for our logic description language.
         self.list_keywords = ["DEVICES", "CONNECT", "MONITOR", "END",
                               "CLOCK", "SWITCH", "AND", "NAND", "OR",
-                              "NOR", "DTYPE", "XOR", "Q", "QBAR",
-                              "DATA", "CLK", "SET", "CLEAR", "I1",
-                              "I2", "I3", "I4", "I5", "I6", "I7",
-                              "I8", "I9", "I10", "I11", "I12", "I13",
-                              "I14", "I15", "I16", "cycle",
+                              "NOR", "DTYPE", "XOR", "XNOR", "Q", "QBAR",
+                              "DATA", "CLK", "SET", "CLEAR", "cycle",
                               "initial_state", "number_of_inputs",
-                              "SIGGEN", "waveform"]
+                              "SIGGEN", "waveform", "REGISTER", "COUNTER",
+                              "SHIFTREG", "width", "ROM", "RAM", "WE",
+                              "file", "address_bits", "data_bits"]
 
         # Holds last character read from definition file.
         self.current_character = " "
+        # Total characters up to the end of each line, found when needed.
+        self.line_ends = None
 
         # Store all keywords in our Names instance.
-        self.names.lookup(self.list_keywords)
+        self.keyword_ids = set(self.names.lookup(self.list_keywords))
 
     def get_name(self):
         """Return the alphanumeric name string, updates current_character."""
@@ -160,23 +177,46 @@ class Scanner:
         return int(number_string)
 
     def get_logic_level(self):
-        """Return the sequence of '-' and '_', and update current_character."""
+        """Return the waveform sequence, and update current_character.
+
+        Besides '-' and '_', the sequence may contain square brackets and
+        repeat counts, which are checked when the SIGGEN is made.
+        """
         if not isinstance(self.current_character, str):
             raise TypeError("Expected current_character to be a string.")
         elif len(self.current_character) != 1:
             raise TypeError("Expected current_character to be a single digit.")
-        elif not (self.current_character == "_"
-                  or self.current_character == "-"):
-            raise ValueError("Expected current_character to be '_' or '-'.")
+        elif self.current_character not in "_-[":
+            raise ValueError("Expected current_character to be '_', '-' "
+                             "or '['.")
         # Initialise a sequence_string to concatenate to.
         sequence_string = str(self.current_character)
         self.current_character = self.file_object.read(1)
-        # Obtaining sequence of dashes and underscores.
-        while (self.current_character == "_" or self.current_character == "-"):
+        # Obtaining sequence of dashes, underscores, brackets and counts.
+        while (self.current_character != ""
+               and (self.current_character in "_-[]"
+                    or self.current_character.isdigit())):
             sequence_string += str(self.current_character)
             self.current_character = self.file_object.read(1)
         return sequence_string
 
+    def get_string(self):
+        """Return the characters between double quotes.
+
+        Leave the closing quote in current_character, or return None if the
+        line or file ends before it.
+        """
+        if self.current_character != '"':
+            raise ValueError("Expected current_character to be '\"'.")
+        string = ""
+        self.current_character = self.file_object.read(1)
+        while self.current_character != '"':
+            if self.current_character in ["", "\n"]:
+                return None
+            string += self.current_character
+            self.current_character = self.file_object.read(1)
+        return string
+
     def advance(self):
         """Places next character into current_character."""
         self.current_character = self.file_object.read(1)
@@ -206,34 +246,31 @@ class Scanner:
             raise TypeError("Expected symbol to be of the Symbol class.")
         # Get current position (tell adds one when \n found).
         position = self.file_object.tell()
-        # Get length of each line in the file.
-        file_object = open(self.path, "r")
-        cumul_len_dict = {}
-        cumulative_length_list = []
-        total = 0  # Represents total characters up to that line.
-        for number, line in enumerate(file_object):
-            if "\n" in line:  # Finding lines with \n.
-                length = len(line.rstrip("\n"))
-                # Adding one to account for \n in LF, to work with tell().
-                total += length + 1
-            else:
-                total += len(line)
-            # Append to list and dict.
-            cumul_len_dict[number] = total
-            cumulative_length_list.append((number, total))
-        file_object.close()
-        # Obtain line number and position (starts from 1).
-        for line_number, total_length in cumulative_length_list:
-            # If position is less than cumulative characters total
-            # up to and including that line, must be on that line.
-            if position <= total_length:
-                symbol.line_number = line_number + 1
-                if symbol.line_number == 1:
-                    symbol.line_position = position
-                else:  # Accounting for previous lines.
-                    symbol.line_position = (position
-                                            - cumul_len_dict[line_number - 1])
-                break
+        if self.line_ends is None:
+            # Total characters up to and including each line, found once as
+            # the file does not change while it is scanned.
+            self.line_ends = []
+            total = 0
+            with open(self.path, "r") as file_object:
+                for line in file_object:
+                    if "\n" in line:  # Finding lines with \n.
+                        length = len(line.rstrip("\n"))
+                        # Adding one to account for \n in LF, to work with
+                        # tell().
+                        total += length + 1
+                    else:
+                        total += len(line)
+                    self.line_ends.append(total)
+        # Obtain line number and position (starts from 1). If position is
+        # less than the total up to and including a line, it is on that line.
+        line_number = bisect.bisect_left(self.line_ends, position)
+        if line_number < len(self.line_ends):
+            symbol.line_number = line_number + 1
+            if symbol.line_number == 1:
+                symbol.line_position = position
+            else:  # Accounting for previous lines.
+                symbol.line_position = (position
+                                        - self.line_ends[line_number - 1])
 
     def get_symbol(self):
         """Translate the next sequence of characters into a symbol."""
@@ -250,12 +287,12 @@ class Scanner:
 
         if self.current_character.isalpha():  # Start of a name/keyword.
             name_string = self.get_name()  # Get the alphanumeric name_string.
-            if name_string in self.list_keywords:
+            # Grab ID of symbol.
+            [my_symbol.id] = self.names.lookup([name_string])
+            if my_symbol.id in self.keyword_ids:
                 my_symbol.type = self.KEYWORD
             else:
                 my_symbol.type = self.NAME
-            # Grab ID of symbol.
-            [my_symbol.id] = self.names.lookup([name_string])
             if self.current_character == "":
                 # Accounting for EOF.
                 pass
@@ -273,8 +310,8 @@ class Scanner:
                 # Go back a single character (in LF format).
                 self.file_object.seek(self.file_object.tell() - 1)
 
-        elif (self.current_character == "-" or self.current_character == "_"):
-            # Start of sequence of '-' and '_'.
+        elif self.current_character in ["-", "_", "["]:
+            # Start of a waveform of '-' and '_'.
             my_symbol.type = self.LOGIC
             my_symbol.id = self.get_logic_level()  # String sequence.
             if self.current_character == "":
@@ -284,6 +321,16 @@ class Scanner:
                 # Go back a single character (in LF format).
                 self.file_object.seek(self.file_object.tell() - 1)
 
+        elif self.current_character == '"':  # Start of a string.
+            my_symbol.id = self.get_string()
+            if my_symbol.id is None:  # Unterminated string.
+                my_symbol.type = self.ERROR
+                if self.current_character != "":
+                    # Go back a single character (in LF format).
+                    self.file_object.seek(self.file_object.tell() - 1)
+            else:
+                my_symbol.type = self.STRING
+
         elif self.current_character == "=":
             my_symbol.type = self.EQUALS
 
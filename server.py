@@ -0,0 +1,327 @@
+"""Serve simulations of parsed networks over a local socket.
+
+Used in the Logic Simulator project to run many short simulations without
+paying for process start-up and parsing each time. Clients send one JSON
+request per line over a Unix socket or a localhost TCP connection, and
+receive one JSON object per line in reply. The requests mirror the commands
+of the command line user interface.
+
+Requests
+--------
+{"command": "load", "path": <file path>}
+{"command": "switch", "name": <switch name>, "state": <0 or 1>}
+{"command": "monitor", "signal": <signal name>}
+{"command": "zap", "signal": <signal name>}
+{"command": "run", "cycles": <N>}
+{"command": "continue", "cycles": <N>}
+
+Definition files are watched: before each request, a session whose file has
+changed is updated, and the reply carries "reloaded": "delta" if only its
+monitors and switch states changed, "full" if the network was replaced and
+the simulation restarted, or "failed" if the new file has errors.
+
+Any "id" given in a request is copied into the replies to it. While a run
+or continue request executes, monitor samples are streamed back as
+{"samples": {<signal name>: [signal, ...]}, "start": <first cycle>}
+before the final reply {"ok": true, ...} or {"ok": false, "error": ...}.
+
+Classes
+-------
+Session - stores the simulation state of one client.
+SimulationServer - parses networks and answers client requests.
+"""
+import asyncio
+import copy
+import io
+import json
+import os
+
+from codegen import CodeGenerator
+from hotreload import parse_file, apply_changes, Netlist, FileWatcher
+
+
+class Session:
+    """Store the simulation state of one client.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+    monitors: instance of the monitors.Monitors() class.
+    watcher: instance of the hotreload.FileWatcher() class for the
+             definition file, or None.
+
+    Public methods
+    --------------
+    No public methods.
+    """
+
+    def __init__(self, names, devices, network, monitors, watcher=None):
+        """Initialise session properties."""
+        self.names = names
+        self.devices = devices
+        self.network = network
+        self.monitors = monitors
+        self.watcher = watcher
+        self.engine = CodeGenerator(names, devices, network)
+        self.cycles_completed = 0  # number of simulation cycles completed
+
+
+class SimulationServer:
+    """Parse networks and answer client requests.
+
+    Parsed networks are kept in memory, keyed by file path and modification
+    time, and every client session works on its own copy.
+
+    Parameters
+    ----------
+    chunk_size: number of cycles simulated between streamed samples.
+
+    Public methods
+    --------------
+    load_network(self, path): Returns a new session for the definition file,
+                              and the list of parser error messages.
+
+    get_signal_ids(self, session, signal_name): Returns the device and port
+                                                IDs of the signal name.
+
+    reload_file(self, session): Reparses the definition file of the session
+                                if it changed, and returns the change.
+
+    handle_request(self, session, request, send): Carries out one request and
+                                                  returns the reply.
+
+    run_cycles(self, session, cycles, send, reply): Runs the simulation,
+                                                    streaming samples.
+
+    handle_client(self, reader, writer): Answers the requests of one client.
+
+    serve(self, port=8765, socket_path=None): Serves clients until
+                                              interrupted.
+    """
+
+    def __init__(self, chunk_size=100):
+        """Initialise the parsed network cache."""
+        self.chunk_size = chunk_size
+        # netlists stores {path: (modification_time, session, netlist)}
+        self.netlists = {}
+
+    def load_network(self, path):
+        """Return a new session for the definition file at path.
+
+        Return [session, []] if successful, or [None, error_messages].
+        Requests call this in an executor thread, off the event loop.
+        """
+        if not isinstance(path, str) or not os.path.isfile(path):
+            return [None, ["File does not exist."]]
+        modification_time = os.path.getmtime(path)
+        if (path not in self.netlists or
+                self.netlists[path][0] != modification_time):
+            # Error messages are returned, so the parser output is dropped
+            [names, devices, network, monitors,
+             errors] = parse_file(path, output=io.StringIO())
+            if names is None:
+                return [None, errors]
+            # The scanner may rewrite line endings, so check the time again
+            self.netlists[path] = (os.path.getmtime(path),
+                                   Session(names, devices, network, monitors),
+                                   Netlist(names, devices, monitors))
+        [_, template, netlist] = self.netlists[path]
+        [names, devices, network, monitors] = copy.deepcopy(
+            [template.names, template.devices, template.network,
+             template.monitors])
+        watcher = FileWatcher(path, netlist)
+        return [Session(names, devices, network, monitors, watcher), []]
+
+    def reload_file(self, session):
+        """Reparse the definition file of the session if it changed.
+
+        Return the hotreload.FileChange, or None if the file is unchanged.
+        """
+        return session.watcher.check(io.StringIO())
+
+    def get_signal_ids(self, session, signal_name):
+        """Return the device and port IDs of the signal name.
+
+        Return None if either name is unknown.
+        """
+        if not isinstance(signal_name, str):
+            return None
+        name_ids = [session.names.query(name_string)
+                    for name_string in signal_name.split(".")]
+        if None in name_ids or len(name_ids) > 2:
+            return None
+        if len(name_ids) == 1:
+            name_ids.append(None)
+        return name_ids
+
+    async def handle_request(self, session, request, send):
+        """Carry out one request and return [session, reply].
+
+        send is a coroutine function used to stream intermediate replies.
+        """
+        reply = {}
+        if "id" in request:
+            reply["id"] = request["id"]
+        command = request.get("command")
+
+        if command != "load" and session is not None:
+            # Reparse the definition file off the event loop if it changed
+            change = await asyncio.get_running_loop().run_in_executor(
+                None, self.reload_file, session)
+            if change is None:
+                pass
+            elif change.names is None:
+                reply["reloaded"] = "failed"
+            elif change.changes is not None:
+                apply_changes(change.changes, session.names, session.devices,
+                              session.monitors, session.cycles_completed)
+                reply["reloaded"] = "delta"
+            else:
+                session = Session(change.names, change.devices,
+                                  change.network, change.monitors,
+                                  session.watcher)
+                reply["reloaded"] = "full"
+
+        if command == "load":
+            # Parse off the event loop, so other clients are still served
+            loop = asyncio.get_running_loop()
+            [new_session, errors] = await loop.run_in_executor(
+                None, self.load_network, request.get("path"))
+            if new_session is None:
+                reply.update({"ok": False, "error": "".join(errors)})
+            else:
+                session = new_session
+                monitored, not_monitored = session.monitors.get_signal_names()
+                switches = [session.names.get_name_string(switch_id)
+                            for switch_id in session.devices.find_devices(
+                                session.devices.SWITCH)]
+                reply.update({"ok": True, "switches": switches,
+                              "monitors": monitored,
+                              "signals": not_monitored})
+        elif session is None:
+            reply.update({"ok": False, "error": "No network loaded."})
+        elif command == "switch":
+            switch_ids = self.get_signal_ids(session, request.get("name"))
+            state = request.get("state")
+            if (switch_ids is None or switch_ids[1] is not None or
+                    state not in [0, 1] or
+                    not session.devices.set_switch(switch_ids[0], state)):
+                reply.update({"ok": False, "error": "Invalid switch."})
+            else:
+                reply["ok"] = True
+        elif command == "monitor":
+            signal_ids = self.get_signal_ids(session, request.get("signal"))
+            if signal_ids is None or session.monitors.make_monitor(
+                    signal_ids[0], signal_ids[1],
+                    session.cycles_completed) != session.monitors.NO_ERROR:
+                reply.update({"ok": False,
+                              "error": "Could not make monitor."})
+            else:
+                reply["ok"] = True
+        elif command == "zap":
+            signal_ids = self.get_signal_ids(session, request.get("signal"))
+            if (signal_ids is None or
+                    not session.monitors.remove_monitor(*signal_ids)):
+                reply.update({"ok": False, "error": "Could not zap monitor."})
+            else:
+                reply["ok"] = True
+        elif command in ["run", "continue"]:
+            cycles = request.get("cycles")
+            if not isinstance(cycles, int) or cycles < 0:
+                reply.update({"ok": False, "error": "Invalid cycles."})
+            elif command == "continue" and session.cycles_completed == 0:
+                reply.update({"ok": False,
+                              "error": "Nothing to continue. Run first."})
+            else:
+                if command == "run":
+                    session.cycles_completed = 0
+                    session.monitors.reset_monitors()
+                    session.devices.cold_startup()
+                await self.run_cycles(session, cycles, send, reply)
+        else:
+            reply.update({"ok": False, "error": "Invalid command."})
+        return [session, reply]
+
+    async def run_cycles(self, session, cycles, send, reply):
+        """Run the simulation for the specified number of cycles.
+
+        Samples are sent in chunks as they are produced, and other clients
+        are served between chunks. The final reply is filled in reply.
+        """
+        monitors_dictionary = session.monitors.monitors_dictionary
+        monitor_names = {signal: session.monitors.get_monitor_name(*signal)
+                         for signal in monitors_dictionary}
+        cycles_done = 0
+        while cycles_done < cycles:
+            chunk = min(self.chunk_size, cycles - cycles_done)
+            start = session.cycles_completed
+            chunk_done = session.network.run_cycles(
+                chunk, session.monitors, session.engine.execute_network)
+            oscillating = chunk_done < chunk
+            session.cycles_completed += chunk_done
+            cycles_done += chunk_done
+            if session.cycles_completed > start:
+                samples = {}
+                for signal, signal_list in monitors_dictionary.items():
+                    samples[monitor_names[signal]] = signal_list[start:]
+                message = {"samples": samples, "start": start}
+                if "id" in reply:
+                    message["id"] = reply["id"]
+                await send(message)
+            if oscillating:
+                reply.update({"ok": False, "error": "Network oscillating.",
+                              "cycles_completed": session.cycles_completed})
+                return
+            await asyncio.sleep(0)  # let other clients be served
+        reply.update({"ok": True,
+                      "cycles_completed": session.cycles_completed})
+
+    async def handle_client(self, reader, writer):
+        """Answer the requests of one client until it disconnects."""
+        async def send(message):
+            writer.write((json.dumps(message) + "\n").encode("utf-8"))
+            await writer.drain()
+
+        session = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:  # client disconnected
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if not isinstance(request, dict):
+                    await send({"ok": False, "error": "Invalid request."})
+                    continue
+                [session, reply] = await self.handle_request(session,
+                                                             request, send)
+                await send(reply)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def serve(self, port=8765, socket_path=None):
+        """Serve clients until interrupted.
+
+        Listen on the Unix socket at socket_path if given, otherwise on the
+        given localhost TCP port.
+        """
+        async def main():
+            if socket_path is not None:
+                server = await asyncio.start_unix_server(self.handle_client,
+                                                         path=socket_path)
+            else:
+                server = await asyncio.start_server(self.handle_client,
+                                                    "127.0.0.1", port)
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,11 @@
+"""Test the benchmark module."""
+from benchmark import run_benchmark
+
+
+def test_run_benchmark():
+    """Test if slotted symbols and devices take less memory."""
+    [results, scan_time] = run_benchmark(1000, 1000)
+    assert results["Symbol"] < results["unslotted Symbol"]
+    assert results["Device"] < results["unslotted Device"]
+    assert results["ArrayDevices"] < results["Device"] / 4
+    assert scan_time > 0
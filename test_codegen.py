@@ -0,0 +1,130 @@
+"""Test the codegen module."""
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from codegen import CodeGenerator
+
+# Run the execute_network scenarios of test_network with generated code
+from test_network import (network_with_mux, test_execute_xor,
+                          test_execute_xor_clocked, test_execute_wide_gates,
+                          test_execute_non_xor_gates, test_execute_non_gates,
+                          test_oscillating_network, test_execute_siggen)
+
+
+@pytest.fixture
+def new_network():
+    """Return a Network class instance executed by generated code."""
+    new_names = Names()
+    new_devices = Devices(new_names)
+    new_network = Network(new_names, new_devices)
+    generator = CodeGenerator(new_names, new_devices, new_network)
+    new_network.execute_network = generator.execute_network
+    return new_network
+
+
+def test_generate_source(network_with_mux):
+    """Test if the generated source keeps signals in local variables."""
+    network = network_with_mux
+    generator = CodeGenerator(network.names, network.devices, network)
+    source = generator.generate_source()
+    loop = source.split("for _ in range")[1].split("if steady:")[0]
+    # Outputs are stored when they change, but never read
+    for line in loop.splitlines():
+        assert "outputs" not in line.split("=")[-1]
+    assert "devices_list" not in loop
+
+    network.compile_clusters()
+    source = generator.generate_source()
+    assert "T0 = bytes.fromhex" in source
+
+
+def test_compile_network_cache(network_with_mux):
+    """Test if compiled code is shared by networks with the same netlist."""
+    network = network_with_mux
+    generator = CodeGenerator(network.names, network.devices, network)
+    generator.compile_network()
+    code = CodeGenerator.code_cache.copy()
+
+    other_generator = CodeGenerator(network.names, network.devices, network)
+    other_generator.compile_network()
+    assert CodeGenerator.code_cache == code
+
+    # A change in the netlist is detected and compiled again
+    network.compile_clusters()
+    assert network.devices.netlist_changes != generator.netlist_changes
+    generator.execute_network()
+    assert len(CodeGenerator.code_cache) == len(code) + 1
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_execute_network_matches(network_with_mux, compiled):
+    """Test if generated code gives the same signals as execute_network."""
+    network = network_with_mux
+    devices = network.devices
+    names = devices.names
+    [SW_A, SW_B, SW_S] = names.lookup(["SwA", "SwB", "SwS"])
+    if compiled:
+        network.compile_clusters()
+    generator = CodeGenerator(names, devices, network)
+
+    for state in range(8):
+        for bit, switch_id in enumerate([SW_A, SW_B, SW_S]):
+            devices.set_switch(switch_id, state >> bit & 1)
+        assert generator.execute_network()
+        network.clear_clusters()
+        generated = [dict(device.outputs) for device in devices.devices_list]
+        # The generated state is the one execute_network settles to
+        assert network.execute_network()
+        expected = [dict(device.outputs) for device in devices.devices_list]
+        assert generated == expected
+        if compiled:
+            network.compile_clusters()
+
+
+def test_execute_network_counters(network_with_mux, monkeypatch):
+    """Test if only the change counters are checked on every cycle."""
+    network = network_with_mux
+    devices = network.devices
+    [SW_A, SW_S, OR1] = devices.names.lookup(["SwA", "SwS", "Or1"])
+    generator = CodeGenerator(devices.names, devices, network)
+    assert generator.execute_network()
+
+    def get_signature():
+        raise AssertionError("netlist signature computed again")
+    monkeypatch.setattr(generator, "get_signature", get_signature)
+    for _ in range(3):
+        assert generator.execute_network()
+
+    # Switches restart the simulation, and changed outputs are stored
+    devices.set_switch(SW_A, devices.HIGH)
+    devices.set_switch(SW_S, devices.LOW)
+    simulation = generator.simulation
+    assert generator.execute_network()
+    assert generator.simulation is not simulation
+    assert network.get_output_signal(OR1, None) == devices.HIGH
+
+
+def test_execute_network_outside_changes(network_with_mux):
+    """Test if state written by the network itself is reloaded."""
+    network = network_with_mux
+    devices = network.devices
+    [SW_A, SW_S, OR1] = devices.names.lookup(["SwA", "SwS", "Or1"])
+    generator = CodeGenerator(devices.names, devices, network)
+    assert generator.execute_network()
+
+    # Bypass set_switch, then let the network settle on its own
+    devices.get_device(SW_A).switch_state = devices.HIGH
+    devices.get_device(SW_S).switch_state = devices.LOW
+    assert network.execute_network()
+    assert network.execute_network()
+    assert network.get_output_signal(OR1, None) == devices.HIGH
+    # The generator continues from the settled outputs and switch states
+    simulation = generator.simulation
+    devices.get_device(SW_A).switch_state = devices.LOW
+    devices.get_device(SW_S).switch_state = devices.HIGH
+    network.skip_cycles(0)
+    assert generator.execute_network()
+    assert generator.simulation is not simulation
+    assert network.get_output_signal(OR1, None) == devices.LOW
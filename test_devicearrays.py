@@ -0,0 +1,114 @@
+"""Test the devicearrays module."""
+import copy
+import pickle
+
+import pytest
+
+import test_devices
+import test_network
+import test_parse
+from names import Names
+from devices import Device
+from network import Network
+from devicearrays import ArrayDevices, DeviceView
+
+# Run the devices, network and parser tests with devices stored in arrays
+from test_devices import (new_devices, devices_with_items, test_get_device,
+                          test_find_devices, test_make_device,
+                          test_make_device_gives_errors, test_get_signal_name,
+                          test_set_switch, test_change_counters,
+                          test_make_device_siggen,
+                          test_reset_siggen, test_make_register,
+                          test_make_memory)
+from test_network import (new_network, network_with_devices,
+                          network_with_mux, test_get_connected_output,
+                          test_get_input_signal, test_get_output_signal,
+                          test_check_network, test_make_connection,
+                          test_execute_xor, test_execute_xor_transitions,
+                          test_execute_xor_clocked, test_execute_wide_gates,
+                          test_execute_non_xor_gates, test_execute_non_gates,
+                          test_oscillating_network, test_execute_siggen,
+                          test_compile_clusters, test_execute_cluster,
+                          test_execute_register, test_execute_memory)
+from test_parse import test_wide_gates, test_registers, test_memories
+
+
+@pytest.fixture(autouse=True)
+def array_devices(monkeypatch):
+    """Make the imported tests store their devices in arrays."""
+    for module in [test_devices, test_network, test_parse]:
+        monkeypatch.setattr(module, "Devices", ArrayDevices)
+
+
+@pytest.fixture
+def devices_with_gates():
+    """Return an ArrayDevices instance with a switch driving two gates."""
+    names = Names()
+    devices = ArrayDevices(names)
+    network = Network(names, devices)
+    [SW1_ID, AND1_ID, XOR1_ID, I1_ID, I2_ID] = names.lookup(
+        ["Sw1", "And1", "Xor1", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(AND1_ID, devices.AND, 2)
+    devices.make_device(XOR1_ID, devices.XOR)
+    for gate_id in [AND1_ID, XOR1_ID]:
+        for input_id in [I1_ID, I2_ID]:
+            network.make_connection(SW1_ID, None, gate_id, input_id)
+    return network
+
+
+def test_device_views(devices_with_gates):
+    """Test if device views read and write the arrays."""
+    devices = devices_with_gates.devices
+    [SW1_ID, AND1_ID, I1_ID, I3_ID] = devices.names.lookup(
+        ["Sw1", "And1", "I1", "I3"])
+    switch = devices.get_device(SW1_ID)
+    assert switch == devices.devices_list[0]
+    assert switch != devices.devices_list[1]
+    assert switch.switch_state == 1
+    assert switch.clock_counter is None
+    assert "clock_counter" not in devices.properties  # never set
+
+    gate = devices.get_device(AND1_ID)
+    assert gate.inputs[I1_ID] == (SW1_ID, None)
+    assert dict(gate.outputs) == {None: devices.LOW}
+
+    # Existing ports are updated in place, not added again
+    port_count = len(devices.output_ports)
+    gate.outputs[None] = devices.HIGH
+    assert dict(gate.outputs) == {None: devices.HIGH}
+    assert len(devices.output_ports) == port_count
+
+    # Adding a port to an earlier device moves its ports to the end
+    assert devices.add_input(AND1_ID, I3_ID)
+    assert list(gate.inputs) == devices.get_indexed_port_ids("I", 4)[1:]
+    assert gate.inputs[I3_ID] is None
+    assert devices.get_device(devices.find_devices(devices.XOR)[0]).inputs[
+        I1_ID] == (SW1_ID, None)
+
+
+def test_execute_network_arrays(devices_with_gates):
+    """Test if the network executes devices stored in arrays."""
+    network = devices_with_gates
+    devices = network.devices
+    [AND1_ID, XOR1_ID] = devices.names.lookup(["And1", "Xor1"])
+    assert network.execute_network()
+    assert network.get_output_signal(AND1_ID, None) == devices.HIGH
+    assert network.get_output_signal(XOR1_ID, None) == devices.LOW
+
+
+def test_copy_and_pickle(devices_with_gates):
+    """Test if views are copied with their arrays and pickled as Devices."""
+    devices = devices_with_gates.devices
+    [SW1_ID] = devices.names.lookup(["Sw1"])
+    [devices_copy, switch_copy] = copy.deepcopy(
+        [devices, devices.get_device(SW1_ID)])
+    assert isinstance(switch_copy, DeviceView)
+    assert switch_copy.devices is devices_copy
+    devices_copy.set_switch(SW1_ID, 0)
+    assert devices.get_device(SW1_ID).switch_state == 1
+
+    switch = pickle.loads(pickle.dumps(devices.get_device(SW1_ID)))
+    assert isinstance(switch, Device)
+    assert (switch.device_id, switch.switch_state) == (SW1_ID, 1)
+    assert switch.outputs == {None: devices.LOW}
@@ -3,6 +3,7 @@ import pytest
 
 from names import Names
 from devices import Devices
+from memory import RomImage
 
 
 @pytest.fixture
@@ -89,10 +90,22 @@ def test_make_device(new_devices):
     assert dtype_device.dtype_memory in [new_devices.LOW, new_devices.HIGH]
 
 
+def test_device_slots(devices_with_items):
+    """Test if devices keep their properties in slots only."""
+    for device in devices_with_items.devices_list:
+        assert not hasattr(device, "__dict__")
+        with pytest.raises(AttributeError):
+            device.clock_phase = 0
+
+
 @pytest.mark.parametrize("function_args, error", [
-    ("(AND1_ID, new_devices.AND, 17)", "new_devices.INVALID_QUALIFIER"),
+    ("(AND1_ID, new_devices.AND, 1025)", "new_devices.INVALID_QUALIFIER"),
+    ("(AND1_ID, new_devices.AND, 0)", "new_devices.INVALID_QUALIFIER"),
+    ("(AND1_ID, new_devices.AND, None)", "new_devices.NO_QUALIFIER"),
     ("(SW1_ID, new_devices.SWITCH, None)", "new_devices.NO_QUALIFIER"),
-    ("(X1_ID, new_devices.XOR, 2)", "new_devices.QUALIFIER_PRESENT"),
+    ("(X1_ID, new_devices.XOR, 0)", "new_devices.INVALID_QUALIFIER"),
+    ("(X1_ID, new_devices.XNOR, 40)", "new_devices.NO_ERROR"),
+    ("(D_ID, new_devices.D_TYPE, 2)", "new_devices.QUALIFIER_PRESENT"),
     ("(D_ID, D_ID, None)", "new_devices.BAD_DEVICE"),
     ("(CL_ID, new_devices.CLOCK, 0)", "new_devices.INVALID_QUALIFIER"),
     ("(CL_ID, new_devices.CLOCK, 10)", "new_devices.NO_ERROR"),
@@ -150,12 +163,36 @@ def test_set_switch(new_devices):
     assert switch_object.switch_state == new_devices.LOW
 
 
+def test_change_counters(new_devices):
+    """Test if new ports and outside state changes are counted."""
+    names = new_devices.names
+    [SW1_ID, I1_ID] = names.lookup(["Sw1", "I1"])
+    new_devices.make_device(SW1_ID, new_devices.SWITCH, 1)
+    netlist_changes = new_devices.netlist_changes
+    state_changes = new_devices.state_changes
+    assert netlist_changes > 0
+
+    # Setting the signal of an existing output is a state change
+    new_devices.add_output(SW1_ID, None, new_devices.HIGH)
+    assert new_devices.netlist_changes == netlist_changes
+    assert new_devices.state_changes == state_changes + 1
+    new_devices.add_input(SW1_ID, I1_ID)
+    assert new_devices.netlist_changes == netlist_changes + 1
+
+    new_devices.set_switch(SW1_ID, new_devices.LOW)
+    new_devices.cold_startup()
+    assert new_devices.state_changes == state_changes + 3
+
+
 @pytest.mark.parametrize("sequence, sequence_two", [
     ("__----__", "123123"),
     ("____", "Something"),
     ("----", "__--asddasd-__"),
     ("-_-_-", ".."),
-    ("---------------", " ")
+    ("---------------", " "),
+    ("-3[_-2]4", "[-_"),
+    ("[[-]2_]3", "-0"),
+    ("_12", "-[]2"),
 ])
 def test_check_waveform(new_devices, sequence, sequence_two):
     """Test if check_waveform method returns the correct output."""
@@ -171,7 +208,10 @@ def test_check_waveform(new_devices, sequence, sequence_two):
     ("----", [4]),
     ("-_-_", [1, 2, 3, 4]),
     ("---------------", [15]),
-    ("_", [1])
+    ("_", [1]),
+    ("_2-6_", [2, 8, 9]),
+    ("[-_2]2", [1, 3, 4, 6]),
+    ("-[-]3_", [4, 5]),
 ])
 def test_get_siggen_waveform(new_devices, sequence, waveform):
     """Test if get_siggen_waveform method returns expected output."""
@@ -184,7 +224,8 @@ def test_get_siggen_waveform(new_devices, sequence, waveform):
     ("----", 1),
     ("-_-_-", 1),
     ("---------------", 1),
-    ("-", 1)
+    ("-", 1),
+    ("[[_-]2-]3", 0),
 ])
 def test_get_starting_state(new_devices, sequence, starting_state):
     """Test if get_starting_state method returns expected output."""
@@ -263,3 +304,80 @@ def test_reset_siggen(new_devices, sig_id, waveform, init):
 
     # Siggen counter reset to 0.
     assert siggen.siggen_counter == 0
+
+
+@pytest.mark.parametrize("device_kind, inputs", [
+    ("REGISTER", ["CLK", "CLEAR", "D0", "D1", "D2"]),
+    ("COUNTER", ["CLK", "CLEAR"]),
+    ("SHIFTREG", ["CLK", "CLEAR", "DATA"]),
+])
+def test_make_register(new_devices, device_kind, inputs):
+    """Test if registers are made with their indexed ports."""
+    names = new_devices.names
+    [REG_ID, kind] = names.lookup(["Reg1", device_kind])
+    assert new_devices.make_device(REG_ID, kind, 0) == (
+        new_devices.INVALID_QUALIFIER)
+    assert new_devices.make_device(REG_ID, kind) == new_devices.NO_QUALIFIER
+    assert new_devices.make_device(REG_ID, kind, 3) == new_devices.NO_ERROR
+
+    device = new_devices.get_device(REG_ID)
+    assert list(device.inputs) == names.lookup(inputs)
+    assert list(device.outputs) == names.lookup(["Q0", "Q1", "Q2"])
+    assert device.register_width == 3
+    assert device.register_state in range(8)
+
+
+@pytest.mark.parametrize("port_name, input_port, indexed", [
+    ("D0", True, True),
+    ("D15", True, True),
+    ("Q7", False, True),
+    ("Q7", True, False),
+    ("D01", True, False),
+    ("D", True, False),
+    ("DATA", True, False),
+    ("I1", True, True),
+    ("I1024", True, True),
+    ("I0", True, False),
+    ("I1025", True, False),
+    ("I1", False, False),
+])
+def test_is_indexed_port(new_devices, port_name, input_port, indexed):
+    """Test if indexed port names are recognised."""
+    assert new_devices.is_indexed_port(port_name, input_port) == indexed
+
+
+def test_make_memory(new_devices, tmp_path):
+    """Test if ROM and RAM devices are made with their ports."""
+    names = new_devices.names
+    [ROM_ID, RAM_ID] = names.lookup(["Rom1", "Ram1"])
+    path = tmp_path / "image.bin"
+    path.write_bytes(bytes(range(8)))
+    image = RomImage(str(path))
+
+    assert new_devices.make_device(ROM_ID, new_devices.ROM, (2, 8)) == (
+        new_devices.INVALID_QUALIFIER)
+    assert new_devices.make_device(ROM_ID, new_devices.ROM,
+                                   (image, 2, 65)) == (
+        new_devices.INVALID_QUALIFIER)
+    assert new_devices.make_device(RAM_ID, new_devices.RAM, (25, 8)) == (
+        new_devices.INVALID_QUALIFIER)
+    assert new_devices.make_device(ROM_ID, new_devices.ROM, (image, 2, 8)) == (
+        new_devices.NO_ERROR)
+    assert new_devices.make_device(RAM_ID, new_devices.RAM, (3, 12)) == (
+        new_devices.NO_ERROR)
+
+    rom = new_devices.get_device(ROM_ID)
+    assert list(rom.inputs) == names.lookup(["A0", "A1"])
+    assert len(rom.outputs) == 8
+    assert rom.memory is image and rom.memory_file is image
+    ram = new_devices.get_device(RAM_ID)
+    assert list(ram.inputs) == names.lookup(["A0", "A1", "A2"] + [
+        "D" + str(bit) for bit in range(12)] + ["WE", "CLK"])
+    assert len(ram.outputs) == 12
+    assert ram.memory == bytearray(16)  # eight two byte words
+
+    ram.memory[3] = 7
+    writes = ram.memory_writes
+    new_devices.cold_startup()
+    assert ram.memory == bytearray(16)
+    assert ram.memory_writes == writes + 1
@@ -10,7 +10,7 @@ from network import Network
 from monitors import Monitors
 from scanner import Scanner
 from parse import Parser
-from gui import Gui
+from gui import Gui, SignalList
 
 # Unit tests for the Gui Class.
 
@@ -38,3 +38,28 @@ def test_build_gui_monitor_dictionary():
              monitors)
     monitor_dict = ui.build_gui_monitor_dictionary()
     assert monitor_dict == {'xor1': [], 'and1': []}
+
+
+def test_signal_list():
+    """Test if SignalList keeps its names sorted and filters them."""
+    app = wx.App()
+    builtins._ = wx.GetTranslation
+    frame = wx.Frame(None)
+    signal_list = SignalList(frame, ["Signal"], sort=True)
+    signal_list.set_names(["xor1", "and1", "DTYPE1.Q", "dtype1.QBAR"])
+    assert signal_list.GetItemCount() == 4
+    assert signal_list.OnGetItemText(0, 0) == "DTYPE1.Q"
+
+    signal_list.set_filter("dtype1.q")
+    assert signal_list.GetItemCount() == 2
+    signal_list.set_filter("dtype1.qb")
+    assert signal_list.GetItemCount() == 1
+    assert signal_list.OnGetItemText(0, 0) == "dtype1.QBAR"
+
+    signal_list.set_filter("")
+    signal_list.remove_name("and1")
+    signal_list.add_name("or1")
+    assert [signal_list.OnGetItemText(item, 0) for item in range(
+        signal_list.GetItemCount())] == ["DTYPE1.Q", "dtype1.QBAR", "or1",
+                                         "xor1"]
+    frame.Destroy()
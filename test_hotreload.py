@@ -0,0 +1,132 @@
+"""Test the hotreload module."""
+import io
+import os
+
+import pytest
+
+from hotreload import parse_file, apply_changes, Netlist, FileWatcher
+
+ADDER = """DEVICES {
+xor1 = XOR;
+and1 = AND (number_of_inputs:2);
+SW1 = SWITCH (initial_state:1);
+SW2 = SWITCH (initial_state:%d);
+}
+
+CONNECT {
+SW1 = xor1.I1;
+SW2 = xor1.I2;
+SW1 = and1.I1;
+%s;
+}
+
+MONITOR {
+%s
+}
+
+END"""
+
+
+def write_adder(path, switch_state=1, and_input="SW2 = and1.I2",
+                monitors="xor1;\nand1;"):
+    """Write a single bit adder definition file, and change its mtime."""
+    modification_time = None
+    if os.path.exists(path):
+        modification_time = os.stat(path).st_mtime_ns
+    with open(path, "w") as definition_file:
+        definition_file.write(ADDER % (switch_state, and_input, monitors))
+    if modification_time is not None:  # make sure the change is seen
+        os.utime(path, ns=(modification_time + 10 ** 9,
+                           modification_time + 10 ** 9))
+
+
+@pytest.fixture
+def adder_watcher(tmp_path):
+    """Return a path, the parsed objects and a FileWatcher for an adder."""
+    path = str(tmp_path / "adder.txt")
+    write_adder(path)
+    [names, devices, network, monitors, errors] = parse_file(path)
+    assert errors == []
+    watcher = FileWatcher(path, Netlist(names, devices, monitors))
+    return [path, [names, devices, network, monitors], watcher]
+
+
+def test_netlist_compare(adder_watcher):
+    """Test if netlists separate monitor and switch changes from others."""
+    [path, [names, devices, network, monitors], watcher] = adder_watcher
+    netlist = Netlist(names, devices, monitors)
+    assert netlist.compare(netlist) == [{}, [], []]
+
+    write_adder(path, switch_state=0, monitors="xor1;\nSW2;")
+    [names, devices, network, monitors, errors] = parse_file(path)
+    assert netlist.compare(Netlist(names, devices, monitors)) == [
+        {"SW2": 0}, ["SW2"], ["and1"]]
+
+    write_adder(path, and_input="SW2 = and1.I2;\nSW1 = xor1.I2")
+    [names, devices, network, monitors, errors] = parse_file(path)
+    assert errors != []  # xor1.I2 connected twice
+
+    write_adder(path, switch_state=0, monitors="xor1;")
+    [names, devices, network, monitors, errors] = parse_file(path)
+    devices.make_device(names.lookup(["SW3"])[0], devices.SWITCH, 0)
+    assert netlist.compare(Netlist(names, devices, monitors)) is None
+
+
+def test_parse_file_output(tmp_path, capsys):
+    """Test if parser messages go to the given stream, not stdout."""
+    path = str(tmp_path / "adder.txt")
+    write_adder(path, monitors="xor1")  # missing semicolon
+    output = io.StringIO()
+    [names, devices, network, monitors, errors] = parse_file(path,
+                                                             output=output)
+    assert names is None
+    assert output.getvalue() == "".join(errors)
+    assert capsys.readouterr().out == ""
+
+
+def test_file_watcher_check(adder_watcher):
+    """Test if only changed file contents are reparsed and compared."""
+    [path, [names, devices, network, monitors], watcher] = adder_watcher
+    assert watcher.check() is None
+
+    # Touching the file without changing it is ignored
+    write_adder(path)
+    assert watcher.check() is None
+
+    write_adder(path, switch_state=0)
+    change = watcher.check()
+    assert change.changes == [{"SW2": 0}, [], []]
+    assert change.devices is not devices
+    assert watcher.check() is None
+
+    write_adder(path, switch_state=0, monitors="xor1")  # missing semicolon
+    change = watcher.check()
+    assert change.names is None
+    assert change.error_messages != []
+
+    write_adder(path, switch_state=0, monitors="xor1;")
+    change = watcher.check()
+    assert change.changes == [{}, [], ["and1"]]
+
+
+def test_apply_changes(adder_watcher):
+    """Test if changes are applied without resetting the simulation."""
+    [path, [names, devices, network, monitors], watcher] = adder_watcher
+    [SW2_ID, AND1_ID, XOR1_ID] = names.lookup(["SW2", "and1", "xor1"])
+    for _ in range(3):
+        assert network.execute_network()
+        monitors.record_signals()
+
+    write_adder(path, switch_state=0, monitors="xor1;\nSW2;")
+    change = watcher.check()
+    apply_changes(change.changes, names, devices, monitors, 3)
+    assert devices.get_device(SW2_ID).switch_state == 0
+    assert list(monitors.monitors_dictionary) == [(XOR1_ID, None),
+                                                  (SW2_ID, None)]
+    assert monitors.monitors_dictionary[(XOR1_ID, None)] == [0, 0, 0]
+    assert monitors.monitors_dictionary[(SW2_ID, None)] == [
+        devices.BLANK] * 3
+
+    assert network.execute_network()
+    monitors.record_signals()
+    assert monitors.monitors_dictionary[(XOR1_ID, None)][-1] == 1
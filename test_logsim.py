@@ -0,0 +1,40 @@
+"""Test the logsim module."""
+import subprocess
+import sys
+import time
+
+# Start-up time budget of the command line user interface, in seconds
+STARTUP_BUDGET = 0.5
+
+
+def run_logsim(code, user_input="q\n"):
+    """Run Python code in a new interpreter and return its output."""
+    completed = subprocess.run([sys.executable, "-c", code],
+                               input=user_input, capture_output=True,
+                               text=True, check=True)
+    return completed.stdout
+
+
+def test_cli_does_not_import_gui():
+    """Test if the command line user interface never imports the GUI stack."""
+    output = run_logsim(
+        "import sys, logsim\n"
+        "logsim.main(['-c', 'definition_files/single_bit_adder.txt'])\n"
+        "print(sorted(name for name in ['wx', 'OpenGL', 'gui', 'numpy',\n"
+        "                               'asyncio', 'multiprocessing']\n"
+        "             if name in sys.modules))\n")
+    assert "Logic Simulator: interactive command line user interface." \
+        in output
+    assert output.endswith(" []\n")
+
+
+def test_cli_startup_budget():
+    """Test if the command line user interface starts within its budget."""
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        run_logsim("import logsim\n"
+                   "logsim.main(['-c', "
+                   "'definition_files/single_bit_adder.txt'])\n")
+        timings.append(time.perf_counter() - start)
+    assert min(timings) < STARTUP_BUDGET
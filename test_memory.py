@@ -0,0 +1,54 @@
+"""Test the memory module."""
+import copy
+import os
+import pickle
+
+import pytest
+
+from memory import RomImage
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    """Return the path of a four byte ROM image."""
+    path = tmp_path / "image.bin"
+    path.write_bytes(bytes([1, 2, 3, 4]))
+    return str(path)
+
+
+def test_rom_image(image_path):
+    """Test if ROM images index and slice like the bytes of the file."""
+    image = RomImage(image_path)
+    assert len(image) == 4
+    assert image[2] == 3
+    assert image[1:3] == bytes([2, 3])
+    assert image[3:5] == bytes([4])  # short past the end of the file
+
+
+def test_rom_image_compare(image_path, tmp_path):
+    """Test if ROM images compare by file, and copy without rereading."""
+    image = RomImage(image_path)
+    assert image == RomImage(image_path)
+    assert hash(image) == hash(RomImage(image_path))
+    assert copy.deepcopy(image) is image
+    assert pickle.loads(pickle.dumps(image)) == image
+
+    other_path = tmp_path / "other.bin"
+    other_path.write_bytes(bytes([1, 2, 3, 4]))
+    assert image != RomImage(str(other_path))
+
+    # Changing the file changes its modification time
+    modification_time = os.stat(image_path).st_mtime_ns
+    os.utime(image_path, ns=(modification_time + 10 ** 9,
+                             modification_time + 10 ** 9))
+    assert image != RomImage(image_path)
+
+
+def test_rom_image_raises_exceptions(tmp_path):
+    """Test if missing or empty files raise exceptions."""
+    with pytest.raises(OSError):
+        RomImage(str(tmp_path / "missing.bin"))
+    empty_path = tmp_path / "empty.bin"
+    empty_path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        RomImage(str(empty_path))
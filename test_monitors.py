@@ -89,6 +89,31 @@ def test_get_signal_names(new_monitors):
                                                ["D1.Q", "D1.QBAR"]]
 
 
+def test_signal_name_index(new_monitors):
+    """Test if the signal name index follows monitor and device changes."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    [SW1_ID, OR1_ID, D_ID, Q_ID, QBAR_ID] = names.lookup(["Sw1", "Or1", "D1",
+                                                          "Q", "QBAR"])
+    devices.make_device(D_ID, devices.D_TYPE)
+    new_monitors.make_monitor(D_ID, QBAR_ID)
+    assert new_monitors.get_margin() == 7
+    assert new_monitors.get_monitor_name(D_ID, QBAR_ID) == "D1.QBAR"
+
+    # Unmonitored signals stay in the order of the devices
+    new_monitors.remove_monitor(SW1_ID, None)
+    new_monitors.remove_monitor(OR1_ID, None)
+    assert new_monitors.get_signal_names() == [["Sw2", "D1.QBAR"],
+                                               ["Sw1", "Or1", "D1.Q"]]
+
+    new_monitors.remove_monitor(D_ID, QBAR_ID)
+    assert new_monitors.get_margin() == 3
+    new_monitors.make_monitor(D_ID, Q_ID)
+    assert new_monitors.get_margin() == 4
+    assert new_monitors.get_signal_names() == [["Sw2", "D1.Q"],
+                                               ["Sw1", "Or1", "D1.QBAR"]]
+
+
 def test_record_signals(new_monitors):
     """Test if record_signals records the correct signals."""
     names = new_monitors.names
@@ -197,3 +222,46 @@ def test_display_signals(capsys, new_monitors):
             "Clock1: -__--__--__--__--__-" in traces)
 
     assert "" in traces  # additional empty line at the end
+
+
+def test_make_monitor_on_cluster(new_monitors):
+    """Test if monitoring an interior cluster gate recompiles the clusters."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, SW2_ID, OR1_ID, NOT1_ID, I1] = names.lookup(["Sw1", "Sw2", "Or1",
+                                                          "Not1", "I1"])
+
+    # Move Sw1 behind an inverter, so that Not1 and Or1 form a cluster
+    devices.make_device(NOT1_ID, devices.NAND, 1)
+    or1 = devices.get_device(OR1_ID)
+    or1.inputs[I1] = None
+    network.make_connection(SW1_ID, None, NOT1_ID, I1)
+    network.make_connection(NOT1_ID, None, OR1_ID, I1)
+    assert network.compile_clusters(new_monitors.monitors_dictionary) == 1
+
+    network.execute_network()
+    assert new_monitors.make_monitor(NOT1_ID, None) == new_monitors.NO_ERROR
+    assert NOT1_ID not in network.cluster_devices
+    assert network.get_output_signal(NOT1_ID, None) == devices.HIGH
+
+
+def test_display_signals_window(capsys, new_monitors):
+    """Test if a cycle window of the traces is displayed and wrapped."""
+    devices = new_monitors.devices
+    [SW1_ID, SW2_ID, OR1_ID] = new_monitors.names.lookup(["Sw1", "Sw2",
+                                                          "Or1"])
+    new_monitors.monitors_dictionary[(SW1_ID, None)] = [devices.LOW,
+                                                        devices.RISING,
+                                                        devices.HIGH,
+                                                        devices.FALLING] * 3
+    new_monitors.remove_monitor(SW2_ID, None)
+    new_monitors.remove_monitor(OR1_ID, None)
+
+    new_monitors.display_signals(2, 7)
+    out, _ = capsys.readouterr()
+    assert out == "Sw1: -\\_/-\n"
+
+    new_monitors.display_signals(width=10)
+    out, _ = capsys.readouterr()
+    assert out == "Sw1: _/-\\_\n\nSw1: /-\\_/\n\nSw1: -\\\n"
@@ -148,3 +148,12 @@ def test_get_name_string(with_names, default_name, name_id, expected_string):
     assert default_name.get_name_string(name_id) is None
     # Output is string.
     assert isinstance(with_names.get_name_string(0), str)
+
+
+def test_name_ids_interned(default_name):
+    """Test if every lookup of a name returns the same int object."""
+    default_name.lookup([str(number) for number in range(1000)])
+    [name_id] = default_name.lookup(["999"])
+    assert name_id == 999
+    assert default_name.lookup(["999"])[0] is name_id
+    assert default_name.query("999") is name_id
@@ -1,9 +1,14 @@
 """Test the network module."""
+import random
+import tracemalloc
+
 import pytest
 
 from names import Names
 from devices import Devices
 from network import Network
+from monitors import Monitors
+from memory import RomImage
 
 
 @pytest.fixture
@@ -210,6 +215,102 @@ def test_execute_xor(new_network):
     assert network.get_output_signal(XOR1_ID, None) == devices.LOW
 
 
+@pytest.mark.parametrize("gate_kind, switch_outputs, gate_output", [
+    ("devices.XOR", ["RISING", "HIGH"], "HIGH"),
+    ("devices.XOR", ["RISING", "FALLING"], "HIGH"),
+    ("devices.XOR", ["FALLING", "FALLING"], "FALLING"),
+    ("devices.XOR", ["HIGH", "HIGH", "RISING"], "HIGH"),
+    ("devices.XNOR", ["RISING", "HIGH"], "FALLING"),
+    ("devices.XNOR", ["LOW", "FALLING"], "FALLING"),
+])
+def test_execute_xor_transitions(new_network, gate_kind, switch_outputs,
+                                 gate_output):
+    """Test if XOR and XNOR gates compare the signals of their inputs."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [GATE_ID] = names.lookup(["Gate1"])
+    switch_ids = names.lookup(["Sw1", "Sw2", "Sw3"])[:len(switch_outputs)]
+    input_ids = names.lookup(["I1", "I2", "I3"])
+    devices.make_device(GATE_ID, eval(gate_kind), len(switch_outputs))
+    for switch_id, input_id, output in zip(switch_ids, input_ids,
+                                           switch_outputs):
+        devices.make_device(switch_id, devices.SWITCH, 0)
+        network.make_connection(switch_id, None, GATE_ID, input_id)
+        devices.get_device(switch_id).outputs[None] = eval("devices." +
+                                                           output)
+
+    devices.get_device(GATE_ID).outputs[None] = devices.HIGH
+    assert network.execute_gate(GATE_ID, None, None)
+    assert network.get_output_signal(GATE_ID, None) == eval(
+        "devices." + gate_output)
+
+
+def test_execute_xor_clocked(new_network):
+    """Test if a D-type samples an XOR output while it is falling."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, SW3_ID, AND1_ID, XOR1_ID, D1_ID, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Sw3", "And1", "Xor1", "D1", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 1)
+    devices.make_device(SW3_ID, devices.SWITCH, 0)
+    devices.make_device(AND1_ID, devices.AND, 1)
+    devices.make_device(XOR1_ID, devices.XOR)
+    devices.make_device(D1_ID, devices.D_TYPE)
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(SW1_ID, None, XOR1_ID, I1)
+    network.make_connection(SW2_ID, None, XOR1_ID, I2)
+    network.make_connection(AND1_ID, None, D1_ID, devices.CLK_ID)
+    network.make_connection(XOR1_ID, None, D1_ID, devices.DATA_ID)
+    network.make_connection(SW3_ID, None, D1_ID, devices.SET_ID)
+    network.make_connection(SW3_ID, None, D1_ID, devices.CLEAR_ID)
+    assert network.execute_network()
+    assert network.get_output_signal(XOR1_ID, None) == devices.HIGH
+
+    # The XOR output is still FALLING when the buffered clock rises, as
+    # Xor1 compares the RISING Sw1 with the HIGH Sw2 as different
+    devices.set_switch(SW1_ID, devices.HIGH)
+    assert network.execute_network()
+    assert network.get_output_signal(XOR1_ID, None) == devices.LOW
+    assert network.get_output_signal(D1_ID, devices.Q_ID) == devices.HIGH
+
+
+@pytest.mark.parametrize("gate_kind, high_inputs, gate_output", [
+    ("devices.AND", 40, "HIGH"),
+    ("devices.AND", 39, "LOW"),
+    ("devices.NOR", 0, "HIGH"),
+    ("devices.NOR", 1, "LOW"),
+    ("devices.XOR", 17, "HIGH"),
+    ("devices.XOR", 20, "LOW"),
+    ("devices.XNOR", 0, "HIGH"),
+    ("devices.XNOR", 33, "LOW"),
+])
+def test_execute_wide_gates(new_network, gate_kind, high_inputs,
+                            gate_output):
+    """Test if execute_network returns the correct output for wide gates."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [GATE_ID] = names.lookup(["Gate1"])
+    switch_ids = names.lookup(["Sw" + str(index) for index in range(40)])
+    input_ids = names.lookup(["I" + str(index) for index in range(1, 41)])
+
+    devices.make_device(GATE_ID, eval(gate_kind), 40)
+    for index, switch_id in enumerate(switch_ids):
+        devices.make_device(switch_id, devices.SWITCH,
+                            int(index < high_inputs))
+        network.make_connection(switch_id, None, GATE_ID, input_ids[index])
+
+    network.execute_network()
+    assert network.get_output_signal(GATE_ID, None) == eval(
+        "devices." + gate_output)
+
+
 @pytest.mark.parametrize("gate_id, switch_outputs, gate_output, gate_kind", [
     ("AND1_ID", ["LOW", "HIGH", "LOW"], "LOW", "devices.AND"),
     ("AND1_ID", ["HIGH", "HIGH", "HIGH"], "HIGH", "devices.AND"),
@@ -380,3 +481,496 @@ def test_execute_siggen(new_network, waveform, logic):
         # Testing seven cycles.
         network.execute_network()
         assert eval(sg_output) == logic[cycle]
+        # The cursor points to the next switching point
+        siggen = devices.get_device(SG_ID)
+        assert siggen.siggen_waveform[siggen.siggen_cursor] == min(
+            point for point in siggen.siggen_waveform
+            if point >= siggen.siggen_counter)
+
+
+@pytest.fixture
+def network_with_mux():
+    """Return a Network class instance with a 2-to-1 multiplexer.
+
+    The multiplexer is made from gates: Out = (A AND NOT S) OR (B AND S).
+    """
+    new_names = Names()
+    new_devices = Devices(new_names)
+    new_network = Network(new_names, new_devices)
+
+    [SW_A, SW_B, SW_S, NOT1, AND1, AND2, OR1, I1, I2] = new_names.lookup(
+        ["SwA", "SwB", "SwS", "Not1", "And1", "And2", "Or1", "I1", "I2"])
+
+    for switch_id in [SW_A, SW_B, SW_S]:
+        new_devices.make_device(switch_id, new_devices.SWITCH, 0)
+    new_devices.make_device(NOT1, new_devices.NAND, 1)
+    new_devices.make_device(AND1, new_devices.AND, 2)
+    new_devices.make_device(AND2, new_devices.AND, 2)
+    new_devices.make_device(OR1, new_devices.OR, 2)
+
+    new_network.make_connection(SW_S, None, NOT1, I1)
+    new_network.make_connection(SW_A, None, AND1, I1)
+    new_network.make_connection(NOT1, None, AND1, I2)
+    new_network.make_connection(SW_B, None, AND2, I1)
+    new_network.make_connection(SW_S, None, AND2, I2)
+    new_network.make_connection(AND1, None, OR1, I1)
+    new_network.make_connection(AND2, None, OR1, I2)
+
+    return new_network
+
+
+def test_compile_clusters(network_with_mux):
+    """Test if compile_clusters builds one cluster for the multiplexer."""
+    network = network_with_mux
+    names = network.devices.names
+    [SW_A, SW_B, SW_S, NOT1, AND1, AND2, OR1] = names.lookup(
+        ["SwA", "SwB", "SwS", "Not1", "And1", "And2", "Or1"])
+
+    assert network.compile_clusters() == 1
+    [cluster] = network.clusters
+    assert cluster.root_id == OR1
+    assert cluster.gates[-1].device_id == OR1
+    assert set(network.cluster_devices) == {NOT1, AND1, AND2, OR1}
+    assert set(cluster.input_signals) == {(SW_A, None), (SW_B, None),
+                                          (SW_S, None)}
+    assert len(cluster.table) == 8
+
+    # A monitored interior gate must stay visible, as the root of its own
+    # cluster
+    assert network.compile_clusters([(AND1, None)]) == 2
+    assert network.cluster_devices[AND1].root_id == AND1
+    assert network.cluster_devices[AND2].root_id == OR1
+
+    # The input limit splits the cone into smaller clusters
+    assert network.compile_clusters(max_inputs=2) == 1
+    assert network.cluster_devices[NOT1].root_id == AND1
+    assert OR1 not in network.cluster_devices
+
+
+@pytest.mark.parametrize("switch_states, output", [
+    ([0, 0, 0], "LOW"),
+    ([1, 0, 0], "HIGH"),
+    ([0, 1, 0], "LOW"),
+    ([0, 1, 1], "HIGH"),
+    ([1, 0, 1], "LOW"),
+    ([1, 1, 1], "HIGH"),
+])
+def test_execute_cluster(network_with_mux, switch_states, output):
+    """Test if compiled clusters give the same output as individual gates."""
+    network = network_with_mux
+    devices = network.devices
+    names = devices.names
+    [SW_A, SW_B, SW_S, AND1, OR1] = names.lookup(
+        ["SwA", "SwB", "SwS", "And1", "Or1"])
+
+    network.compile_clusters()
+    for switch_id, state in zip([SW_A, SW_B, SW_S], switch_states):
+        devices.set_switch(switch_id, state)
+    assert network.execute_network()
+    assert network.get_output_signal(OR1, None) == eval("devices." + output)
+
+    # Interior outputs are restored when the clusters are discarded
+    network.clear_clusters()
+    expected = devices.HIGH if switch_states[0] and not switch_states[2] \
+        else devices.LOW
+    assert network.get_output_signal(AND1, None) == expected
+
+
+def test_execute_cluster_transitions(network_with_mux):
+    """Test if the cluster output passes through RISING and FALLING."""
+    network = network_with_mux
+    devices = network.devices
+    names = devices.names
+    [SW_A, OR1] = names.lookup(["SwA", "Or1"])
+
+    network.compile_clusters()
+    network.execute_network()
+    [cluster] = network.clusters
+
+    devices.set_switch(SW_A, devices.HIGH)
+    network.execute_switch(SW_A)
+    assert network.execute_cluster(cluster)
+    assert network.get_output_signal(OR1, None) == devices.RISING
+    assert network.execute_cluster(cluster)
+    assert network.get_output_signal(OR1, None) == devices.HIGH
+
+    devices.set_switch(SW_A, devices.LOW)
+    network.execute_switch(SW_A)
+    assert network.execute_cluster(cluster)
+    assert network.get_output_signal(OR1, None) == devices.FALLING
+
+
+def make_random_logic(seed):
+    """Return a network and monitors for random combinational logic.
+
+    Layers of gates are driven by switches, a clock and a D-type, and every
+    gate whose output does not drive another gate is monitored.
+    """
+    random.seed(seed)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [CLK, D1] = names.lookup(["Clk", "D1"])
+    devices.make_device(CLK, devices.CLOCK, 3)
+    devices.make_device(D1, devices.D_TYPE)
+    signals = [(CLK, None), (D1, devices.Q_ID), (D1, devices.QBAR_ID)]
+    for number in range(4):
+        [SW_ID] = names.lookup(["Sw%d" % number])
+        devices.make_device(SW_ID, devices.SWITCH, random.randint(0, 1))
+        signals.append((SW_ID, None))
+    for input_id in [devices.SET_ID, devices.CLEAR_ID]:
+        network.make_connection(signals[3][0], None, D1, input_id)
+    network.make_connection(CLK, None, D1, devices.CLK_ID)
+
+    driving = set()  # gates whose output drives another gate
+    gate_kinds = [devices.AND, devices.OR, devices.NAND, devices.NOR,
+                  devices.XOR]
+    for number in range(40):
+        [GATE_ID] = names.lookup(["G%d" % number])
+        device_kind = random.choice(gate_kinds)
+        if device_kind == devices.XOR:
+            devices.make_device(GATE_ID, device_kind)
+            input_count = 2
+        else:
+            input_count = random.randint(1, 3)
+            devices.make_device(GATE_ID, device_kind, input_count)
+        input_ids = devices.get_indexed_port_ids("I", input_count + 1)[1:]
+        for input_id in input_ids:
+            source = random.choice(signals[-12:])
+            network.make_connection(*source, GATE_ID, input_id)
+            driving.add(source)
+        signals.append((GATE_ID, None))
+    network.make_connection(*signals[-1], D1, devices.DATA_ID)
+    for signal in signals[7:]:
+        if signal not in driving:
+            monitors.make_monitor(*signal)
+    monitors.make_monitor(D1, devices.Q_ID)
+    return [network, monitors]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_clusters_keep_traces(seed):
+    """Test if compiled clusters leave the monitored traces unchanged."""
+    traces = []
+    for use_clusters in [False, True]:
+        [network, monitors] = make_random_logic(seed)
+        devices = network.devices
+        if use_clusters:
+            assert network.compile_clusters(monitors.monitors_dictionary)
+        switch_ids = devices.find_devices(devices.SWITCH)
+        random.seed(seed)
+        for _ in range(10):
+            assert network.run_cycles(8, monitors) == 8
+            devices.set_switch(random.choice(switch_ids),
+                               random.randint(0, 1))
+        traces.append(monitors.monitors_dictionary)
+    assert traces[0] == traces[1]
+
+
+def test_find_components(network_with_mux):
+    """Test if find_components returns the disconnected parts of a network."""
+    network = network_with_mux
+    devices = network.devices
+    names = devices.names
+    [SW_A, SW_B, SW_S, NOT1, AND1, AND2, OR1, SW_C, SW_D, XOR1, I1,
+     I2] = names.lookup(["SwA", "SwB", "SwS", "Not1", "And1", "And2", "Or1",
+                         "SwC", "SwD", "Xor1", "I1", "I2"])
+
+    assert network.find_components() == [[SW_A, SW_B, SW_S, NOT1, AND1,
+                                           AND2, OR1]]
+
+    # Add a separate XOR circuit and an unconnected switch
+    devices.make_device(SW_C, devices.SWITCH, 0)
+    devices.make_device(SW_D, devices.SWITCH, 0)
+    devices.make_device(XOR1, devices.XOR)
+    network.make_connection(SW_C, None, XOR1, I1)
+    network.make_connection(SW_B, None, XOR1, I2)
+
+    assert network.find_components() == [
+        [SW_A, SW_B, SW_S, NOT1, AND1, AND2, OR1, SW_C, XOR1], [SW_D]]
+
+
+def make_slow_counter():
+    """Return a network and monitors for a slow clock divided by a D-type.
+
+    The divided clock is XORed with a siggen.
+    """
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [CLK, D1, SG, XOR1, SW1, I1, I2] = names.lookup(["Clk", "D1", "Sg", "Xor1",
+                                                     "Sw1", "I1", "I2"])
+    devices.make_device(CLK, devices.CLOCK, 7)
+    devices.make_device(D1, devices.D_TYPE)
+    devices.make_device(SG, devices.SIGGEN, "___-----" + "_" * 30)
+    devices.make_device(XOR1, devices.XOR)
+    devices.make_device(SW1, devices.SWITCH, 0)
+    network.make_connection(CLK, None, D1, devices.CLK_ID)
+    network.make_connection(D1, devices.QBAR_ID, D1, devices.DATA_ID)
+    network.make_connection(SW1, None, D1, devices.SET_ID)
+    network.make_connection(SW1, None, D1, devices.CLEAR_ID)
+    network.make_connection(D1, devices.Q_ID, XOR1, I1)
+    network.make_connection(SG, None, XOR1, I2)
+    for signal in [(CLK, None), (D1, devices.Q_ID), (SG, None),
+                   (XOR1, None)]:
+        monitors.make_monitor(*signal)
+    return [network, monitors]
+
+
+def test_run_cycles():
+    """Test if run_cycles skips quiet cycles without changing the traces."""
+    random.seed(5)
+    [network, monitors] = make_slow_counter()
+    for _ in range(200):
+        assert network.execute_network()
+        monitors.record_signals()
+    expected = monitors.monitors_dictionary
+
+    random.seed(5)
+    [network, monitors] = make_slow_counter()
+    executed = []
+
+    def execute():
+        executed.append(True)
+        return network.execute_network()
+    assert network.run_cycles(150, monitors, execute) == 150
+    assert network.run_cycles(50, monitors, execute) == 50
+    assert monitors.monitors_dictionary == expected
+    assert len(executed) < 100
+
+
+def test_run_cycles_period():
+    """Test if run_cycles repeats the traces of a periodic network."""
+    random.seed(3)
+    [network, monitors] = make_slow_counter()
+    for _ in range(5000):
+        assert network.execute_network()
+        monitors.record_signals()
+    expected = monitors.monitors_dictionary
+    state = network.get_state()
+
+    random.seed(3)
+    [network, monitors] = make_slow_counter()
+    network.detect_period = True
+    executed = []
+
+    def execute():
+        executed.append(True)
+        return network.execute_network()
+    assert network.run_cycles(5000, monitors, execute) == 5000
+    assert monitors.monitors_dictionary == expected
+    assert network.get_state() == state
+    assert len(executed) < 1000
+
+
+@pytest.mark.parametrize("detect_period", [False, True])
+def test_run_cycles_large_ram(detect_period):
+    """Test if quiet cycles are skipped without copying a large RAM."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [CLK, SW1, RAM1, Q0] = names.lookup(["Clk", "Sw1", "Ram1", "Q0"])
+    devices.make_device(CLK, devices.CLOCK, 50)
+    devices.make_device(SW1, devices.SWITCH, 1)
+    devices.make_device(RAM1, devices.RAM, (20, 64))  # 8 MB
+    ram = devices.get_device(RAM1)
+    for input_id in ram.inputs:
+        if input_id == devices.CLK_ID:
+            network.make_connection(CLK, None, RAM1, input_id)
+        else:
+            network.make_connection(SW1, None, RAM1, input_id)
+    monitors.make_monitor(RAM1, Q0)
+    network.detect_period = detect_period
+    executed = []
+
+    def execute():
+        executed.append(True)
+        return network.execute_network()
+    tracemalloc.start()
+    assert network.run_cycles(1000, monitors, execute) == 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < len(ram.memory) // 10
+    assert ram.memory_writes == 1  # the same word is written on every edge
+    assert len(executed) < 100
+
+
+def make_shift_register():
+    """Return a network and monitors for a slowly clocked shift register."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [CLK, SG, SW1] = names.lookup(["Clk", "Sg", "Sw1"])
+    devices.make_device(CLK, devices.CLOCK, 10)
+    devices.make_device(SG, devices.SIGGEN, "-_--__---___")
+    devices.make_device(SW1, devices.SWITCH, 0)
+    data = (SG, None)
+    for name in ["D1", "D2", "D3", "D4"]:
+        [D_ID] = names.lookup([name])
+        devices.make_device(D_ID, devices.D_TYPE)
+        network.make_connection(CLK, None, D_ID, devices.CLK_ID)
+        network.make_connection(*data, D_ID, devices.DATA_ID)
+        network.make_connection(SW1, None, D_ID, devices.SET_ID)
+        network.make_connection(SW1, None, D_ID, devices.CLEAR_ID)
+        data = (D_ID, devices.Q_ID)
+        monitors.make_monitor(*data)
+    return [network, monitors]
+
+
+def test_execute_d_types(monkeypatch):
+    """Test if D-types are only executed when they may change."""
+    def run(network, monitors):
+        executed = []
+        execute_d_type = network.execute_d_type
+
+        def count(device_id):
+            executed.append(device_id)
+            return execute_d_type(device_id)
+        monkeypatch.setattr(network, "execute_d_type", count)
+        for _ in range(100):
+            assert network.execute_network()
+            monitors.record_signals()
+        return len(executed)
+
+    random.seed(7)
+    [network, monitors] = make_shift_register()
+    monkeypatch.setattr(network, "execute_d_types", lambda d_type_sources: all(
+        network.execute_d_type(sources[0].device_id)
+        for sources in d_type_sources))
+    all_executed = run(network, monitors)
+    expected = monitors.monitors_dictionary
+
+    random.seed(7)
+    [network, monitors] = make_shift_register()
+    assert run(network, monitors) < all_executed // 4
+    assert monitors.monitors_dictionary == expected
+
+    # An unconnected input is still reported
+    [D5_ID] = network.names.lookup(["D5"])
+    network.devices.make_device(D5_ID, network.devices.D_TYPE)
+    assert not network.execute_network()
+
+
+@pytest.mark.parametrize("device_kind, data, states", [
+    ("COUNTER", [0] * 9, [1, 2, 3, 4, 5, 6, 7, 0, 1]),
+    ("SHIFTREG", [1, 0, 1, 1, 1, 0, 0, 0], [1, 2, 5, 3, 7, 6, 4, 0]),
+    ("REGISTER", [5, 5, 2, 7, 0], [5, 5, 2, 7, 0]),
+])
+def test_execute_register(new_network, device_kind, data, states):
+    """Test if registers take one step on each rising clock edge."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+    [REG_ID, CLK_ID, CLEAR_ID, kind] = names.lookup(["Reg1", "Clk1",
+                                                     "Clear1", device_kind])
+    data_ids = names.lookup(["Data0", "Data1", "Data2"])
+    devices.make_device(REG_ID, kind, 3)
+    for switch_id in [CLK_ID, CLEAR_ID] + data_ids:
+        devices.make_device(switch_id, devices.SWITCH, 0)
+    network.make_connection(REG_ID, devices.CLK_ID, CLK_ID, None)
+    network.make_connection(REG_ID, devices.CLEAR_ID, CLEAR_ID, None)
+    if kind == devices.SHIFTREG:
+        network.make_connection(REG_ID, devices.DATA_ID, data_ids[0], None)
+    elif kind == devices.REGISTER:
+        for input_id, switch_id in zip(names.lookup(["D0", "D1", "D2"]),
+                                       data_ids):
+            network.make_connection(REG_ID, input_id, switch_id, None)
+    register = devices.get_device(REG_ID)
+
+    def get_value():
+        """Return the value shown by the register outputs."""
+        return sum((signal == devices.HIGH) << bit for bit, signal
+                   in enumerate(register.outputs.values()))
+
+    devices.set_switch(CLEAR_ID, devices.HIGH)
+    assert network.execute_network()
+    assert register.register_state == 0 and get_value() == 0
+    devices.set_switch(CLEAR_ID, devices.LOW)
+    values = []
+    for value in data:
+        for bit, switch_id in enumerate(data_ids):
+            devices.set_switch(switch_id, (value >> bit) & 1)
+        assert network.execute_network()
+        devices.set_switch(CLK_ID, devices.HIGH)
+        assert network.execute_network()  # one rising edge
+        devices.set_switch(CLK_ID, devices.LOW)
+        assert network.execute_network()
+        values.append(get_value())
+    assert values == states
+
+
+def test_execute_memory(new_network, tmp_path):
+    """Test if ROMs read and RAMs write and read words at an address."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+    path = tmp_path / "image.bin"
+    path.write_bytes(bytes([0x34, 0x12, 0xff, 0x0f]))  # two 12 bit words
+    [ROM_ID, RAM_ID, CLK_ID, WE_ID] = names.lookup(["Rom1", "Ram1", "Clk1",
+                                                    "We1"])
+    address_ids = names.lookup(["Addr0", "Addr1"])
+    data_ids = names.lookup(["Data" + str(bit) for bit in range(12)])
+    devices.make_device(ROM_ID, devices.ROM, (RomImage(str(path)), 2, 12))
+    devices.make_device(RAM_ID, devices.RAM, (2, 12))
+    for switch_id in [CLK_ID, WE_ID] + address_ids + data_ids:
+        devices.make_device(switch_id, devices.SWITCH, 0)
+    for device_id in [ROM_ID, RAM_ID]:
+        for input_id, switch_id in zip(names.lookup(["A0", "A1"]),
+                                       address_ids):
+            network.make_connection(device_id, input_id, switch_id, None)
+    for input_id, switch_id in zip(names.lookup(
+            ["D" + str(bit) for bit in range(12)]), data_ids):
+        network.make_connection(RAM_ID, input_id, switch_id, None)
+    network.make_connection(RAM_ID, devices.WE_ID, WE_ID, None)
+    network.make_connection(RAM_ID, devices.CLK_ID, CLK_ID, None)
+
+    def get_word(device_id):
+        """Return the word shown by the device outputs."""
+        outputs = devices.get_device(device_id).outputs.values()
+        return sum((signal == devices.HIGH) << bit
+                   for bit, signal in enumerate(outputs))
+
+    def set_switches(switch_ids, value):
+        """Set the switches to the bits of value."""
+        for bit, switch_id in enumerate(switch_ids):
+            devices.set_switch(switch_id, (value >> bit) & 1)
+
+    def clock():
+        """Execute the network for a cycle with a rising edge of CLK."""
+        devices.set_switch(CLK_ID, devices.HIGH)
+        assert network.execute_network()
+        devices.set_switch(CLK_ID, devices.LOW)
+        assert network.execute_network()
+
+    # The ROM reads the image, and zeros past its end
+    for address, word in enumerate([0x234, 0xfff, 0, 0]):
+        set_switches(address_ids, address)
+        assert network.execute_network()
+        assert get_word(ROM_ID) == word
+
+    # The RAM only writes while WE is HIGH
+    set_switches(address_ids, 2)
+    set_switches(data_ids, 0xabc)
+    clock()
+    assert get_word(RAM_ID) == 0
+    devices.set_switch(WE_ID, devices.HIGH)
+    assert network.execute_network()  # inputs settle before the edge
+    clock()
+    assert get_word(RAM_ID) == 0xabc
+    # Writes are counted only if they change the contents
+    assert devices.get_device(RAM_ID).memory_writes == 1
+    clock()
+    assert devices.get_device(RAM_ID).memory_writes == 1
+    devices.set_switch(WE_ID, devices.LOW)
+    set_switches(address_ids, 1)
+    assert network.execute_network()
+    assert get_word(RAM_ID) == 0
+    set_switches(address_ids, 2)
+    assert network.execute_network()
+    assert get_word(RAM_ID) == 0xabc
+    assert devices.get_device(RAM_ID).memory == bytearray(
+        [0, 0, 0, 0, 0xbc, 0x0a, 0, 0])
@@ -1,4 +1,6 @@
 """Test the parse module."""
+import time
+
 import pytest
 
 from names import Names
@@ -1561,3 +1563,164 @@ def test_empty_file(empty_text_parser, capsys):
     line1 = "Error: Cannot parse an empty text file\n"
     line2 = "Total of 1 error detected\n"
     assert captured.out == line1 + line2
+
+
+@pytest.mark.parametrize("waveform, switching_points", [
+    ('"stimulus.txt"', [3, 5, 8, 10]),
+    ("[-3_2]2", [3, 5, 8, 10]),
+    ('"missing.txt"', None),
+    ("[-3_2", None),
+])
+def test_siggen_waveforms(tmp_path, capsys, waveform, switching_points):
+    """Test that SIGGEN waveforms may be compact or read from a file."""
+    (tmp_path / "stimulus.txt").write_text("---__\n---__\n")
+    path = tmp_path / "siggen.txt"
+    path.write_text("DEVICES {\nsig = SIGGEN (waveform:%s);\n}\n"
+                    "CONNECT {\n}\nMONITOR {\nsig;\n}\nEND\n" % waveform)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    parser = Parser(names, devices, network, monitors,
+                    Scanner(str(path), names))
+    assert parser.parse_network() == (switching_points is not None)
+    if switching_points is None:
+        assert "Line 2: Semantic Error" in capsys.readouterr().out
+    else:
+        [SIG_ID] = names.lookup(["sig"])
+        assert list(devices.get_device(SIG_ID).siggen_waveform) == (
+            switching_points)
+
+
+def test_siggen_waveform_repeats(tmp_path):
+    """Test that a huge repeat count is parsed without expanding it."""
+    path = tmp_path / "siggen.txt"
+    path.write_text("DEVICES {\nsig = SIGGEN (waveform:[-_]1000000000);\n}\n"
+                    "CONNECT {\n}\nMONITOR {\nsig;\n}\nEND\n")
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    parser = Parser(names, devices, network, monitors,
+                    Scanner(str(path), names))
+    start = time.perf_counter()
+    assert parser.parse_network()
+    assert time.perf_counter() - start < 1
+    [SIG_ID] = names.lookup(["sig"])
+    assert devices.get_device(SIG_ID).siggen_period == 2000000000
+    for _ in range(3):
+        assert network.execute_network()
+        monitors.record_signals()
+    assert monitors.monitors_dictionary[(SIG_ID, None)] == [
+        devices.HIGH, devices.LOW, devices.HIGH]
+
+
+@pytest.mark.parametrize("device, port, error", [
+    ("COUNTER (width:4)", "Q3", None),
+    ("SHIFTREG (width:64)", "Q63", None),
+    ("COUNTER (width:4)", "Q4", "Semantic Error: Expected an output signal"),
+    ("COUNTER (width:65)", "Q0", "Syntax Error: Invalid device property"),
+    ("COUNTER (cycle:4)", "Q0", "Syntax Error: Expected 'width'"),
+])
+def test_registers(tmp_path, capsys, device, port, error):
+    """Test that registers and their indexed ports can be defined."""
+    path = tmp_path / "counter.txt"
+    data_input = "sw = count.DATA;\n" if "SHIFTREG" in device else ""
+    path.write_text("DEVICES {\ncount = %s;\nclk = CLOCK (cycle:1);\n"
+                    "sw = SWITCH (initial_state:0);\n}\nCONNECT {\n"
+                    "clk = count.CLK;\nsw = count.CLEAR;\n%s}\n"
+                    "MONITOR {\ncount.%s;\n}\nEND\n"
+                    % (device, data_input, port))
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    parser = Parser(names, devices, network, monitors,
+                    Scanner(str(path), names))
+    assert parser.parse_network() == (error is None)
+    if error is not None:
+        assert error in capsys.readouterr().out
+    else:
+        assert network.execute_network()
+
+
+@pytest.mark.parametrize("device, error", [
+    ('ROM (file:"image.bin", address_bits:1, data_bits:8)', None),
+    ("RAM (address_bits:1, data_bits:8)", None),
+    ('ROM (file:"missing.bin", address_bits:1, data_bits:8)',
+     "Semantic Error: Memory file could not be read"),
+    ("ROM (file:image.bin, address_bits:1, data_bits:8)",
+     "Syntax Error: Expected a file path in double quotes"),
+    ("ROM (address_bits:1, data_bits:8)",
+     "Syntax Error: Expected 'file', 'address_bits' or 'data_bits'"),
+    ("RAM (address_bits:1 data_bits:8)", "Syntax Error: Expected a ',' sign"),
+    ("RAM (data_bits:8, address_bits:1)",
+     "Syntax Error: Expected 'file', 'address_bits' or 'data_bits'"),
+    ("RAM (address_bits:25, data_bits:8)",
+     "Syntax Error: Invalid device property"),
+])
+def test_memories(tmp_path, capsys, device, error):
+    """Test that ROM and RAM devices can be defined and connected."""
+    (tmp_path / "image.bin").write_bytes(bytes([5, 6]))
+    path = tmp_path / "memory.txt"
+    if device.startswith("RAM"):
+        inputs = "sw = mem.WE;\nsw = mem.CLK;\n" + "".join(
+            "sw = mem.D%d;\n" % bit for bit in range(8))
+    else:
+        inputs = ""
+    path.write_text("DEVICES {\nmem = %s;\nsw = SWITCH (initial_state:1);\n"
+                    "}\nCONNECT {\nsw = mem.A0;\n%s}\nMONITOR {\nmem.Q0;\n"
+                    "mem.Q7;\n}\nEND\n" % (device, inputs))
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    parser = Parser(names, devices, network, monitors,
+                    Scanner(str(path), names))
+    assert parser.parse_network() == (error is None)
+    if error is not None:
+        assert error in capsys.readouterr().out
+    elif device.startswith("ROM"):
+        assert network.execute_network()
+        [MEM_ID, Q1_ID, Q2_ID] = names.lookup(["mem", "Q1", "Q2"])
+        outputs = devices.get_device(MEM_ID).outputs
+        assert [outputs[Q1_ID], outputs[Q2_ID]] == [devices.HIGH,
+                                                    devices.HIGH]  # word 6
+
+
+@pytest.mark.parametrize("device, error", [
+    ("XOR", None),
+    ("XNOR", None),
+    ("XOR (number_of_inputs:20)", None),
+    ("AND (number_of_inputs:20)", None),
+    ("XNOR (number_of_inputs:0)", "Syntax Error: Invalid device property"),
+    ("XOR (cycle:20)", "Syntax Error: Expected 'number_of_inputs'"),
+    ("XOR (number_of_inputs:20", "Syntax Error: Expected a ')' sign"),
+    ("NOR (number_of_inputs:1025)", "Syntax Error: Invalid device property"),
+])
+def test_wide_gates(tmp_path, capsys, device, error):
+    """Test that gates of any width and their input ports can be defined."""
+    path = tmp_path / "gate.txt"
+    width = 20 if "20" in device else 2
+    inputs = "".join("sw = gate.I%d;\n" % index
+                     for index in range(1, width + 1))
+    path.write_text("DEVICES {\ngate = %s;\nsw = SWITCH (initial_state:1);\n"
+                    "}\nCONNECT {\n%s}\nMONITOR {\ngate;\n}\nEND\n"
+                    % (device, inputs))
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    parser = Parser(names, devices, network, monitors,
+                    Scanner(str(path), names))
+    assert parser.parse_network() == (error is None)
+    if error is not None:
+        assert error in capsys.readouterr().out
+    else:
+        assert network.execute_network()
+        [GATE_ID] = names.lookup(["gate"])
+        # All inputs are HIGH, and there is an even number of them
+        if device.startswith("XOR"):
+            assert network.get_output_signal(GATE_ID, None) == devices.LOW
+        else:
+            assert network.get_output_signal(GATE_ID, None) == devices.HIGH
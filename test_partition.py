@@ -0,0 +1,159 @@
+"""Test the partition module."""
+import time
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from partition import ParallelSimulator
+
+
+@pytest.fixture
+def monitors_with_circuits():
+    """Return a Monitors class instance with two independent circuits.
+
+    Each circuit is a siggen and a switch driving an AND gate.
+    """
+    new_names = Names()
+    new_devices = Devices(new_names)
+    new_network = Network(new_names, new_devices)
+    new_monitors = Monitors(new_names, new_devices, new_network)
+
+    [SG1, SW1, AND1, SG2, SW2, AND2, I1, I2] = new_names.lookup(
+        ["Sg1", "Sw1", "And1", "Sg2", "Sw2", "And2", "I1", "I2"])
+
+    for siggen_id, switch_id, gate_id, waveform in [
+            (SG1, SW1, AND1, "--__-"), (SG2, SW2, AND2, "-___")]:
+        new_devices.make_device(siggen_id, new_devices.SIGGEN, waveform)
+        new_devices.make_device(switch_id, new_devices.SWITCH, 1)
+        new_devices.make_device(gate_id, new_devices.AND, 2)
+        new_network.make_connection(siggen_id, None, gate_id, I1)
+        new_network.make_connection(switch_id, None, gate_id, I2)
+        new_monitors.make_monitor(gate_id, None)
+
+    return new_monitors
+
+
+def run_in_process(monitors, cycles, switches):
+    """Run the network in this process, as the command line interface."""
+    for switch_id, signal in switches:
+        monitors.devices.set_switch(switch_id, signal)
+    for _ in range(cycles):
+        assert monitors.network.execute_network()
+        monitors.record_signals()
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_run_network(monitors_with_circuits, workers):
+    """Test if parallel runs give the same traces as a single process."""
+    monitors = monitors_with_circuits
+    names = monitors.names
+    devices = monitors.devices
+    network = monitors.network
+    [SW1, SW2, AND1, SG2] = names.lookup(["Sw1", "Sw2", "And1", "Sg2"])
+
+    simulator = ParallelSimulator(names, devices, network, monitors, workers)
+    assert simulator.start() == min(workers, 2)
+    try:
+        assert simulator.run_network(7) == 7
+        assert simulator.set_switch(SW2, 0)
+        monitors.make_monitor(SG2, None, 7)
+        assert simulator.run_network(5) == 5
+    finally:
+        simulator.stop()
+    parallel_traces = dict(monitors.monitors_dictionary)
+    siggen_counter = devices.get_device(SG2).siggen_counter
+
+    # Repeat the same runs in a single process
+    devices.set_switch(SW2, 1)
+    devices.cold_startup()
+    monitors.remove_monitor(SG2, None)
+    monitors.reset_monitors()
+    run_in_process(monitors, 7, [])
+    monitors.make_monitor(SG2, None, 7)
+    run_in_process(monitors, 5, [(SW2, 0)])
+
+    assert parallel_traces == monitors.monitors_dictionary
+    assert devices.get_device(SG2).siggen_counter == siggen_counter
+    assert not simulator.set_switch(AND1, 0)
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_run_network_oscillating(monitors_with_circuits, workers):
+    """Test if all devices stop at the first cycle that oscillates."""
+    monitors = monitors_with_circuits
+    names = monitors.names
+    devices = monitors.devices
+    network = monitors.network
+    [SG3, NAND3, I1, I2, RAM4, SG4, SG5, SW4] = names.lookup(
+        ["Sg3", "Nand3", "I1", "I2", "Ram4", "Sg4", "Sg5", "Sw4"])
+
+    # A NAND gate fed back to itself oscillates once the siggen is HIGH
+    devices.make_device(SG3, devices.SIGGEN, "__-")
+    devices.make_device(NAND3, devices.NAND, 2)
+    network.make_connection(SG3, None, NAND3, I1)
+    network.make_connection(NAND3, None, NAND3, I2)
+
+    # A RAM written on every other cycle, with alternating data
+    devices.make_device(RAM4, devices.RAM, (1, 1))
+    devices.make_device(SG4, devices.SIGGEN, "_-")
+    devices.make_device(SG5, devices.SIGGEN, "--__")
+    devices.make_device(SW4, devices.SWITCH, 1)
+    [A0, D0] = names.lookup(["A0", "D0"])
+    for source_id, input_id in [(SG4, devices.CLK_ID), (SG5, D0),
+                                (SW4, devices.WE_ID), (SW4, A0)]:
+        network.make_connection(source_id, None, RAM4, input_id)
+
+    simulator = ParallelSimulator(names, devices, network, monitors, workers)
+    assert simulator.start() == min(workers, 4)
+    try:
+        assert simulator.run_network(8) == 2
+    finally:
+        simulator.stop()
+    parallel_traces = dict(monitors.monitors_dictionary)
+    parallel_states = [(dict(device.outputs), device.siggen_counter)
+                       for device in devices.devices_list]
+    ram = devices.get_device(RAM4)
+    parallel_memory = (bytes(ram.memory), ram.memory_writes)
+
+    # The other circuits are left after the cycle that failed
+    devices.cold_startup()
+    startup_writes = ram.memory_writes
+    monitors.reset_monitors()
+    for _ in range(8):
+        if not network.execute_network():
+            break
+        monitors.record_signals()
+    assert parallel_traces == monitors.monitors_dictionary
+    assert parallel_states == [(dict(device.outputs), device.siggen_counter)
+                               for device in devices.devices_list]
+    assert parallel_memory == (bytes(ram.memory),
+                               ram.memory_writes - startup_writes)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_network_detect_period(monitors_with_circuits, workers):
+    """Test if workers repeat periodic behaviour instead of simulating it."""
+    monitors = monitors_with_circuits
+    names = monitors.names
+    devices = monitors.devices
+    network = monitors.network
+    network.detect_period = True
+    cycles = 1000000
+
+    simulator = ParallelSimulator(names, devices, network, monitors, workers)
+    simulator.start()
+    try:
+        start = time.perf_counter()
+        assert simulator.run_network(cycles) == cycles
+        assert time.perf_counter() - start < 2
+    finally:
+        simulator.stop()
+    parallel_traces = dict(monitors.monitors_dictionary)
+
+    devices.cold_startup()
+    monitors.reset_monitors()
+    assert network.run_cycles(cycles, monitors) == cycles
+    assert parallel_traces == monitors.monitors_dictionary
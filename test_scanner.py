@@ -43,6 +43,13 @@ def test_initialisation(default_symbol, new_symbol):
     assert isinstance(new_symbol.line_position, int)
 
 
+def test_symbol_slots(new_symbol):
+    """Test if symbols keep their attributes in slots only."""
+    assert not hasattr(new_symbol, "__dict__")
+    with pytest.raises(AttributeError):
+        new_symbol.value = 1
+
+
 # Suite of unit tests for the Scanner class.
 @pytest.fixture
 def default_scanner():
@@ -176,7 +183,7 @@ def test_scanner_init_raises_exceptions(default_names, path):
 def test_scanner_initialisation(default_scanner):
     """Test if attributes of the Scanner class returns the expected output."""
     # Check list_symbol_types was defined correctly.
-    assert default_scanner.list_symbol_types == range(15)
+    assert default_scanner.list_symbol_types == range(16)
     # Check that each symbol in list_symbol_types is an int.
     for symbol in default_scanner.list_symbol_types:
         assert isinstance(symbol, int)
@@ -558,9 +565,9 @@ def test_get_symbol():
     assert new_symbol.line_number == 4
     assert new_symbol.line_position == 1
     assert isinstance(new_symbol.type, int)
-    # I2
+    # I2, a name as gate input ports are not keywords
     new_symbol = new_scanner.get_symbol()
-    assert new_symbol.type == new_scanner.KEYWORD
+    assert new_symbol.type == new_scanner.NAME
     assert [new_symbol.id] == new_scanner.names.lookup(["I2"])
     assert new_symbol.line_number == 4
     assert new_symbol.line_position == 3
@@ -0,0 +1,151 @@
+"""Test the server module."""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from server import SimulationServer
+from test_hotreload import write_adder
+
+
+async def exchange(server, requests):
+    """Send requests to a server over TCP and return all its replies."""
+    tcp_server = await asyncio.start_server(server.handle_client,
+                                            "127.0.0.1", 0)
+    port = tcp_server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    replies = []
+    for request in requests:
+        writer.write((json.dumps(request) + "\n").encode("utf-8"))
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        replies.append(reply)
+        while "samples" in reply:  # streamed samples before the reply
+            reply = json.loads(await reader.readline())
+            replies.append(reply)
+    writer.close()
+    tcp_server.close()
+    await tcp_server.wait_closed()
+    return replies
+
+
+@pytest.fixture
+def new_server():
+    """Return a SimulationServer class instance streaming every 2 cycles."""
+    return SimulationServer(chunk_size=2)
+
+
+def test_load_network(new_server):
+    """Test if parsed networks are cached and copied for each session."""
+    path = "definition_files/single_bit_adder.txt"
+    [session, errors] = new_server.load_network(path)
+    assert errors == []
+    [other_session, errors] = new_server.load_network(path)
+    assert len(new_server.netlists) == 1
+    assert session.devices is not other_session.devices
+
+    [SW1_ID] = session.names.lookup(["SW1"])
+    session.devices.set_switch(SW1_ID, 0)
+    assert other_session.devices.get_device(SW1_ID).switch_state == 1
+
+    [session, errors] = new_server.load_network("no_such_file.txt")
+    assert session is None
+    assert errors == ["File does not exist."]
+
+
+def test_simulation_requests(new_server):
+    """Test if requests mirror the command line user interface."""
+    path = "definition_files/single_bit_adder.txt"
+    replies = asyncio.run(exchange(new_server, [
+        {"command": "run", "cycles": 1},
+        {"id": 1, "command": "load", "path": path},
+        {"command": "switch", "name": "SW2", "state": 0},
+        {"command": "zap", "signal": "xor1"},
+        {"id": 2, "command": "run", "cycles": 3},
+        {"command": "monitor", "signal": "SW2"},
+        {"command": "switch", "name": "SW2", "state": 1},
+        {"command": "continue", "cycles": 2},
+        {"command": "switch", "name": "xor1", "state": 1},
+        {"command": "fly"}]))
+
+    assert replies[0] == {"ok": False, "error": "No network loaded."}
+    assert replies[1] == {"id": 1, "ok": True, "switches": ["SW1", "SW2"],
+                          "monitors": ["xor1", "and1"],
+                          "signals": ["SW1", "SW2"]}
+    assert replies[2] == {"ok": True}
+    assert replies[3] == {"ok": True}
+
+    # Samples are streamed every two cycles
+    assert replies[4:7] == [
+        {"id": 2, "samples": {"and1": [0, 0]}, "start": 0},
+        {"id": 2, "samples": {"and1": [0]}, "start": 2},
+        {"id": 2, "ok": True, "cycles_completed": 3}]
+    assert replies[7:9] == [{"ok": True}, {"ok": True}]
+    assert replies[9:11] == [
+        {"samples": {"and1": [1, 1], "SW2": [1, 1]}, "start": 3},
+        {"ok": True, "cycles_completed": 5}]
+    assert replies[11] == {"ok": False, "error": "Invalid switch."}
+    assert replies[12] == {"ok": False, "error": "Invalid command."}
+
+
+def test_reload_file(new_server, tmp_path):
+    """Test if sessions follow changes to their definition file."""
+    path = str(tmp_path / "adder.txt")
+    write_adder(path)
+
+    async def edit_and_run():
+        [session, reply] = await new_server.handle_request(
+            None, {"command": "load", "path": path}, None)
+        replies = []
+
+        async def send(message):
+            replies.append(message)
+
+        for edit, command in [
+                ({}, "run"),
+                ({"switch_state": 0, "monitors": "xor1;"}, "continue"),
+                ({"and_input": "SW1 = and1.I2"}, "run"),
+                ({"monitors": "xor1"}, "continue")]:
+            write_adder(path, **edit)
+            [session, reply] = await new_server.handle_request(
+                session, {"command": command, "cycles": 1}, send)
+            replies.append(reply)
+        return replies
+
+    replies = asyncio.run(edit_and_run())
+    assert replies[0:2] == [{"samples": {"xor1": [0], "and1": [1]},
+                             "start": 0},
+                            {"ok": True, "cycles_completed": 1}]
+    # Only the switch and monitors changed: the simulation continues
+    assert replies[2:4] == [{"samples": {"xor1": [1]}, "start": 1},
+                            {"reloaded": "delta", "ok": True,
+                             "cycles_completed": 2}]
+    # The connections changed: the new network replaces the old one
+    assert replies[4]["start"] == 0
+    assert replies[5] == {"reloaded": "full", "ok": True,
+                          "cycles_completed": 1}
+    assert replies[6:] == [{"samples": {"xor1": [0], "and1": [1]},
+                            "start": 1},
+                           {"reloaded": "failed", "ok": True,
+                            "cycles_completed": 2}]
+
+
+def test_load_off_event_loop(new_server, monkeypatch, capsys):
+    """Test if files are parsed off the event loop, without printing."""
+    threads = []
+    load_network = new_server.load_network
+
+    def record_thread(path):
+        threads.append(threading.current_thread())
+        return load_network(path)
+    monkeypatch.setattr(new_server, "load_network", record_thread)
+
+    replies = asyncio.run(exchange(new_server, [
+        {"command": "load", "path": "definition_files/single_bit_adder.txt"},
+        {"command": "load", "path": "no_such_file.txt"}]))
+    assert replies[0]["ok"]
+    assert replies[1] == {"ok": False, "error": "File does not exist."}
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+    assert capsys.readouterr().out == ""
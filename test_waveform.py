@@ -0,0 +1,117 @@
+"""Test the waveform module."""
+import copy
+import pickle
+
+import pytest
+
+from waveform import (Waveform, WaveformFile, parse_waveform, get_period,
+                      get_first_level, iterate_runs, iterate_switching_points)
+
+
+@pytest.fixture
+def write_waveform(tmp_path):
+    """Return a function writing a waveform file and returning its path."""
+    def write(contents, name="stimulus.txt"):
+        path = tmp_path / name
+        path.write_text(contents)
+        return str(path)
+    return write
+
+
+@pytest.mark.parametrize("waveform, runs", [
+    ("-_--", [("-", 1), ("_", 1), ("-", 2)]),
+    ("-3_2", [("-", 3), ("_", 2)]),
+    ("--3", [("-", 4)]),
+    ("[-_]2", [("-", 1), ("_", 1), ("-", 1), ("_", 1)]),
+    ("_[-2[_]2]2", [("_", 1), ("-", 2), ("_", 1), ("_", 1),
+                    ("-", 2), ("_", 1), ("_", 1)]),
+    (b"- _\n-", [("-", 1), ("_", 1), ("-", 1)]),
+])
+def test_parse_waveform(waveform, runs):
+    """Test if waveforms are parsed into the expected runs."""
+    tree = parse_waveform(waveform)
+    assert list(iterate_runs(tree)) == runs
+    assert get_period(tree) == sum(length for level, length in runs)
+    assert get_first_level(tree) == runs[0][0]
+
+
+@pytest.mark.parametrize("waveform", [
+    "", " ", "3", "-[", "-]", "[]", "-0", "-2 3", "[2-]", "-x", "-é",
+])
+def test_parse_waveform_raises_exceptions(waveform):
+    """Test if invalid waveforms raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_waveform(waveform)
+
+
+def test_iterate_switching_points():
+    """Test if runs of the same level are merged into one."""
+    runs = [("-", 2), ("-", 1), ("_", 4), ("-", 1), ("-", 1)]
+    assert list(iterate_switching_points(runs)) == [3, 7, 9]
+
+
+def test_waveform_repeats():
+    """Test if repeats are only expanded as far as they are indexed."""
+    waveform = Waveform("[-_]1000000000")
+    assert waveform.first_level == "-"
+    assert waveform[-1] == 2000000000
+    assert waveform.points == []  # nothing decoded yet
+    assert waveform[2999] == 3000
+    assert len(waveform.points) < 10000
+
+
+def test_waveform_compare():
+    """Test if waveforms compare by their trees and with lists."""
+    waveform = Waveform("-2_")
+    assert waveform == Waveform("--_") and waveform != Waveform("-_")
+    assert waveform == [2, 3] and waveform != [2]
+    assert copy.deepcopy(waveform) is waveform
+    unpickled = pickle.loads(pickle.dumps(waveform))
+    assert unpickled == waveform and unpickled.points == []
+
+
+@pytest.mark.parametrize("contents, points", [
+    ("--__\n_-\n", [2, 5, 6]),
+    ("[--__]2\n_4", [2, 4, 6, 12]),
+])
+def test_waveform_file(write_waveform, contents, points):
+    """Test if waveform files are decoded lazily into switching points."""
+    waveform = WaveformFile(write_waveform(contents))
+    assert waveform.first_level == "-"
+    assert waveform[-1] == points[-1]
+    assert waveform.points == []  # nothing decoded yet
+    assert waveform[0] == points[0]
+    assert list(waveform) == points
+    assert len(waveform) == len(points)
+    with pytest.raises(IndexError):
+        waveform[len(points)]
+
+
+def test_waveform_file_long(write_waveform):
+    """Test if only the indexed part of a long waveform file is decoded."""
+    waveform = WaveformFile(write_waveform("-_" * 100000))
+    assert waveform[-1] == 200000
+    assert waveform[10] == 11
+    assert len(waveform.points) < 200000
+    assert waveform[199999] == 200000
+
+
+def test_waveform_file_compare(write_waveform):
+    """Test if waveform files compare and copy by their contents."""
+    waveform = WaveformFile(write_waveform("-_-"))
+    same = WaveformFile(write_waveform("-_-", "same.txt"))
+    other = WaveformFile(write_waveform("-__", "other.txt"))
+    assert waveform == same and hash(waveform) == hash(same)
+    assert waveform != other
+    assert copy.deepcopy(waveform) is waveform
+    unpickled = pickle.loads(pickle.dumps(waveform))
+    assert unpickled == waveform and list(unpickled) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("contents", ["", "  \n", "-_x", "[-_"])
+def test_waveform_file_raises_exceptions(write_waveform, contents):
+    """Test if empty or invalid waveform files raise ValueError."""
+    with pytest.raises(ValueError):
+        WaveformFile(write_waveform(contents))
+    with pytest.raises(OSError):
+        WaveformFile(write_waveform(contents) + ".missing")
@@ -7,6 +7,9 @@ Classes:
 --------
 UserInterface - reads and parses user commands.
 """
+import shutil
+
+from hotreload import apply_changes
 
 
 class UserInterface:
@@ -23,6 +26,10 @@ class UserInterface:
     devices: instance of the devices.Devices() class.
     network: instance of the network.Network() class.
     monitors: instance of the monitors.Monitors() class.
+    simulator: optional instance of the partition.ParallelSimulator() class,
+               used to run the simulation in worker processes.
+    watcher: optional instance of the hotreload.FileWatcher() class, whose
+             changes to the definition file are applied before each command.
 
     Public methods:
     ---------------
@@ -63,14 +70,22 @@ class UserInterface:
     run_command(self): Runs the simulation from scratch.
 
     continue_command(self): Continues a previously run simulation.
+
+    display_command(self): Displays the signal traces, wrapped to the width
+                           of the terminal.
+
+    reload_file(self): Applies the changes made to the definition file.
     """
 
-    def __init__(self, names, devices, network, monitors):
+    def __init__(self, names, devices, network, monitors, simulator=None,
+                 watcher=None):
         """Initialise variables."""
         self.names = names
         self.devices = devices
         self.monitors = monitors
         self.network = network
+        self.simulator = simulator
+        self.watcher = watcher
 
         self.cycles_completed = 0  # number of simulation cycles completed
 
@@ -85,6 +100,8 @@ class UserInterface:
         self.get_line()  # get the user entry
         command = self.read_command()  # read the first character
         while command != "q":
+            if self.watcher is not None:
+                self.reload_file()
             if command == "h":
                 self.help_command()
             elif command == "s":
@@ -97,6 +114,8 @@ class UserInterface:
                 self.run_command()
             elif command == "c":
                 self.continue_command()
+            elif command == "d":
+                self.display_command()
             else:
                 print("Invalid command. Enter 'h' for help.")
             self.get_line()  # get the user entry
@@ -203,6 +222,7 @@ class UserInterface:
         print("User commands:")
         print("r N       - run the simulation for N cycles")
         print("c N       - continue the simulation for N cycles")
+        print("d [F N]   - display the traces [for N cycles from cycle F]")
         print("s X N     - set switch X to N (0 or 1)")
         print("m X       - set a monitor on signal X")
         print("z X       - zap the monitor on signal X")
@@ -215,7 +235,13 @@ class UserInterface:
         if switch_id is not None:
             switch_state = self.read_number(0, 1)
             if switch_state is not None:
-                if self.devices.set_switch(switch_id, switch_state):
+                if self.simulator is not None:
+                    switch_set = self.simulator.set_switch(switch_id,
+                                                           switch_state)
+                else:
+                    switch_set = self.devices.set_switch(switch_id,
+                                                         switch_state)
+                if switch_set:
                     print("Successfully set switch.")
                 else:
                     print("Error! Invalid switch.")
@@ -247,12 +273,15 @@ class UserInterface:
 
         Return True if successful.
         """
-        for _ in range(cycles):
-            if self.network.execute_network():
-                self.monitors.record_signals()
-            else:
+        if self.simulator is not None:
+            if self.simulator.run_network(cycles) < cycles:
                 print("Error! Network oscillating.")
                 return False
+            self.monitors.display_signals()
+            return True
+        if self.network.run_cycles(cycles, self.monitors) < cycles:
+            print("Error! Network oscillating.")
+            return False
         self.monitors.display_signals()
         return True
 
@@ -264,7 +293,10 @@ class UserInterface:
         if cycles is not None:  # if the number of cycles provided is valid
             self.monitors.reset_monitors()
             print("".join(["Running for ", str(cycles), " cycles"]))
-            self.devices.cold_startup()
+            if self.simulator is not None:
+                self.simulator.cold_startup()
+            else:
+                self.devices.cold_startup()
             if self.run_network(cycles):
                 self.cycles_completed += cycles
 
@@ -278,3 +310,64 @@ class UserInterface:
                 self.cycles_completed += cycles
                 print(" ".join(["Continuing for", str(cycles), "cycles.",
                                 "Total:", str(self.cycles_completed)]))
+
+    def display_command(self):
+        """Display the signal traces, wrapped to the width of the terminal.
+
+        If a first cycle and a number of cycles are given, only those cycles
+        are displayed.
+        """
+        start = None
+        stop = None
+        if self.line[self.cursor:].strip():  # a cycle window was given
+            start = self.read_number(0, None)
+            if start is None:
+                return
+            cycles = self.read_number(0, None)
+            if cycles is None:
+                return
+            stop = start + cycles
+        width = shutil.get_terminal_size().columns
+        self.monitors.display_signals(start, stop, width)
+
+    def reload_file(self):
+        """Apply the changes made to the definition file since last checked.
+
+        If only monitors or initial switch states changed, they are applied
+        to the running simulation. Otherwise the new network replaces the
+        old one and the simulation starts again.
+        """
+        change = self.watcher.get_change()
+        while change is not None:
+            if change.names is None:
+                print("Error! Definition file has errors, "
+                      "keeping the current network.")
+            elif change.changes is not None:
+                set_switch = self.devices.set_switch
+                if self.simulator is not None:
+                    set_switch = self.simulator.set_switch
+                apply_changes(change.changes, self.names, self.devices,
+                              self.monitors, self.cycles_completed,
+                              set_switch)
+                print("Definition file changed: monitors and switches "
+                      "updated.")
+            else:
+                change.network.detect_period = self.network.detect_period
+                if self.network.use_clusters:
+                    change.network.use_clusters = True
+                    change.network.compile_clusters(
+                        change.monitors.monitors_dictionary)
+                self.names = change.names
+                self.devices = change.devices
+                self.network = change.network
+                self.monitors = change.monitors
+                self.cycles_completed = 0
+                if self.simulator is not None:
+                    self.simulator.stop()
+                    self.simulator.names = change.names
+                    self.simulator.devices = change.devices
+                    self.simulator.network = change.network
+                    self.simulator.monitors = change.monitors
+                    self.simulator.start()
+                print("Definition file changed: network reloaded.")
+            change = self.watcher.get_change()
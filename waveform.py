@@ -0,0 +1,301 @@
+"""Decode SIGGEN waveforms written in a compact repeat syntax.
+
+Used in the Logic Simulator project to read the waveforms of SIGGEN devices,
+given either in the definition file or in a separate waveform file. A
+waveform is a sequence of logic levels, dashes (-) for HIGH and underscores
+(_) for LOW. A level, or a group of levels in square brackets, may be
+followed by a repeat count, so that long stimulus patterns stay short:
+
+    -3_2       is  ---__
+    [-_]3      is  -_-_-_
+    _[-2_]2-   is  _--_--_-
+
+Waveform files use the same syntax, and may also contain white space and
+line breaks, which are ignored.
+
+Classes
+-------
+Waveform - decodes the switching points of a waveform lazily.
+WaveformFile - decodes the switching points of a waveform file lazily.
+
+Functions
+---------
+parse_waveform - parses a waveform into a tree of runs and groups.
+get_period - returns the number of cycles in a parsed waveform.
+get_first_level - returns the first logic level of a parsed waveform.
+iterate_runs - yields the runs of equal levels in a parsed waveform.
+iterate_switching_points - yields the cumulative switching points of runs.
+"""
+import hashlib
+import itertools
+import mmap
+import os
+import re
+
+# Each token is a run of equal levels, a bracket, a repeat count, or any
+# other character that is not white space
+TOKEN = re.compile(rb"(-+|_+)|(\[)|(\])|([0-9]+)|(\S)")
+# Waveforms spelled out literally are decoded without building a tree
+LITERAL = re.compile(rb"[-_\s]+")
+RUN = re.compile(rb"-+|_+")
+SPACE = re.compile(rb"\s+")
+
+
+def parse_waveform(waveform):
+    """Parse a waveform string or bytes-like object into a tree.
+
+    The tree is a list of items, each either a run (level, length) where
+    level is "-" or "_", or a group (items, count) repeated count times.
+    Raise ValueError if the waveform is empty or not in the repeat syntax.
+    """
+    if isinstance(waveform, str):
+        waveform = waveform.encode("ascii")  # UnicodeError is a ValueError
+    groups = [[]]  # the items of each open group, outermost first
+    countable = False  # whether the last item can take a repeat count
+    for match in TOKEN.finditer(waveform):
+        [run, left, right, count, other] = match.groups()
+        items = groups[-1]
+        if run is not None:
+            items.append((chr(run[0]), len(run)))
+            countable = True
+        elif left is not None:
+            groups.append([])
+            countable = False
+        elif right is not None:
+            if len(groups) == 1:
+                raise ValueError("Unmatched ']' in waveform.")
+            group = groups.pop()
+            if not group:
+                raise ValueError("Empty group in waveform.")
+            groups[-1].append((group, 1))
+            countable = True
+        elif count is not None:
+            if not countable:
+                raise ValueError("Repeat count without a level or group.")
+            repeat = int(count)
+            if repeat == 0:
+                raise ValueError("Repeat count must be positive.")
+            [first, length] = items[-1]
+            if isinstance(first, str):  # only the last level is repeated
+                items[-1] = (first, length + repeat - 1)
+            else:
+                items[-1] = (first, repeat)
+            countable = False
+        else:
+            raise ValueError("Invalid character in waveform.")
+    if len(groups) != 1:
+        raise ValueError("Unmatched '[' in waveform.")
+    if not groups[0]:
+        raise ValueError("Empty waveform.")
+    return groups[0]
+
+
+def get_period(tree):
+    """Return the number of cycles in the parsed waveform tree."""
+    period = 0
+    for first, length in tree:
+        if isinstance(first, str):
+            period += length
+        else:
+            period += get_period(first) * length
+    return period
+
+
+def get_first_level(tree):
+    """Return the first logic level, "-" or "_", of the parsed waveform."""
+    first = tree[0][0]
+    while not isinstance(first, str):
+        first = first[0][0]
+    return first
+
+
+def iterate_runs(tree):
+    """Yield (level, length) for the runs of the parsed waveform tree.
+
+    Neighbouring runs may have the same level.
+    """
+    for first, length in tree:
+        if isinstance(first, str):
+            yield (first, length)
+        else:
+            for _ in range(length):
+                yield from iterate_runs(first)
+
+
+def iterate_switching_points(runs):
+    """Yield the cumulative switching points of the (level, length) runs.
+
+    The last switching point is the end of the period.
+    """
+    total = 0
+    level = None
+    for run_level, length in runs:
+        if level is not None and run_level != level:
+            yield total
+        level = run_level
+        total += length
+    yield total
+
+
+class Waveform:
+    """Decode the switching points of a waveform lazily.
+
+    The waveform is parsed once, which also finds its period and first
+    level, and the tree is kept rather than expanded. Switching points are
+    only decoded as far as they are indexed, so a waveform repeated many
+    times costs nothing until the simulation reaches it. Instances are used
+    in place of the list of switching points of a SIGGEN device. They
+    compare equal if their trees are equal, and equal to a list of the same
+    switching points, which decodes them all.
+
+    Parameters
+    ----------
+    waveform: waveform string in the repeat syntax.
+
+    Public methods
+    --------------
+    decode(self, count=None): Decodes switching points until count are
+                              known, or all of them if count is None.
+    """
+
+    # Number of switching points decoded at a time
+    chunk_size = 1024
+
+    def __init__(self, waveform):
+        """Parse the waveform and find its period.
+
+        Raise ValueError if the waveform is empty or not in the repeat
+        syntax.
+        """
+        self.waveform = waveform
+        self.tree = parse_waveform(waveform)
+        self.first_level = get_first_level(self.tree)
+        self.period = get_period(self.tree)
+        self.points = []  # switching points decoded so far
+        self.decoder = iterate_switching_points(iterate_runs(self.tree))
+
+    def decode(self, count=None):
+        """Decode switching points until count are known, or all if None."""
+        while count is None or len(self.points) < count:
+            known = len(self.points)
+            self.points.extend(itertools.islice(self.decoder,
+                                                self.chunk_size))
+            if len(self.points) == known:  # all switching points decoded
+                break
+
+    def __getitem__(self, index):
+        """Return the switching point at index, decoding as needed."""
+        if index == -1:  # the end of the period is known without decoding
+            return self.period
+        if index < 0:
+            self.decode()
+        else:
+            self.decode(index + 1)
+        return self.points[index]
+
+    def __len__(self):
+        """Return the number of switching points."""
+        self.decode()
+        return len(self.points)
+
+    def __iter__(self):
+        """Iterate over all the switching points."""
+        self.decode()
+        return iter(self.points)
+
+    def __eq__(self, other):
+        """Return True if the other waveform has the same switching points.
+
+        Waveforms are compared by their trees, and lists point by point.
+        """
+        if isinstance(other, list):
+            return list(self) == other
+        if type(other) is not Waveform:
+            return NotImplemented
+        return self.tree == other.tree
+
+    def __hash__(self):
+        """Return a hash of the waveform."""
+        return hash(self.waveform)
+
+    def __deepcopy__(self, memo):
+        """Share the waveform between copies, as it never changes."""
+        return self
+
+    def __reduce__(self):
+        """Parse the waveform again when unpickled, rather than copy it."""
+        return (Waveform, (self.waveform,))
+
+
+class WaveformFile(Waveform):
+    """Decode the switching points of a waveform file lazily.
+
+    The file is memory-mapped and checked once when opened, which also finds
+    its period and first level. Switching points are decoded as in Waveform,
+    and instances compare equal if the file contents are equal.
+
+    Parameters
+    ----------
+    path: path of the waveform file.
+
+    Public methods
+    --------------
+    decode(self, count=None): Decodes switching points until count are
+                              known, or all of them if count is None.
+    """
+
+    def __init__(self, path):
+        """Map the file, and check it and find its period.
+
+        Raise OSError if the file cannot be read, or ValueError if it is
+        empty or not in the repeat syntax.
+        """
+        self.path = os.path.abspath(path)
+        with open(self.path, "rb") as waveform_file:
+            # Raises ValueError if the file is empty
+            self.mapping = mmap.mmap(waveform_file.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+        self.digest = hashlib.sha1(self.mapping).hexdigest()
+
+        if LITERAL.fullmatch(self.mapping):
+            first_run = RUN.search(self.mapping)
+            if first_run is None:
+                raise ValueError("Empty waveform.")
+            self.first_level = chr(first_run.group()[0])
+            self.period = len(self.mapping) - sum(
+                len(space) for space in SPACE.findall(self.mapping))
+            runs = ((chr(match.group()[0]), match.end() - match.start())
+                    for match in RUN.finditer(self.mapping))
+        else:
+            tree = parse_waveform(self.mapping)
+            self.first_level = get_first_level(tree)
+            self.period = get_period(tree)
+            runs = iterate_runs(tree)
+            self.mapping.close()  # the tree holds the whole waveform
+
+        self.points = []  # switching points decoded so far
+        self.decoder = iterate_switching_points(runs)
+
+    def decode(self, count=None):
+        """Decode switching points until count are known, or all if None.
+
+        The file is closed once all of them are decoded.
+        """
+        super().decode(count)
+        if count is None or len(self.points) < count:
+            if not self.mapping.closed:
+                self.mapping.close()
+
+    def __eq__(self, other):
+        """Return True if the other waveform file has the same contents."""
+        if not isinstance(other, WaveformFile):
+            return NotImplemented
+        return self.digest == other.digest
+
+    def __hash__(self):
+        """Return a hash of the file contents."""
+        return hash(self.digest)
+
+    def __reduce__(self):
+        """Map the file again when unpickled, rather than copy the points."""
+        return (WaveformFile, (self.path,))